@@ -0,0 +1,88 @@
+"""
+Measures the memory held by parsed certificates
+
+Usage:
+    python benchmarks/memory_usage.py [count]
+
+Signs a set of certificates once, then parses them all again while
+tracing allocations, and reports the Python heap used per certificate.
+Memory allocated by OpenSSL for the key objects is not included.
+
+Recorded with CPython 3.11 and 2000 certificates:
+    Before the field slots:                 4226 bytes per certificate
+    With field slots and the cached bytes:  3166 bytes per certificate
+    With lazy decoding:                     3798 bytes per certificate
+    With field lengths and signed offsets:  3662 bytes per certificate
+
+TestCertificates.test_memory_usage fails if parsing uses more memory
+per certificate than before the field slots.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# pylint: disable=wrong-import-position
+from sshkey_tools.cert import CertificateFields, SSHCertificate  # noqa: E402
+from sshkey_tools.keys import Ed25519PrivateKey  # noqa: E402
+
+
+def create_certificates(count: int) -> list:
+    """
+    Creates and signs certificates with a shared CA key
+
+    Args:
+        count (int): The number of certificates
+
+    Returns:
+        list: The encoded certificates
+    """
+    ca_privkey = Ed25519PrivateKey.generate()
+    subject_pubkey = Ed25519PrivateKey.generate().public_key
+    certificates = []
+
+    for serial in range(1, count + 1):
+        certificate = SSHCertificate.create(
+            subject_pubkey=subject_pubkey,
+            ca_privkey=ca_privkey,
+            fields=CertificateFields(
+                serial=serial,
+                key_id=f"user-{serial}",
+                principals=["webservers", "databases"],
+            ),
+        )
+        certificate.sign()
+        certificates.append(bytes(certificate))
+
+    return certificates
+
+
+def measure(certificates: list) -> int:
+    """
+    Parses the certificates and returns the traced memory per certificate
+
+    Args:
+        certificates (list): The encoded certificates
+
+    Returns:
+        int: The number of bytes per parsed certificate
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    parsed = [SSHCertificate.from_bytes(data) for data in certificates]
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    return used // len(parsed)
+
+
+if __name__ == "__main__":
+    COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"{measure(create_certificates(COUNT))} bytes per parsed certificate")
@@ -0,0 +1,374 @@
+"""
+Awaitable versions of the signing, verification, key generation and file
+operations, for use in asyncio applications
+"""
+import asyncio
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Union
+
+from . import exceptions as _EX
+from .batch import generate_key_data, get_key_type
+from .cert import SSHCertificate
+from .keys import PrivateKey, PublicKey
+
+
+def _read_file(path: str, encoding: str = None) -> Union[str, bytes]:
+    with open(path, "r" if encoding else "rb", encoding=encoding) as file:
+        return file.read()
+
+
+def _write_file(path: str, data: str, encoding: str = "utf-8") -> None:
+    with open(path, "w", encoding=encoding) as file:
+        file.write(data)
+
+
+class AsyncRunner:
+    """
+    Runs the blocking operations of a coroutine in executors, so that the
+    event loop is not blocked while keys are generated or data is signed.
+
+    The cryptographic operations run in the executor, the file operations
+    in the io_executor. Both default to the default executor of the event loop.
+    The cryptography backend releases the GIL while signing and generating,
+    so a thread pool is usually sufficient. Key generation, certificate
+    loading and public key loading also work with a process pool. Private keys
+    can't be pickled, so signing and verification need a thread pool (use
+    batch.sign_many to sign with processes), and private keys and certificates
+    are loaded and saved in a thread pool (the io_executor, or the default
+    executor of the loop) when the executor is a process pool.
+
+    Args:
+        executor (Executor, optional): The executor for cryptographic operations.
+                                       Defaults to the default executor of the loop.
+        io_executor (Executor, optional): The executor for file operations.
+                                          Defaults to the default executor of the loop.
+        limit (int, optional): The maximum number of operations running at
+                               the same time, others wait for their turn.
+                               Defaults to no limit.
+    """
+
+    def __init__(
+        self,
+        executor: Executor = None,
+        io_executor: Executor = None,
+        limit: int = None,
+    ):
+        self.executor = executor
+        self.io_executor = io_executor
+        self.limit = limit
+
+        # Semaphores belong to an event loop, one is created for each loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+
+        return semaphore
+
+    async def _run_in(self, executor: Executor, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = partial(function, *args, **kwargs)
+
+        if self.limit is None:
+            return await loop.run_in_executor(executor, call)
+
+        async with self._get_semaphore():
+            return await loop.run_in_executor(executor, call)
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Runs a function in the executor for cryptographic operations
+
+        Args:
+            function (Callable): The function to run
+            *args, **kwargs: The arguments for the function
+
+        Returns:
+            mixed: The return value of the function
+        """
+        return await self._run_in(self.executor, function, *args, **kwargs)
+
+    async def run_io(self, function, *args, **kwargs):
+        """
+        Runs a function in the executor for file operations
+
+        Args:
+            function (Callable): The function to run
+            *args, **kwargs: The arguments for the function
+
+        Returns:
+            mixed: The return value of the function
+        """
+        return await self._run_in(self.io_executor, function, *args, **kwargs)
+
+    async def _run_with_keys(self, function, *args, **kwargs):
+        # Private keys never cross a process boundary, with process pools
+        # the operation runs in the io_executor or the default executor
+        executor = self.executor
+        if isinstance(executor, ProcessPoolExecutor):
+            executor = self.io_executor
+        if isinstance(executor, ProcessPoolExecutor):
+            executor = None
+
+        return await self._run_in(executor, function, *args, **kwargs)
+
+    def _check_threads(self) -> None:
+        if isinstance(self.executor, ProcessPoolExecutor):
+            raise TypeError(
+                "Keys can't be pickled, signing and verification need a thread pool"
+            )
+
+    async def sign(self, certificate: SSHCertificate) -> bool:
+        """
+        Signs a certificate, see SSHCertificate.sign
+
+        Args:
+            certificate (SSHCertificate): The certificate to sign
+
+        Raises:
+            _EX.NotSignedException: The certificate could not be signed
+            TypeError: The executor is a process pool
+
+        Returns:
+            bool: Whether successful
+        """
+        self._check_threads()
+        if not certificate.can_sign():
+            raise _EX.NotSignedException(
+                "There was an error while signing the certificate"
+            )
+
+        # Only the signing runs in the executor, the certificate is updated here
+        signature = certificate.footer.signature
+        data = certificate.get_signable()
+        signature.set_signature(await self.run(signature.private_key.sign, data))
+        return True
+
+    async def verify(
+        self,
+        certificate: SSHCertificate,
+        public_key: PublicKey = None,
+        raise_on_error: bool = False,
+    ) -> bool:
+        """
+        Verifies the signature on a certificate, see SSHCertificate.verify
+
+        Args:
+            certificate (SSHCertificate): The certificate to verify
+            public_key (PublicKey, optional): The public key to use for verification
+            raise_on_error (bool, default False): Raise an exception if the
+                                                  certificate is invalid
+
+        Raises:
+            _EX.InvalidSignatureException: The signature is invalid
+            TypeError: The executor is a process pool
+
+        Returns:
+            bool: True if the signature is valid
+        """
+        self._check_threads()
+        if not public_key:
+            public_key = certificate.get("ca_pubkey")
+
+        data = certificate.get_signed_data()
+        try:
+            await self.run(public_key.verify, data, certificate.footer.get("signature"))
+        except _EX.InvalidSignatureException:
+            if raise_on_error:
+                raise
+            return False
+
+        return True
+
+    async def generate(self, kind: Union[str, type], **params) -> PrivateKey:
+        """
+        Generates a private key
+
+        Args:
+            kind (Union[str, type]): The key type ('rsa', 'dsa', 'ecdsa' or 'ed25519'),
+                                     or the PrivateKey child class
+            **params: Arguments for the generate method, e.g. key_size or curve
+
+        Raises:
+            ValueError: Unknown key type
+
+        Returns:
+            PrivateKey: The generated key
+        """
+        _, key_class = get_key_type(kind)
+
+        # Passed in OpenSSH format, in case the executor is a process pool
+        key_data = await self.run(generate_key_data, key_class, (), params)
+        return PrivateKey.from_string(key_data)
+
+    async def load_certificate(
+        self, path: str, encoding: str = "utf-8", lazy: bool = False
+    ) -> SSHCertificate:
+        """
+        Loads a certificate from a file, see SSHCertificate.from_file
+
+        Args:
+            path (str): The path to the certificate file
+            encoding (str, optional): Encoding of the file. Defaults to 'utf-8'.
+            lazy (bool, optional): Keep the subject key, CA key and signature
+                encoded until they are accessed. Defaults to False.
+
+        Returns:
+            SSHCertificate: SSHCertificate child class
+        """
+        data = await self.run_io(_read_file, path, encoding)
+        return await self.run(SSHCertificate.from_string, data, encoding, lazy)
+
+    async def save_certificate(
+        self,
+        certificate: SSHCertificate,
+        path: str,
+        comment: str = "",
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        Writes a certificate to a file, see SSHCertificate.to_file
+
+        Args:
+            certificate (SSHCertificate): The certificate
+            path (str): The filename to write to
+            comment (str, optional): Comment to append to the certificate.
+                                     Defaults to "".
+            encoding (str, optional): The encoding of the file. Defaults to "utf-8".
+        """
+        data = await self._run_with_keys(certificate.to_string, comment, encoding)
+        await self.run_io(_write_file, path, data, encoding)
+
+    async def load_private_key(
+        self, path: str, password: Union[str, bytes] = None
+    ) -> PrivateKey:
+        """
+        Loads a private key from a file, see PrivateKey.from_file
+
+        Args:
+            path (str): The path to the file
+            password (str, optional): The encryption password. Defaults to None.
+
+        Returns:
+            PrivateKey: Any of the PrivateKey child classes
+        """
+        data = await self.run_io(_read_file, path)
+        return await self._run_with_keys(PrivateKey.from_string, data, password)
+
+    async def save_private_key(
+        self,
+        key: PrivateKey,
+        path: str,
+        password: Union[str, bytes] = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        Writes a private key to a file, see PrivateKey.to_file
+
+        Args:
+            key (PrivateKey): The private key
+            path (str): The path of the file
+            password (Union[str, bytes], optional): The password to set for the key.
+                                                    Defaults to None.
+            encoding (str, optional): The encoding of the file. Defaults to 'utf-8'.
+        """
+        data = await self._run_with_keys(key.to_string, password, encoding)
+        await self.run_io(_write_file, path, data, encoding)
+
+    async def load_public_key(self, path: str) -> PublicKey:
+        """
+        Loads a public key from a file, see PublicKey.from_file
+
+        Args:
+            path (str): The path to the file
+
+        Returns:
+            PublicKey: Any of the PublicKey child classes
+        """
+        data = await self.run_io(_read_file, path)
+        return await self.run(PublicKey.from_string, data)
+
+
+_RUNNER = AsyncRunner()
+
+
+def configure(
+    executor: Executor = None, io_executor: Executor = None, limit: int = None
+) -> AsyncRunner:
+    """
+    Sets the executors and concurrency limit used by the module level functions
+
+    Args:
+        executor (Executor, optional): The executor for cryptographic operations.
+                                       Defaults to the default executor of the loop.
+        io_executor (Executor, optional): The executor for file operations.
+                                          Defaults to the default executor of the loop.
+        limit (int, optional): The maximum number of operations running at
+                               the same time. Defaults to no limit.
+
+    Returns:
+        AsyncRunner: The runner used by the module level functions
+    """
+    # pylint: disable=global-statement
+    global _RUNNER
+    _RUNNER = AsyncRunner(executor, io_executor, limit)
+
+    return _RUNNER
+
+
+async def sign(certificate: SSHCertificate) -> bool:
+    """Signs a certificate, see AsyncRunner.sign"""
+    return await _RUNNER.sign(certificate)
+
+
+async def verify(
+    certificate: SSHCertificate,
+    public_key: PublicKey = None,
+    raise_on_error: bool = False,
+) -> bool:
+    """Verifies the signature on a certificate, see AsyncRunner.verify"""
+    return await _RUNNER.verify(certificate, public_key, raise_on_error)
+
+
+async def generate(kind: Union[str, type], **params) -> PrivateKey:
+    """Generates a private key, see AsyncRunner.generate"""
+    return await _RUNNER.generate(kind, **params)
+
+
+async def load_certificate(
+    path: str, encoding: str = "utf-8", lazy: bool = False
+) -> SSHCertificate:
+    """Loads a certificate from a file, see AsyncRunner.load_certificate"""
+    return await _RUNNER.load_certificate(path, encoding, lazy)
+
+
+async def save_certificate(
+    certificate: SSHCertificate, path: str, comment: str = "", encoding: str = "utf-8"
+) -> None:
+    """Writes a certificate to a file, see AsyncRunner.save_certificate"""
+    await _RUNNER.save_certificate(certificate, path, comment, encoding)
+
+
+async def load_private_key(path: str, password: Union[str, bytes] = None) -> PrivateKey:
+    """Loads a private key from a file, see AsyncRunner.load_private_key"""
+    return await _RUNNER.load_private_key(path, password)
+
+
+async def save_private_key(
+    key: PrivateKey,
+    path: str,
+    password: Union[str, bytes] = None,
+    encoding: str = "utf-8",
+) -> None:
+    """Writes a private key to a file, see AsyncRunner.save_private_key"""
+    await _RUNNER.save_private_key(key, path, password, encoding)
+
+
+async def load_public_key(path: str) -> PublicKey:
+    """Loads a public key from a file, see AsyncRunner.load_public_key"""
+    return await _RUNNER.load_public_key(path)
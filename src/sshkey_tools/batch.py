@@ -0,0 +1,479 @@
+"""
+Bulk operations on keys and certificates, spread across a pool of workers
+"""
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from functools import partial
+from itertools import repeat
+from typing import Any, Callable, Iterable, Iterator, List, Union
+
+from .cert import SSHCertificate
+from .keys import (
+    DsaPrivateKey,
+    EcdsaPrivateKey,
+    Ed25519PrivateKey,
+    PrivateKey,
+    RsaPrivateKey,
+)
+
+CERTIFICATE_PATTERN = "*-cert.pub"
+KEY_FILENAME = "id_{kind}_{index}"
+
+KEY_TYPES = {
+    "rsa": RsaPrivateKey,
+    "dsa": DsaPrivateKey,
+    "ecdsa": EcdsaPrivateKey,
+    "ed25519": Ed25519PrivateKey,
+}
+
+# The CA key loaded by the initializer of each signing worker process
+_WORKER_CA_KEY = None
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of one item in a batch operation
+
+    Attributes:
+        source: The input item (e.g. the path of the file)
+        result: The result of the operation, None if it failed
+        exception (Exception): The exception raised for the item, None if successful
+    """
+
+    source: Any
+    result: Any = None
+    exception: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the operation succeeded for this item"""
+        return self.exception is None
+
+
+def create_executor(
+    workers: int = None,
+    use_processes: bool = True,
+    initializer: Callable = None,
+    initargs: tuple = (),
+) -> Executor:
+    """
+    Creates the worker pool for a batch operation
+
+    Args:
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to True.
+        initializer (Callable, optional): Function to run at the start of each worker
+        initargs (tuple, optional): Arguments for the initializer
+
+    Returns:
+        Executor: A process or thread pool executor
+    """
+    if use_processes:
+        return ProcessPoolExecutor(
+            max_workers=workers, initializer=initializer, initargs=initargs
+        )
+
+    return ThreadPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    )
+
+
+# pylint: disable=too-many-arguments
+def imap_unordered(
+    function: Callable,
+    items: Iterable,
+    workers: int = None,
+    use_processes: bool = True,
+    max_pending: int = None,
+    *,
+    initializer: Callable = None,
+    initargs: tuple = (),
+) -> Iterator[BatchResult]:
+    """
+    Applies a function to every item in a worker pool, yielding the results
+    in the order they complete. The items are consumed lazily and at most
+    max_pending of them are in flight at any time, so memory use stays bounded
+    regardless of the number of items.
+
+    Args:
+        function (Callable): The function to apply, must be picklable for process pools
+        items (Iterable): The items to process
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to True.
+        max_pending (int, optional): Maximum number of submitted but not yet yielded
+                                     items. Defaults to four per worker.
+        initializer (Callable, optional): Function to run at the start of each worker
+        initargs (tuple, optional): Arguments for the initializer
+
+    Yields:
+        BatchResult: The result or exception for each item
+    """
+    if max_pending is None:
+        max_pending = 4 * (workers or os.cpu_count() or 1)
+
+    executor = create_executor(workers, use_processes, initializer, initargs)
+    pending = {}
+
+    try:
+        for item in items:
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from _collect(done, pending)
+
+            pending[executor.submit(function, item)] = item
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from _collect(done, pending)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _collect(done: set, pending: dict) -> Iterator[BatchResult]:
+    for future in done:
+        source = pending.pop(future)
+        exception = future.exception()
+
+        if exception is not None:
+            yield BatchResult(source=source, exception=exception)
+        else:
+            yield BatchResult(source=source, result=future.result())
+
+
+def find_certificates(
+    directory: str, pattern: str = CERTIFICATE_PATTERN, recursive: bool = False
+) -> Iterator[str]:
+    """
+    Lists the certificate files in a directory
+
+    Args:
+        directory (str): The directory to search
+        pattern (str, optional): Filename pattern to match. Defaults to '*-cert.pub'.
+        recursive (bool, optional): Include subdirectories. Defaults to False.
+
+    Yields:
+        str: The path of each matching file
+    """
+    for root, dirs, files in os.walk(directory):
+        for filename in sorted(files):
+            if fnmatch(filename, pattern):
+                yield os.path.join(root, filename)
+
+        if not recursive:
+            break
+
+        dirs.sort()
+
+
+def load_certificates(
+    sources: Union[str, Iterable[str]],
+    workers: int = None,
+    use_processes: bool = True,
+    max_pending: int = None,
+    *,
+    pattern: str = CERTIFICATE_PATTERN,
+    recursive: bool = False,
+) -> Iterator[BatchResult]:
+    """
+    Loads and parses certificate files in bulk across a pool of workers.
+    Results are yielded in completion order, files that cannot be parsed
+    are yielded with the exception instead of aborting the run.
+
+    Args:
+        sources (Union[str, Iterable[str]]): A directory, or an iterable of file paths
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to True.
+        max_pending (int, optional): Maximum number of files in flight.
+                                     Defaults to four per worker.
+        pattern (str, optional): Filename pattern when loading a directory.
+                                 Defaults to '*-cert.pub'.
+        recursive (bool, optional): Include subdirectories when loading a directory.
+                                    Defaults to False.
+
+    Yields:
+        BatchResult: The path as source, and the SSHCertificate or exception
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        if not os.path.isdir(sources):
+            raise NotADirectoryError(f"{sources} is not a directory")
+
+        sources = find_certificates(sources, pattern, recursive)
+
+    return imap_unordered(
+        SSHCertificate.from_file, sources, workers, use_processes, max_pending
+    )
+
+
+def _load_worker_ca_key(key_data: bytes) -> None:
+    # pylint: disable=global-statement
+    global _WORKER_CA_KEY
+    _WORKER_CA_KEY = PrivateKey.from_string(key_data)
+
+
+def _sign_with_worker_ca_key(data: bytes) -> bytes:
+    return _WORKER_CA_KEY.sign(data)
+
+
+def sign_many(
+    certificates: Iterable[SSHCertificate],
+    ca_privkey: PrivateKey,
+    workers: int = None,
+    use_processes: bool = False,
+) -> List[BatchResult]:
+    """
+    Signs a batch of certificates with one CA private key.
+
+    The certificates are validated and serialized in the calling thread,
+    only the signing of the resulting bytes is spread across the workers.
+    A certificate that fails validation or signing is returned with its
+    exception and does not affect the rest of the batch.
+
+    The certificates are signed in place, like with SSHCertificate.sign.
+    The CA public key and signature of every certificate are replaced with
+    those of ca_privkey, also for certificates that then fail to sign.
+
+    For process pools the CA key is sent unencrypted to each worker process
+    once, when the pool is started.
+
+    Args:
+        certificates (Iterable[SSHCertificate]): The certificates to sign
+        ca_privkey (PrivateKey): The CA private key to sign with
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to False.
+
+    Returns:
+        List[BatchResult]: One result per certificate, in input order, with the
+                           signed certificate (the same object) as result
+    """
+    results = [BatchResult(source=certificate) for certificate in certificates]
+    signable = {}
+
+    for index, item in enumerate(results):
+        try:
+            item.source.replace_ca(ca_privkey)
+            item.source.can_sign()
+            signable[index] = item.source.get_signable()
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            item.exception = exception
+
+    if use_processes:
+        sign_function = _sign_with_worker_ca_key
+        executor = create_executor(
+            workers, True, _load_worker_ca_key, (ca_privkey.to_bytes(),)
+        )
+    else:
+        sign_function = ca_privkey.sign
+        executor = create_executor(workers, False)
+
+    with executor:
+        futures = {
+            index: executor.submit(sign_function, data)
+            for index, data in signable.items()
+        }
+
+        for index, future in futures.items():
+            item = results[index]
+            try:
+                item.source.footer.signature.set_signature(future.result())
+                item.result = item.source
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                item.exception = exception
+
+    return results
+
+
+def get_key_type(kind: Union[str, type]) -> tuple:
+    """
+    Looks up a key type by name or by PrivateKey child class
+
+    Args:
+        kind (Union[str, type]): The key type ('rsa', 'dsa', 'ecdsa' or 'ed25519'),
+                                 or the PrivateKey child class
+
+    Raises:
+        ValueError: Unknown key type
+
+    Returns:
+        tuple: The name of the key type and the PrivateKey child class
+    """
+    if isinstance(kind, str):
+        try:
+            return kind, KEY_TYPES[kind]
+        except KeyError:
+            raise ValueError(
+                f"Unknown key type {kind}, expected one of {', '.join(KEY_TYPES)}"
+            ) from None
+
+    for name, key_class in KEY_TYPES.items():
+        if key_class is kind:
+            return name, key_class
+
+    raise ValueError(f"Unknown key type {kind}")
+
+
+def generate_key_data(key_class: type, args: tuple = (), params: dict = None) -> bytes:
+    """
+    Generates a private key in OpenSSH format, for generating keys in worker
+    processes since the cryptography key classes can't be pickled
+
+    Args:
+        key_class (type): The PrivateKey child class, e.g. RsaPrivateKey
+        args (tuple, optional): Positional arguments for the generate method
+        params (dict, optional): Keyword arguments for the generate method
+
+    Returns:
+        bytes: The private key in OpenSSH format
+    """
+    return key_class.generate(*args, **(params or {})).to_bytes()
+
+
+# pylint: disable=too-many-arguments
+def _generate_key_file(
+    kind: Union[str, type],
+    params: dict,
+    path: str,
+    password: Union[str, bytes],
+    index: int,
+) -> str:
+    name, key_class = get_key_type(kind)
+    key = key_class.generate(**params)
+    path = path.format(kind=name, index=index)
+
+    # Never overwrite existing keys, and keep the private key readable by the owner only
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with open(path + ".pub", "xb") as pubkey_file:
+            pubkey_file.write(key.public_key.serialize() + b"\n")
+    except OSError:
+        # Windows cannot remove a file that is still open
+        os.close(descriptor)
+        os.unlink(path)
+        raise
+
+    with open(descriptor, "wb") as key_file:
+        key_file.write(key.to_bytes(password))
+
+    return path
+
+
+def generate_many(
+    kind: Union[str, type],
+    count: int,
+    workers: int = None,
+    use_processes: bool = True,
+    **params,
+) -> List[PrivateKey]:
+    """
+    Generates a number of private keys across a pool of workers
+
+    Args:
+        kind (Union[str, type]): The key type ('rsa', 'dsa', 'ecdsa' or 'ed25519'),
+                                 or the PrivateKey child class
+        count (int): The number of keys to generate
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to True.
+        **params: Arguments for the generate method, e.g. key_size or curve
+
+    Raises:
+        ValueError: Unknown key type
+
+    Returns:
+        List[PrivateKey]: The generated keys
+    """
+    _, key_class = get_key_type(kind)
+
+    if not use_processes:
+        with create_executor(workers, False) as executor:
+            return list(
+                executor.map(lambda _: key_class.generate(**params), range(count))
+            )
+
+    # Hand out the keys in chunks to limit the round trips to the worker processes
+    chunksize = max(1, count // (4 * (workers or os.cpu_count() or 1)))
+
+    with create_executor(workers, True) as executor:
+        return [
+            PrivateKey.from_string(key_data)
+            for key_data in executor.map(
+                generate_key_data,
+                repeat(key_class, count),
+                repeat((), count),
+                repeat(params, count),
+                chunksize=chunksize,
+            )
+        ]
+
+
+# pylint: disable=too-many-arguments
+def generate_to_directory(
+    kind: Union[str, type],
+    count: int,
+    directory: str,
+    *,
+    filename: str = KEY_FILENAME,
+    password: Union[str, bytes] = None,
+    workers: int = None,
+    use_processes: bool = True,
+    max_pending: int = None,
+    **params,
+) -> Iterator[BatchResult]:
+    """
+    Generates a number of private keys across a pool of workers, and writes
+    each key to a file in a directory as soon as it is generated. The keys
+    are written by the workers and never held in memory together.
+
+    Every key is written in OpenSSH format, readable by the owner only,
+    next to its public key with the .pub suffix. Existing files are never
+    overwritten, the key is returned with the exception instead.
+
+    Args:
+        kind (Union[str, type]): The key type ('rsa', 'dsa', 'ecdsa' or 'ed25519'),
+                                 or the PrivateKey child class
+        count (int): The number of keys to generate
+        directory (str): The directory to write the keys to
+        filename (str, optional): Filename for the keys, formatted with the
+                                  key type (kind) and the number of the key (index).
+                                  Defaults to 'id_{kind}_{index}'.
+        password (Union[str, bytes], optional): Password to encrypt the keys with.
+                                                Defaults to None.
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to True.
+        max_pending (int, optional): Maximum number of keys in flight.
+                                     Defaults to four per worker.
+        **params: Arguments for the generate method, e.g. key_size or curve
+
+    Raises:
+        ValueError: Unknown key type
+        NotADirectoryError: The directory does not exist
+
+    Yields:
+        BatchResult: The number of the key as source, and the path
+                     of the private key or the exception
+    """
+    get_key_type(kind)
+
+    if not os.path.isdir(directory):
+        raise NotADirectoryError(f"{directory} is not a directory")
+
+    function = partial(
+        _generate_key_file, kind, params, os.path.join(directory, filename), password
+    )
+
+    return imap_unordered(function, range(count), workers, use_processes, max_pending)
@@ -1,4 +1,4 @@
-# pylint: disable=super-with-arguments
+# pylint: disable=super-with-arguments,too-many-lines
 """
 Contains classes for OpenSSH Certificates, generation, parsing and signing
 Raises:
@@ -8,16 +8,27 @@ Raises:
     _EX.NoPrivateKeyException: The certificate contains no private key
     _EX.NotSignedException: The certificate is not signed and cannot be exported
 """
+
+from array import array
 from base64 import b64decode, b64encode
+from copy import deepcopy
 from dataclasses import dataclass
-from typing import Tuple, Union
+from dataclasses import fields as dataclass_fields
+from datetime import datetime
+from itertools import accumulate
+from typing import Iterator, Tuple, Union
 
 from prettytable import PrettyTable
 
 from . import exceptions as _EX
 from . import fields as _FIELD
 from .keys import PrivateKey, PublicKey
-from .utils import concat_to_bytestring, concat_to_string, ensure_bytestring
+from .utils import (
+    WireReader,
+    concat_to_bytestring,
+    concat_to_string,
+    ensure_bytestring,
+)
 
 CERT_TYPES = {
     "ssh-rsa-cert-v01@openssh.com": ("RsaCertificate", "RsaPubkeyField"),
@@ -48,6 +59,10 @@ class Fieldset:
     """Set of fields for SSHCertificate class"""
 
     DECODE_ORDER = []
+    ENCODE_ORDER = []
+
+    def __bytes__(self):
+        return b"".join(bytes(getattr(self, item)) for item in self.ENCODE_ORDER)
 
     def __table__(self):
         return [getattr(self, item).__table__() for item in self.getattrs()]
@@ -83,6 +98,15 @@ class Fieldset:
         """
         super(Fieldset, self).__setattr__(name, value)
 
+    def get_dirty(self) -> list:
+        """Get the fields in ENCODE_ORDER which have changed since they were
+        last encoded, and will be encoded again on the next export or signing
+
+        Returns:
+            list: The names of the changed fields
+        """
+        return [item for item in self.ENCODE_ORDER if getattr(self, item).is_dirty]
+
     def get(self, name: str, default=None):
         """Get field contents
 
@@ -127,6 +151,30 @@ class Fieldset:
 
         return True if len(ex) == 0 else ex
 
+    def encoded_size(self) -> int:
+        """Get the length of the encoded fieldset
+
+        Returns:
+            int: The length in bytes of the fields in ENCODE_ORDER
+        """
+        return sum(getattr(self, item).encoded_size() for item in self.ENCODE_ORDER)
+
+    def write_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """Write the encoded fields in ENCODE_ORDER into a buffer
+
+        Args:
+            buffer (bytearray): A writable buffer with room for the fieldset
+            offset (int, optional): The position in the buffer to write at.
+                Defaults to 0.
+
+        Returns:
+            int: The position in the buffer after the fieldset
+        """
+        for item in self.ENCODE_ORDER:
+            offset = getattr(self, item).write_into(buffer, offset)
+
+        return offset
+
     @classmethod
     def decode(cls, data: bytes) -> Tuple["Fieldset", bytes]:
         """Decode the certificate field data from a stream of bytes
@@ -135,12 +183,37 @@ class Fieldset:
             Tuple[Fieldset, bytes]: A tuple with the fieldset (Header, Fields or Footer)
             and the remaining bytes.
         """
+        reader = WireReader(data)
+        return cls.from_reader(reader), reader.rest()
+
+    @classmethod
+    def from_reader(cls, reader: WireReader, lazy: bool = False) -> "Fieldset":
+        """Decode the certificate field data from the current position of a WireReader
+
+        Args:
+            reader (WireReader): The reader positioned at the start of the fieldset
+            lazy (bool, optional): Keep keys and signatures encoded until they
+                are accessed. Defaults to False.
+
+        Returns:
+            Fieldset: The fieldset (Header, Fields or Footer)
+        """
         cl_instance = cls()
         for item in cls.DECODE_ORDER:
-            decoded, data = getattr(cl_instance, item).from_decode(data)
-            setattr(cl_instance, item, decoded)
+            cl_instance.replace_field(
+                item, cls._read_field(_FIELD.FIELD_REGISTRY[item], reader, lazy)
+            )
 
-        return cl_instance, data
+        return cl_instance
+
+    @staticmethod
+    def _read_field(
+        field_class: type, reader: WireReader, lazy: bool
+    ) -> _FIELD.CertificateField:
+        if lazy and issubclass(field_class, _FIELD.LazyField):
+            return field_class.from_reader_lazy(reader)
+
+        return field_class.from_reader(reader)
 
 
 @dataclass
@@ -152,22 +225,19 @@ class CertificateHeader(Fieldset):
     nonce: _FIELD.NonceField = _FIELD.NonceField.factory
 
     DECODE_ORDER = ["pubkey_type", "nonce"]
-
-    def __bytes__(self):
-        return concat_to_bytestring(
-            bytes(self.pubkey_type), bytes(self.nonce), bytes(self.public_key)
-        )
+    ENCODE_ORDER = ["pubkey_type", "nonce", "public_key"]
 
     @classmethod
-    def decode(cls, data: bytes) -> Tuple["CertificateHeader", bytes]:
-        cl_instance, data = super().decode(data)
+    def from_reader(cls, reader: WireReader, lazy: bool = False) -> "CertificateHeader":
+        cl_instance = super().from_reader(reader, lazy)
 
         target_class = CERT_TYPES[cl_instance.get("pubkey_type")]
 
-        public_key, data = getattr(_FIELD, target_class[1]).from_decode(data)
-        cl_instance.public_key = public_key
+        cl_instance.public_key = cls._read_field(
+            getattr(_FIELD, target_class[1]), reader, lazy
+        )
 
-        return cl_instance, data
+        return cl_instance
 
 
 @dataclass
@@ -194,18 +264,7 @@ class CertificateFields(Fieldset):
         "critical_options",
         "extensions",
     ]
-
-    def __bytes__(self):
-        return concat_to_bytestring(
-            bytes(self.serial),
-            bytes(self.cert_type),
-            bytes(self.key_id),
-            bytes(self.principals),
-            bytes(self.valid_after),
-            bytes(self.valid_before),
-            bytes(self.critical_options),
-            bytes(self.extensions),
-        )
+    ENCODE_ORDER = DECODE_ORDER
 
 
 @dataclass
@@ -217,9 +276,20 @@ class CertificateFooter(Fieldset):
     signature: _FIELD.SignatureField = _FIELD.SignatureField.factory
 
     DECODE_ORDER = ["reserved", "ca_pubkey", "signature"]
-
-    def __bytes__(self):
-        return concat_to_bytestring(bytes(self.reserved), bytes(self.ca_pubkey))
+    ENCODE_ORDER = ["reserved", "ca_pubkey"]
+
+
+# Maps each registered field class to the attribute of the certificate
+# section containing it
+FIELD_SECTIONS = {
+    field.type: section
+    for section, fieldset in (
+        ("header", CertificateHeader),
+        ("fields", CertificateFields),
+        ("footer", CertificateFooter),
+    )
+    for field in dataclass_fields(fieldset)
+}
 
 
 class SSHCertificate:
@@ -230,6 +300,7 @@ class SSHCertificate:
     """
 
     DEFAULT_KEY_TYPE = "none@openssh.com"
+
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -249,6 +320,8 @@ class SSHCertificate:
         self.fields = fields() if isinstance(fields, type) else fields
         self.header = header() if isinstance(header, type) else header
         self.footer = footer() if isinstance(footer, type) else footer
+        self._signed_data = None
+        self._signed_state = None
 
         if isinstance(header, type) and subject_pubkey is not None:
             self.header.pubkey_type = self.DEFAULT_KEY_TYPE
@@ -267,18 +340,16 @@ class SSHCertificate:
     def __post_init__(self):
         """Extensible function for post-initialization for child classes"""
 
-    def __bytes__(self):
-        if not self.footer.signature.is_signed:
-            raise _EX.InvalidCertificateFormatException(
-                "Failed exporting certificate: Certificate is not signed"
-            )
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state["_signed_data"] is not None:
+            state["_signed_data"] = state["_signed_data"][: self._signed_state[1][-1]]
 
-        return concat_to_bytestring(
-            bytes(self.header),
-            bytes(self.fields),
-            bytes(self.footer),
-            bytes(self.footer.signature),
-        )
+        return state
+
+    def __bytes__(self):
+        self._check_signed()
+        return self.get_signable() + bytes(self.footer.signature)
 
     def __str__(self) -> str:
         table = PrettyTable(["Field", "Value"])
@@ -326,39 +397,66 @@ class SSHCertificate:
         )
 
     @classmethod
-    def decode(cls, data: bytes) -> "SSHCertificate":
+    def decode(cls, data: bytes, lazy: bool = False) -> "SSHCertificate":
         """
         Decode an existing certificate and import it into a new object
 
         Args:
             data (bytes): The certificate bytes, base64 decoded middle part of the certificate
+            lazy (bool, optional): Keep the subject key, CA key and signature
+                encoded until they are accessed. Defaults to False.
 
         Returns:
             SSHCertificate: SSHCertificate child class
         """
-        cert_header, data = CertificateHeader.decode(data)
-        cert_fields, data = CertificateFields.decode(data)
-        cert_footer, data = CertificateFooter.decode(data)
+        reader = WireReader(data)
+        cert_header = CertificateHeader.from_reader(reader, lazy)
+        cert_fields = CertificateFields.from_reader(reader, lazy)
+
+        # The signature covers everything before it, up to and including the CA key
+        footer = WireReader(reader.view[reader.offset :])
+        footer.skip_string()
+        footer.skip_string()
+        signed_end = reader.offset + footer.offset
+
+        cert_footer = CertificateFooter.from_reader(reader, lazy)
+
+        certificate = cls(header=cert_header, fields=cert_fields, footer=cert_footer)
+        # Bytes are immutable, so the signed data is read from them in place
+        certificate._signed_data = (
+            data if isinstance(data, bytes) else bytes(reader.view[:signed_end])
+        )
 
-        return cls(header=cert_header, fields=cert_fields, footer=cert_footer)
+        # The decoded fields, and where their bytes end in the signed data
+        signed_fields = certificate._get_fields()
+        certificate._signed_state = (
+            signed_fields,
+            array("I", accumulate(field.decoded_size for field in signed_fields)),
+        )
+
+        return certificate
 
     @classmethod
-    def from_bytes(cls, cert_bytes: bytes):
+    def from_bytes(cls, cert_bytes: bytes, lazy: bool = False):
         """
         Loads an existing certificate from the byte value.
 
         Args:
             cert_bytes (bytes): Certificate bytes, base64 decoded middle part of the certificate
+            lazy (bool, optional): Keep the subject key, CA key and signature
+                encoded until they are accessed. Defaults to False.
 
         Returns:
             SSHCertificate: SSHCertificate child class
         """
-        cert_type, _ = _FIELD.StringField.decode(cert_bytes)
+        cert_type = _FIELD.StringField.read(WireReader(cert_bytes))
         target_class = CERT_TYPES[cert_type]
-        return globals()[target_class[0]].decode(cert_bytes)
+        return globals()[target_class[0]].decode(cert_bytes, lazy)
 
     @classmethod
-    def from_string(cls, cert_str: Union[str, bytes], encoding: str = "utf-8"):
+    def from_string(
+        cls, cert_str: Union[str, bytes], encoding: str = "utf-8", lazy: bool = False
+    ):
         """
         Loads an existing certificate from a string in the format
         [certificate-type] [base64-encoded-certificate] [optional-comment]
@@ -366,29 +464,43 @@ class SSHCertificate:
         Args:
             cert_str (str): The string containing the certificate
             encoding (str, optional): The encoding of the string. Defaults to 'utf-8'.
+            lazy (bool, optional): Keep the subject key, CA key and signature
+                encoded until they are accessed. Defaults to False.
+
+        Raises:
+            _EX.InvalidCertificateFormatException: The string does not contain
+                                                   a base64-encoded certificate
 
         Returns:
             SSHCertificate: SSHCertificate child class
         """
         cert_str = ensure_bytestring(cert_str, encoding)
 
-        certificate = b64decode(cert_str.split(b" ")[1])
-        return cls.from_bytes(cert_bytes=certificate)
+        try:
+            certificate = b64decode(cert_str.split(b" ")[1])
+        except (IndexError, ValueError) as exception:
+            raise _EX.InvalidCertificateFormatException(
+                "The string does not contain a base64-encoded certificate"
+            ) from exception
+
+        return cls.from_bytes(cert_bytes=certificate, lazy=lazy)
 
     @classmethod
-    def from_file(cls, path: str, encoding: str = "utf-8"):
+    def from_file(cls, path: str, encoding: str = "utf-8", lazy: bool = False):
         """
         Loads an existing certificate from a file
 
         Args:
             path (str): The path to the certificate file
             encoding (str, optional): Encoding of the file. Defaults to 'utf-8'.
+            lazy (bool, optional): Keep the subject key, CA key and signature
+                encoded until they are accessed. Defaults to False.
 
         Returns:
             SSHCertificate: SSHCertificate child class
         """
         with open(path, "r", encoding=encoding) as file:
-            return cls.from_string(file.read())
+            return cls.from_string(file.read(), lazy=lazy)
 
     def get(self, field: str):
         """
@@ -403,16 +515,7 @@ class SSHCertificate:
         Returns:
             mixed: The certificate field contents
         """
-        if field in (
-            self.header.getattrs() + self.fields.getattrs() + self.footer.getattrs()
-        ):
-            return (
-                self.fields.get(field, False)
-                or self.header.get(field, False)
-                or self.footer.get(field, False)
-            )
-
-        raise _EX.InvalidCertificateFieldException(f"Unknown field {field}")
+        return self._get_section(field).get(field)
 
     def set(self, field: str, value) -> None:
         """
@@ -428,19 +531,17 @@ class SSHCertificate:
         Returns:
             mixed: The certificate field contents
         """
-        if self.fields.get(field, False):
-            setattr(self.fields, field, value)
-            return
-
-        if self.header.get(field, False):
-            setattr(self.header, field, value)
-            return
+        setattr(self._get_section(field), field, value)
 
-        if self.footer.get(field, False):
-            setattr(self.footer, field, value)
-            return
+    def _get_section(self, field: str) -> Fieldset:
+        try:
+            field_class = _FIELD.FIELD_REGISTRY[field]
+        except KeyError:
+            raise _EX.InvalidCertificateFieldException(
+                f"Unknown field {field}"
+            ) from None
 
-        raise _EX.InvalidCertificateFieldException(f"Unknown field {field}")
+        return getattr(self, FIELD_SECTIONS[field_class])
 
     def replace_ca(self, ca_privkey: PrivateKey):
         """
@@ -486,13 +587,153 @@ class SSHCertificate:
 
         return True
 
+    def _get_fields(self) -> tuple:
+        return tuple(
+            getattr(section, item)
+            for section in (self.header, self.fields, self.footer)
+            for item in section.ENCODE_ORDER
+        )
+
+    def _iter_signed(self) -> Iterator[Tuple[_FIELD.CertificateField, bytes]]:
+        # Pairs the fields with their signed bytes, None if replaced since
+        signed_fields, ends = self._signed_state
+        start = 0
+        for field, signed_field, end in zip(self._get_fields(), signed_fields, ends):
+            yield field, self._signed_data[start:end] if field is signed_field else None
+            start = end
+
+    def is_modified(self) -> bool:
+        """
+        Check if the certificate has been changed after it was decoded,
+        whether fields were set or replaced or their values changed in place
+
+        Returns:
+            bool: True if modified, always True if the certificate was not decoded
+        """
+        if self._signed_state is None:
+            return True
+
+        for field, signed in self._iter_signed():
+            if signed is None:
+                return True
+
+            if field.decoded_size is None:
+                # Set or encoded since it was decoded
+                if field.is_dirty or bytes(field) != signed:
+                    return True
+            elif field.is_dirty and field.encode(field.value) != signed:
+                # A decoded value that can be changed in place, compared
+                # without keeping the encoded bytes
+                return True
+
+        return False
+
+    def get_signed_data(self) -> bytes:
+        """
+        Retrieves the data covered by the signature. For a decoded certificate
+        that has not been modified, this is the data exactly as it was read,
+        otherwise the signable data is encoded from the fields.
+
+        Returns:
+            bytes: The signed data
+        """
+        if self.is_modified():
+            return self.get_signable()
+
+        return self._signed_data[: self._signed_state[1][-1]]
+
+    def _iter_signable(self) -> Iterator[bytes]:
+        # The encoded bytes of the signable fields, in order
+        if self._signed_state is None:
+            return (bytes(field) for field in self._get_fields())
+
+        # Unchanged decoded fields are copied from the bytes they were read from
+        return (
+            (
+                bytes(field)
+                if signed is None or field.decoded_size is None or field.is_dirty
+                else signed
+            )
+            for field, signed in self._iter_signed()
+        )
+
     def get_signable(self) -> bytes:
         """
         Retrieves the signable data for the certificate in byte form
         """
-        return concat_to_bytestring(
-            bytes(self.header), bytes(self.fields), bytes(self.footer)
-        )
+        # The fields keep their encoded bytes, so joining them is cheaper
+        # than measuring and copying them into a preallocated buffer
+        return b"".join(self._iter_signable())
+
+    def signable_size(self) -> int:
+        """
+        Get the length of the signable data for the certificate
+
+        Returns:
+            int: The length in bytes of the header, fields and footer
+        """
+        return sum(len(data) for data in self._iter_signable())
+
+    def write_signable_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """
+        Writes the signable data for the certificate into a buffer
+
+        Args:
+            buffer (bytearray): A writable buffer with room for the signable data,
+                                see signable_size
+            offset (int, optional): The position in the buffer to write at.
+                                    Defaults to 0.
+
+        Returns:
+            int: The position in the buffer after the signable data
+        """
+        for data in self._iter_signable():
+            end = offset + len(data)
+            buffer[offset:end] = data
+            offset = end
+
+        return offset
+
+    def encoded_size(self) -> int:
+        """
+        Get the length of the encoded certificate, the length of the
+        buffer needed for write_into
+
+        Raises:
+            _EX.InvalidCertificateFormatException: The certificate is not signed
+
+        Returns:
+            int: The length in bytes of the signed certificate
+        """
+        self._check_signed()
+        return self.signable_size() + self.footer.signature.encoded_size()
+
+    def write_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """
+        Writes the encoded, signed certificate into a buffer,
+        e.g. a preallocated network or file buffer
+
+        Args:
+            buffer (bytearray): A writable buffer with room for the certificate,
+                                see encoded_size
+            offset (int, optional): The position in the buffer to write at.
+                                    Defaults to 0.
+
+        Raises:
+            _EX.InvalidCertificateFormatException: The certificate is not signed
+
+        Returns:
+            int: The position in the buffer after the certificate
+        """
+        self._check_signed()
+        offset = self.write_signable_into(buffer, offset)
+        return self.footer.signature.write_into(buffer, offset)
+
+    def _check_signed(self):
+        if not self.footer.signature.is_signed:
+            raise _EX.InvalidCertificateFormatException(
+                "Failed exporting certificate: Certificate is not signed"
+            )
 
     def sign(self) -> bool:
         """Sign the certificate
@@ -527,7 +768,7 @@ class SSHCertificate:
             public_key = self.get("ca_pubkey")
 
         try:
-            public_key.verify(self.get_signable(), self.footer.get("signature"))
+            public_key.verify(self.get_signed_data(), self.footer.get("signature"))
         except _EX.InvalidSignatureException as exception:
             if raise_on_error:
                 raise exception
@@ -584,12 +825,197 @@ class EcdsaCertificate(SSHCertificate):
 
     def __post_init__(self):
         """Set the key name from the public key curve size"""
-        self.header.pubkey_type = self.header.get("pubkey_type").replace(
-            "[curve_size]", str(self.header.public_key.value.key.curve.key_size)
-        )
+        pubkey_type = self.header.get("pubkey_type")
+        if "[curve_size]" in pubkey_type:
+            self.header.pubkey_type = pubkey_type.replace(
+                "[curve_size]", str(self.header.public_key.value.key.curve.key_size)
+            )
 
 
 class Ed25519Certificate(SSHCertificate):
     """The ED25519 certificate class"""
 
     DEFAULT_KEY_TYPE = "ssh-ed25519-cert-v01@openssh.com"
+
+
+class CertificateTemplate:
+    """
+    Template for issuing many certificates that share the certificate type,
+    principals, critical options, extensions and CA. The shared fields are
+    validated and encoded once, and only the subject key, nonce, serial,
+    key id and validity period are encoded for each issued certificate.
+
+    Args:
+        ca_privkey (PrivateKey): The CA private key to sign with
+        cert_type (Union[CERT_TYPE, int], optional): The certificate type.
+            Defaults to CERT_TYPE.USER.
+        principals (list, optional): The principals for the certificates
+        critical_options (Union[list, dict], optional): The critical options
+        extensions (Union[list, dict], optional): The extensions
+
+    Raises:
+        _EX.SignatureNotPossibleException: The shared fields or CA key are invalid
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        ca_privkey: PrivateKey,
+        cert_type: Union[_FIELD.CERT_TYPE, int] = _FIELD.CERT_TYPE.USER,
+        principals: list = None,
+        critical_options: Union[list, dict] = None,
+        extensions: Union[list, dict] = None,
+    ):
+        # The shared fields are copied, so that they always match the encoded bytes
+        self._ca_privkey = ca_privkey
+        self._cert_type_value = cert_type
+        self._principal_values = tuple(principals or ())
+        self._critical_options = deepcopy(critical_options or [])
+        self._extensions = deepcopy(extensions or [])
+
+        # The shared fields keep their encoded bytes, which their clones share
+        self._shared_fields = {
+            "cert_type": _FIELD.CertificateTypeField(cert_type),
+            "principals": _FIELD.PrincipalsField(list(self._principal_values)),
+            "critical_options": _FIELD.CriticalOptionsField(self.critical_options),
+            "extensions": _FIELD.ExtensionsField(self.extensions),
+            "reserved": _FIELD.ReservedField(""),
+            "ca_pubkey": _FIELD.CAPublicKeyField(ca_privkey.public_key),
+        }
+        shared = tuple(self._shared_fields.values())
+        self._validate(shared)
+
+        cert_type, principals, critical_options, extensions, reserved, ca_pubkey = (
+            bytes(field) for field in shared
+        )
+        self._cert_type = cert_type
+        self._principals = principals
+        self._tail = concat_to_bytestring(
+            critical_options, extensions, reserved, ca_pubkey
+        )
+
+    @property
+    def ca_privkey(self) -> PrivateKey:
+        """The CA private key the certificates are signed with"""
+        return self._ca_privkey
+
+    @property
+    def cert_type(self) -> Union[_FIELD.CERT_TYPE, int]:
+        """The certificate type of the issued certificates"""
+        return self._cert_type_value
+
+    @property
+    def principals(self) -> tuple:
+        """The principals of the issued certificates"""
+        return self._principal_values
+
+    @property
+    def critical_options(self) -> Union[list, dict]:
+        """A copy of the critical options of the issued certificates"""
+        return deepcopy(self._critical_options)
+
+    @property
+    def extensions(self) -> Union[list, dict]:
+        """A copy of the extensions of the issued certificates"""
+        return deepcopy(self._extensions)
+
+    @staticmethod
+    def _validate(fields: tuple) -> None:
+        exceptions = []
+        for field in fields:
+            valid = field.validate()
+            if valid is True:
+                continue
+
+            if isinstance(valid, Exception):
+                exceptions.append(valid)
+            else:
+                exceptions += [
+                    ex for ex in field.exception if isinstance(ex, Exception)
+                ]
+
+        if exceptions:
+            raise _EX.SignatureNotPossibleException(
+                "\n".join([str(e) for e in exceptions])
+            )
+
+    def _get_signable(self, certificate: SSHCertificate) -> bytes:
+        fields = certificate.fields
+        return concat_to_bytestring(
+            bytes(certificate.header),
+            bytes(fields.serial),
+            self._cert_type,
+            bytes(fields.key_id),
+            self._principals,
+            bytes(fields.valid_after),
+            bytes(fields.valid_before),
+            self._tail,
+        )
+
+    # pylint: disable=too-many-arguments
+    def issue(
+        self,
+        subject_pubkey: PublicKey,
+        serial: int = None,
+        key_id: str = None,
+        valid_after: Union[datetime, int] = None,
+        valid_before: Union[datetime, int] = None,
+    ) -> SSHCertificate:
+        """
+        Creates and signs a new certificate from the template
+
+        Args:
+            subject_pubkey (PublicKey): The subject public key
+            serial (int, optional): The serial number. Defaults to a random serial.
+            key_id (str, optional): The key identifier. Defaults to a random UUID.
+            valid_after (Union[datetime, int], optional): Start of the validity period.
+            valid_before (Union[datetime, int], optional): End of the validity period.
+
+        Raises:
+            _EX.SignatureNotPossibleException: The certificate fields are invalid
+
+        Returns:
+            SSHCertificate: The signed certificate
+        """
+        shared = {name: field.clone() for name, field in self._shared_fields.items()}
+        fields = CertificateFields(
+            cert_type=shared["cert_type"],
+            principals=shared["principals"],
+            critical_options=shared["critical_options"],
+            extensions=shared["extensions"],
+        )
+
+        for name, value in (
+            ("serial", serial),
+            ("key_id", key_id),
+            ("valid_after", valid_after),
+            ("valid_before", valid_before),
+        ):
+            if value is not None:
+                setattr(fields, name, value)
+
+        certificate = SSHCertificate.create(
+            subject_pubkey=subject_pubkey,
+            ca_privkey=self._ca_privkey,
+            fields=fields,
+            footer=CertificateFooter(
+                reserved=shared["reserved"],
+                ca_pubkey=shared["ca_pubkey"],
+                signature=_FIELD.SignatureField.from_object(self._ca_privkey),
+            ),
+        )
+
+        self._validate(
+            (
+                certificate.header.pubkey_type,
+                certificate.header.nonce,
+                certificate.header.public_key,
+                fields.serial,
+                fields.key_id,
+                fields.valid_after,
+                fields.valid_before,
+            )
+        )
+
+        certificate.footer.signature.sign(data=self._get_signable(certificate))
+        return certificate
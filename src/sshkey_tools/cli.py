@@ -0,0 +1,312 @@
+"""
+The sshkey command line tool, for signing, inspecting and verifying
+keys and certificates in bulk. Requests are read line by line from files
+or stdin and the results are written as JSON lines, in completion order.
+"""
+import json
+import sys
+import time
+from typing import Iterable, Iterator, TextIO, Tuple
+
+import click
+
+from .batch import BatchResult, imap_unordered
+from .cert import CertificateTemplate, SSHCertificate
+from .fields import CERT_TYPE
+from .keys import PrivateKey, PublicKey
+from .utils import ensure_string, sha256_fingerprint, to_timestamp
+from .verifier import CertificateVerifier
+
+CERTIFICATE_SUFFIX = "-cert-v01@openssh.com"
+CERT_TYPES = {"user": CERT_TYPE.USER, "host": CERT_TYPE.HOST}
+
+# The request fields that are shared by all certificates issued from the template
+TEMPLATE_FIELDS = ("cert_type", "principals", "critical_options", "extensions")
+
+# The state of each worker, set by the pool initializer
+_WORKER = {}
+
+
+def _read_lines(inputs: Iterable[TextIO]) -> Iterator[Tuple[str, int, str]]:
+    for file in inputs:
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield file.name, number, line
+
+
+def _write_results(results: Iterable[BatchResult]) -> int:
+    failed = 0
+    for item in results:
+        name, number, _ = item.source
+        output = {"file": name, "line": number}
+
+        if item.ok:
+            output.update(item.result)
+        else:
+            failed += 1
+            output["error"] = f"{type(item.exception).__name__}: {item.exception}"
+
+        sys.stdout.write(json.dumps(output, default=str) + "\n")
+
+    sys.stdout.flush()
+    return failed
+
+
+def _init_sign_worker(key_data: bytes, password: str, options: dict) -> None:
+    ca_privkey = PrivateKey.from_string(key_data, password)
+
+    _WORKER["ca_privkey"] = ca_privkey
+    _WORKER["options"] = options
+    _WORKER["template"] = CertificateTemplate(
+        ca_privkey,
+        **{name: options[name] for name in TEMPLATE_FIELDS},
+    )
+
+
+def _init_verify_worker(verifier: CertificateVerifier) -> None:
+    _WORKER["verifier"] = verifier
+
+
+def _sign_request(item: Tuple[str, int, str]) -> dict:
+    _, _, line = item
+    request = json.loads(line) if line.startswith("{") else {"public_key": line}
+    options = _WORKER["options"]
+
+    subject_pubkey = PublicKey.from_string(request["public_key"])
+    valid_after = request.get("valid_after", int(time.time()))
+    fields = {
+        "serial": request.get("serial"),
+        "key_id": request.get("key_id", ensure_string(subject_pubkey.comment)),
+        "valid_after": valid_after,
+        "valid_before": request.get("valid_before", valid_after + options["validity"]),
+    }
+
+    if "cert_type" in request:
+        request["cert_type"] = CERT_TYPES[request["cert_type"]]
+
+    if any(name in request for name in TEMPLATE_FIELDS):
+        certificate = SSHCertificate.create(
+            subject_pubkey=subject_pubkey, ca_privkey=_WORKER["ca_privkey"]
+        )
+        for name in TEMPLATE_FIELDS:
+            certificate.set(name, request.get(name, options[name]))
+
+        for name, value in fields.items():
+            if value is not None:
+                certificate.set(name, value)
+
+        certificate.sign()
+    else:
+        certificate = _WORKER["template"].issue(subject_pubkey, **fields)
+
+    return {
+        "key_id": certificate.get("key_id"),
+        "serial": certificate.get("serial"),
+        "certificate": certificate.to_string(request.get("comment", "")).strip(),
+    }
+
+
+def _describe_certificate(certificate: SSHCertificate) -> dict:
+    return {
+        "type": "certificate",
+        "key_type": certificate.get("pubkey_type"),
+        "public_key": certificate.get("public_key").get_fingerprint(),
+        "ca": sha256_fingerprint(certificate.footer.ca_pubkey.raw_bytes()),
+        "serial": certificate.get("serial"),
+        "cert_type": CERT_TYPE(certificate.get("cert_type")).name.lower(),
+        "key_id": certificate.get("key_id"),
+        "principals": certificate.get("principals"),
+        "valid_after": to_timestamp(certificate.get("valid_after")),
+        "valid_before": to_timestamp(certificate.get("valid_before")),
+        "critical_options": certificate.get("critical_options"),
+        "extensions": certificate.get("extensions"),
+    }
+
+
+def _inspect_line(item: Tuple[str, int, str]) -> dict:
+    _, _, line = item
+
+    if CERTIFICATE_SUFFIX in line.split(" ", 1)[0]:
+        certificate = SSHCertificate.from_string(line, lazy=True)
+        output = _describe_certificate(certificate)
+        output["signature_valid"] = certificate.verify()
+        return output
+
+    public_key = PublicKey.from_string(line)
+    return {
+        "type": "public_key",
+        "key_type": line.split(" ", 1)[0],
+        "public_key": public_key.get_fingerprint(),
+        "comment": ensure_string(public_key.comment),
+    }
+
+
+def _verify_line(item: Tuple[str, int, str]) -> dict:
+    _, _, line = item
+    certificate = _WORKER["verifier"].check(line)
+
+    return {
+        "key_id": certificate.get("key_id"),
+        "serial": certificate.get("serial"),
+        "ca": sha256_fingerprint(certificate.footer.ca_pubkey.raw_bytes()),
+    }
+
+
+# pylint: disable=too-many-arguments
+def _run(
+    function, inputs, workers, threads, max_pending, *, initializer=None, initargs=()
+):
+    results = imap_unordered(
+        function,
+        _read_lines(inputs or [sys.stdin]),
+        workers,
+        not threads,
+        max_pending,
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+    if _write_results(results):
+        sys.exit(1)
+
+
+def _pool_options(function):
+    function = click.option(
+        "--max-pending",
+        type=int,
+        help="Maximum number of lines in flight. Defaults to four per worker.",
+    )(function)
+    function = click.option(
+        "--threads",
+        is_flag=True,
+        help="Use a pool of threads instead of processes.",
+    )(function)
+    function = click.option(
+        "-w",
+        "--workers",
+        type=int,
+        help="Number of workers. Defaults to the number of CPUs.",
+    )(function)
+    return click.argument("inputs", nargs=-1, type=click.File("r"))(function)
+
+
+@click.group()
+def main():
+    """
+    Sign, inspect and verify SSH keys and certificates in bulk.
+
+    Each command reads one item per line from the given files, or from stdin,
+    and writes one JSON object per line with the file and line number of the
+    item and the result, or the error. The exit code is 1 if any item failed.
+    """
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+@main.command()
+@click.option("--ca", "ca_path", required=True, help="The CA private key file.")
+@click.option("--ca-password", envvar="SSHKEY_CA_PASSWORD", help="The CA key password.")
+@click.option("--host", is_flag=True, help="Issue host instead of user certificates.")
+@click.option("-n", "--principal", "principals", multiple=True, help="A principal.")
+@click.option(
+    "-O",
+    "--option",
+    "critical_options",
+    multiple=True,
+    help="A critical option, as name=value.",
+)
+@click.option("-e", "--extension", "extensions", multiple=True, help="An extension.")
+@click.option(
+    "--validity",
+    type=int,
+    default=600,
+    show_default=True,
+    help="Seconds the certificates are valid from valid_after.",
+)
+@_pool_options
+def sign(
+    ca_path,
+    ca_password,
+    host,
+    principals,
+    critical_options,
+    extensions,
+    validity,
+    inputs,
+    workers,
+    threads,
+    max_pending,
+):
+    """
+    Issue certificates for public keys.
+
+    Each line is either a public key, or a JSON object with the public_key
+    and optionally key_id, serial, valid_after, valid_before (unix time),
+    cert_type ("user" or "host"), principals, critical_options, extensions
+    and comment. The key_id defaults to the comment of the public key.
+    """
+    with open(ca_path, "rb") as file:
+        key_data = file.read()
+
+    options = {
+        "cert_type": CERT_TYPE.HOST if host else CERT_TYPE.USER,
+        "principals": list(principals),
+        "critical_options": dict(
+            option.split("=", 1) if "=" in option else (option, "")
+            for option in critical_options
+        ),
+        "extensions": list(extensions),
+        "validity": validity,
+    }
+
+    _run(
+        _sign_request,
+        inputs,
+        workers,
+        threads,
+        max_pending,
+        initializer=_init_sign_worker,
+        initargs=(key_data, ca_password, options),
+    )
+
+
+@main.command()
+@_pool_options
+def inspect(inputs, workers, threads, max_pending):
+    """
+    Describe public keys and certificates.
+
+    Certificates are checked against the CA key they contain,
+    use the verify command to check them against trusted CA keys.
+    """
+    _run(_inspect_line, inputs, workers, threads, max_pending)
+
+
+@main.command()
+@click.option(
+    "--ca",
+    "ca_paths",
+    required=True,
+    multiple=True,
+    help="A trusted CA public key file, can be given multiple times.",
+)
+@_pool_options
+def verify(ca_paths, inputs, workers, threads, max_pending):
+    """
+    Verify certificates against trusted CA public keys.
+    """
+    verifier = CertificateVerifier(PublicKey.from_file(path) for path in ca_paths)
+
+    _run(
+        _verify_line,
+        inputs,
+        workers,
+        threads,
+        max_pending,
+        initializer=_init_verify_worker,
+        initargs=(verifier,),
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
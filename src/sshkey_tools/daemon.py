@@ -0,0 +1,567 @@
+"""
+A long-running signing daemon, serving sign and verify requests over a
+local Unix domain socket, and the client for it.
+
+The CA private key is loaded once when the daemon starts, and requests are
+handled by a pool of workers. Each message is a single frame:
+
+    uint32  length of the rest of the frame
+    byte    message type
+    uint32  request id
+    byte[]  payload
+
+Sign requests contain the subject public key as a string, followed by the
+certificate fields in the certificate wire format. Verify requests contain
+a certificate in the wire format. The response repeats the request id, so
+a client can send several requests before reading the responses, which are
+written in the order they complete.
+"""
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+from functools import partial
+from typing import Iterable, List, Tuple, Union
+
+from . import exceptions as _EX
+from .batch import BatchResult, create_executor
+from .cert import CertificateFields, SSHCertificate
+from .keys import PrivateKey, PublicKey
+from .utils import WireReader, concat_to_bytestring, encode_string
+from .verifier import CertificateVerifier
+
+MSG_SIGN = 1
+MSG_VERIFY = 2
+
+MSG_OK = 0
+MSG_ERROR = 1
+MSG_INVALID = 2
+
+FRAME_HEADER = struct.Struct(">IBI")
+MAX_FRAME_SIZE = 1024 * 1024
+
+# Validity of certificates requested without fields, in seconds
+DEFAULT_VALIDITY = 600
+
+# Unix domain sockets are not available on Windows
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+# The request handler of each worker process, set by the pool initializer
+_WORKER_HANDLER = None
+
+
+def _check_unix_sockets() -> None:
+    if not HAS_UNIX_SOCKETS:
+        raise OSError("Unix domain sockets are not supported on this platform")
+
+
+def _encode_frame(message_type: int, request_id: int, payload: bytes) -> bytes:
+    length = FRAME_HEADER.size - 4 + len(payload)
+    return FRAME_HEADER.pack(length, message_type, request_id) + payload
+
+
+def _read_frame(file) -> Tuple[int, int, bytes]:
+    header = file.read(FRAME_HEADER.size)
+    if not header:
+        return None
+
+    if len(header) < FRAME_HEADER.size:
+        raise _EX.InvalidDataException("Connection closed in the middle of a frame")
+
+    length, message_type, request_id = FRAME_HEADER.unpack(header)
+    size = length + 4 - FRAME_HEADER.size
+    if size < 0 or length > MAX_FRAME_SIZE:
+        raise _EX.InvalidDataException(f"Invalid frame length {length}")
+
+    payload = file.read(size)
+    if len(payload) < size:
+        raise _EX.InvalidDataException("Connection closed in the middle of a frame")
+
+    return message_type, request_id, payload
+
+
+class _RequestHandler:
+    """Handles the payload of one request, in a worker of the daemon"""
+
+    def __init__(self, ca_privkey: PrivateKey, verifier: CertificateVerifier):
+        self.ca_privkey = ca_privkey
+        self.verifier = verifier
+
+    def __call__(self, message_type: int, payload: bytes) -> Tuple[int, bytes]:
+        try:
+            if message_type == MSG_SIGN:
+                return MSG_OK, self.sign(payload)
+
+            if message_type == MSG_VERIFY:
+                self.verifier.check(payload)
+                return MSG_OK, b""
+
+            raise _EX.InvalidDataException(f"Unknown message type {message_type}")
+        except (
+            _EX.InvalidCertificateFormatException,
+            _EX.InvalidSignatureException,
+        ) as exception:
+            return MSG_INVALID, str(exception).encode("utf-8")
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            return MSG_ERROR, f"{type(exception).__name__}: {exception}".encode("utf-8")
+
+    def sign(self, payload: bytes) -> bytes:
+        """
+        Issues a certificate from a sign request
+
+        Args:
+            payload (bytes): The subject public key and the certificate fields
+
+        Returns:
+            bytes: The signed certificate in the wire format
+        """
+        reader = WireReader(payload)
+        subject_pubkey = PublicKey.from_wire(reader.read_string())
+        fields = CertificateFields.from_reader(reader)
+
+        if not reader.at_end():
+            raise _EX.InvalidDataException(
+                "Unexpected data after the certificate fields"
+            )
+
+        certificate = SSHCertificate.create(
+            subject_pubkey=subject_pubkey, ca_privkey=self.ca_privkey, fields=fields
+        )
+        certificate.sign()
+
+        return bytes(certificate)
+
+
+def _init_worker(key_data: bytes, verifier: CertificateVerifier) -> None:
+    # pylint: disable=global-statement
+    global _WORKER_HANDLER
+    _WORKER_HANDLER = _RequestHandler(PrivateKey.from_string(key_data), verifier)
+
+
+def _handle_in_worker(message_type: int, payload: bytes) -> Tuple[int, bytes]:
+    return _WORKER_HANDLER(message_type, payload)
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.done = threading.Condition(self.lock)
+        self.server.connections.add(self.request)
+
+    def handle(self):
+        try:
+            with self.request.makefile("rb") as file:
+                while True:
+                    frame = _read_frame(file)
+                    if frame is None:
+                        break
+
+                    message_type, request_id, payload = frame
+                    future = self.server.submit(message_type, payload)
+
+                    with self.lock:
+                        self.pending += 1
+                    future.add_done_callback(partial(self._respond, request_id))
+        except (OSError, RuntimeError, _EX.InvalidDataException):
+            return
+
+        # Responses are still written after the client stops sending
+        with self.done:
+            self.done.wait_for(lambda: self.pending == 0)
+
+    def _respond(self, request_id: int, future) -> None:
+        try:
+            status, payload = future.result()
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            status = MSG_ERROR
+            payload = f"{type(exception).__name__}: {exception}".encode("utf-8")
+
+        with self.done:
+            try:
+                self.request.sendall(_encode_frame(status, request_id, payload))
+            except OSError:
+                pass
+
+            self.pending -= 1
+            self.done.notify_all()
+
+    def finish(self):
+        self.server.connections.discard(self.request)
+
+
+if HAS_UNIX_SOCKETS:
+
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        block_on_close = False
+
+        def __init__(self, path: str, submit):
+            self.submit = submit
+            self.connections = set()
+            super().__init__(path, _ConnectionHandler)
+
+        def close_connections(self) -> None:
+            """Shuts down the open client connections"""
+            for connection in list(self.connections):
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+class SigningDaemon:  # pylint: disable=too-many-instance-attributes
+    """
+    Serves sign and verify requests for one CA over a Unix domain socket.
+
+    The CA private key is loaded once, and the requests of all connections
+    are handled by a shared pool of workers. Certificates are verified
+    against the CA key and the additional trusted CA keys.
+
+    The socket file is only accessible to the owner (mode 0600 by default),
+    the directory containing it should be private as well. For process pools,
+    the CA key is sent unencrypted to each worker process once, when the
+    pool is started.
+
+    Args:
+        path (str): The path of the socket
+        ca_privkey (PrivateKey): The CA private key to sign with
+        trusted_ca_pubkeys (Iterable[PublicKey], optional): Additional CA keys
+            trusted for verify requests
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                        Defaults to False.
+        mode (int, optional): The permissions of the socket file. Defaults to 0o600.
+
+    Raises:
+        OSError: Unix domain sockets are not supported on this platform
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        path: str,
+        ca_privkey: PrivateKey,
+        trusted_ca_pubkeys: Iterable[PublicKey] = (),
+        *,
+        workers: int = None,
+        use_processes: bool = False,
+        mode: int = 0o600,
+    ):
+        _check_unix_sockets()
+
+        self.path = path
+        self.ca_privkey = ca_privkey
+        self.workers = workers
+        self.use_processes = use_processes
+        self.mode = mode
+
+        self.verifier = CertificateVerifier(trusted_ca_pubkeys)
+        self.verifier.add_ca(ca_privkey.public_key)
+
+        self._executor = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def _remove_stale_socket(self) -> None:
+        try:
+            if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+                return
+        except FileNotFoundError:
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except ConnectionRefusedError:
+                os.unlink(self.path)
+                return
+
+        raise OSError(f"Another daemon is listening on {self.path}")
+
+    def bind(self) -> None:
+        """
+        Starts the worker pool and binds the socket, without serving requests
+
+        Raises:
+            OSError: The socket could not be created, or another daemon is
+                     listening on the path
+        """
+        self._remove_stale_socket()
+
+        if self.use_processes:
+            self._executor = create_executor(
+                self.workers,
+                True,
+                _init_worker,
+                (self.ca_privkey.to_bytes(), self.verifier),
+            )
+            submit = partial(self._executor.submit, _handle_in_worker)
+        else:
+            handler = _RequestHandler(self.ca_privkey, self.verifier)
+            self._executor = create_executor(self.workers, False)
+            submit = partial(self._executor.submit, handler)
+
+        # Bind under a restrictive umask, so the socket is never accessible
+        # to others before its mode is set
+        umask = os.umask(0o177)
+        try:
+            # Only defined with Unix domain sockets, checked in __init__
+            # pylint: disable=possibly-used-before-assignment
+            self._server = _UnixServer(self.path, submit)
+            os.chmod(self.path, self.mode)
+        except OSError:
+            self._executor.shutdown()
+            raise
+        finally:
+            os.umask(umask)
+
+    def serve_forever(self) -> None:
+        """
+        Serves requests until shutdown is called from another thread
+        """
+        if self._server is None:
+            self.bind()
+
+        self._server.serve_forever()
+
+    def start(self) -> None:
+        """
+        Serves requests in a background thread
+        """
+        self.bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """
+        Stops serving, closes the client connections and removes the socket
+        """
+        if self._server is None:
+            return
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+        self._server.close_connections()
+        self._executor.shutdown(wait=True)
+        self._server = None
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class SigningClient:
+    """
+    Client for a SigningDaemon, over a single connection.
+    The client can be shared between threads, requests are sent one at a time.
+
+    Args:
+        path (str): The path of the daemon socket
+        timeout (float, optional): Socket timeout in seconds. Defaults to no timeout.
+
+    Raises:
+        OSError: The daemon could not be reached, or Unix domain sockets are
+                 not supported on this platform
+    """
+
+    def __init__(self, path: str, timeout: float = None):
+        _check_unix_sockets()
+
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+
+        self._file = self._socket.makefile("rb")
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the daemon"""
+        self._file.close()
+        self._socket.close()
+
+    def _send(self, message_type: int, payload: bytes) -> int:
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+
+        self._socket.sendall(_encode_frame(message_type, request_id, payload))
+        return request_id
+
+    def _receive(self) -> Tuple[int, int, bytes]:
+        frame = _read_frame(self._file)
+        if frame is None:
+            raise ConnectionError("The signing daemon closed the connection")
+
+        status, request_id, payload = frame
+        return request_id, status, payload
+
+    def _request(self, message_type: int, payload: bytes) -> Tuple[int, bytes]:
+        with self._lock:
+            self._send(message_type, payload)
+            _, status, response = self._receive()
+
+        return status, response
+
+    @staticmethod
+    def _encode_sign(
+        subject_pubkey: PublicKey, fields: CertificateFields, values: dict
+    ) -> bytes:
+        if fields is None:
+            now = int(time.time())
+            fields = CertificateFields(
+                valid_after=now, valid_before=now + DEFAULT_VALIDITY
+            )
+        elif values:
+            # The values are set on a copy, the caller's fields are left as they are
+            fields = CertificateFields(
+                **{
+                    name: getattr(fields, name).clone()
+                    for name in CertificateFields.ENCODE_ORDER
+                }
+            )
+
+        for name, value in values.items():
+            setattr(fields, name, value)
+
+        return concat_to_bytestring(
+            encode_string(subject_pubkey.raw_bytes()), bytes(fields)
+        )
+
+    @staticmethod
+    def _decode_certificate(status: int, payload: bytes) -> SSHCertificate:
+        if status != MSG_OK:
+            raise _EX.DaemonRequestException(payload.decode("utf-8", "replace"))
+
+        return SSHCertificate.from_bytes(payload)
+
+    def sign(
+        self, subject_pubkey: PublicKey, fields: CertificateFields = None, **values
+    ) -> SSHCertificate:
+        """
+        Requests a certificate for a public key
+
+        Args:
+            subject_pubkey (PublicKey): The subject public key
+            fields (CertificateFields, optional): The certificate fields.
+                Defaults to new fields valid from now for ten minutes.
+            **values: Field values to set, e.g. key_id or principals
+
+        Raises:
+            _EX.DaemonRequestException: The daemon could not issue the certificate
+
+        Returns:
+            SSHCertificate: The signed certificate
+        """
+        payload = self._encode_sign(subject_pubkey, fields, values)
+        return self._decode_certificate(*self._request(MSG_SIGN, payload))
+
+    def sign_many(
+        self,
+        requests: Iterable[Union[PublicKey, Tuple[PublicKey, CertificateFields]]],
+        max_pending: int = 64,
+    ) -> List[BatchResult]:
+        """
+        Requests certificates for a batch of public keys. Up to max_pending
+        requests are sent before waiting for the responses, so the workers
+        of the daemon are kept busy.
+
+        Args:
+            requests (Iterable[Union[PublicKey, Tuple[PublicKey, CertificateFields]]]):
+                The subject public keys, optionally with their certificate fields
+            max_pending (int, optional): Maximum number of requests in flight.
+                                         Defaults to 64.
+
+        Returns:
+            List[BatchResult]: One result per request, in input order, with the
+                               subject public key as source and the signed
+                               certificate as result
+        """
+        results = []
+        pending = {}
+
+        with self._lock:
+            for request in requests:
+                subject_pubkey, fields = (
+                    request if isinstance(request, tuple) else (request, None)
+                )
+                item = BatchResult(source=subject_pubkey)
+                results.append(item)
+
+                try:
+                    payload = self._encode_sign(subject_pubkey, fields, {})
+                except Exception as exception:  # pylint: disable=broad-exception-caught
+                    item.exception = exception
+                    continue
+
+                if len(pending) >= max_pending:
+                    self._collect(pending)
+
+                pending[self._send(MSG_SIGN, payload)] = item
+
+            while pending:
+                self._collect(pending)
+
+        return results
+
+    def _collect(self, pending: dict) -> None:
+        request_id, status, payload = self._receive()
+        item = pending.pop(request_id)
+
+        try:
+            item.result = self._decode_certificate(status, payload)
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            item.exception = exception
+
+    def verify(
+        self, certificate: Union[SSHCertificate, bytes], raise_on_error: bool = False
+    ) -> bool:
+        """
+        Verifies a certificate against the CA keys trusted by the daemon
+
+        Args:
+            certificate (Union[SSHCertificate, bytes]): The certificate, or its wire format
+            raise_on_error (bool, default False): Raise an exception if the
+                                                  certificate is invalid
+
+        Raises:
+            _EX.InvalidSignatureException: The certificate cannot be parsed or
+                                           is not signed by a trusted CA
+            _EX.DaemonRequestException: The daemon could not handle the request
+
+        Returns:
+            bool: True if the certificate is signed by a trusted CA
+        """
+        status, payload = self._request(MSG_VERIFY, bytes(certificate))
+
+        if status == MSG_INVALID:
+            if raise_on_error:
+                raise _EX.InvalidSignatureException(payload.decode("utf-8", "replace"))
+            return False
+
+        if status != MSG_OK:
+            raise _EX.DaemonRequestException(payload.decode("utf-8", "replace"))
+
+        return True
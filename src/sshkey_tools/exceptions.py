@@ -107,3 +107,9 @@ class InvalidClassCallException(ValueError):
     """
     Raised when trying to instantiate a parent class
     """
+
+
+class DaemonRequestException(ValueError):
+    """
+    Raised when the signing daemon fails to handle a request
+    """
@@ -3,11 +3,11 @@ Field types for SSH Certificates
 """
 # pylint: disable=invalid-name,too-many-lines,arguments-differ
 import re
-from base64 import b64encode
+from copy import copy
 from datetime import datetime, timedelta
 from enum import Enum
-from struct import pack, unpack
-from typing import Tuple, Union
+from struct import pack
+from typing import List, Tuple, Union
 
 from cryptography.hazmat.primitives.asymmetric.utils import (
     decode_dss_signature,
@@ -29,8 +29,9 @@ from .keys import (
     RsaPublicKey,
 )
 from .utils import (
+    WireReader,
     bytes_to_long,
-    concat_to_string,
+    encode_string,
     ensure_bytestring,
     ensure_string,
     generate_secure_nonce,
@@ -81,21 +82,141 @@ class CERT_TYPE(Enum):
     HOST = 2
 
 
+# Maps the certificate attribute names to the field classes that decode them,
+# populated as the classes defined with an attribute name are created
+FIELD_REGISTRY = {}
+
+# Values of these types can be changed in place, so a copy is kept when encoding
+MUTABLE_TYPES = (list, dict, set, bytearray)
+
+
+class _InstanceFlag:  # pylint: disable=too-few-public-methods
+    """
+    Evaluates to None on a field class and True on a field instance,
+    to tell set fields apart from the blank classes in a Fieldset
+    """
+
+    def __get__(self, instance, owner):
+        return None if instance is None else True
+
+
 class CertificateField:
     """
     The base class for certificate fields
     """
 
-    IS_SET = None
+    __slots__ = ("_value", "_encoded", "exception")
+
+    IS_SET = _InstanceFlag()
     DEFAULT = None
     REQUIRED = False
     DATA_TYPE = NoneType
+    name = "certificate"
 
     def __init__(self, value=None):
+        self._encoded = None
         self.value = value
         self.exception = None
-        self.IS_SET = True
-        self.name = self.get_name()
+
+    @property
+    def value(self):
+        """
+        The value of the field
+        """
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._encoded = None
+        self._value = value
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        True if the value may have changed since the field was last encoded
+        or decoded. Decoded fields only keep the length of their bytes, so
+        values that can be changed in place count as changed until encoded.
+        """
+        encoded = self._encoded
+        if encoded is None:
+            return True
+
+        if isinstance(encoded, int):
+            return isinstance(self._value, MUTABLE_TYPES)
+
+        return encoded[1] is not None and encoded[1] != self._value
+
+    @property
+    def decoded_size(self) -> int:
+        """
+        The length of the bytes the field was decoded from,
+        None if the field has been changed or encoded since
+        """
+        encoded = self._encoded
+        return encoded if isinstance(encoded, int) else None
+
+    def _get_cached(self) -> bytes:
+        encoded = self._encoded
+        if isinstance(encoded, tuple) and not self.is_dirty:
+            return encoded[0]
+
+        return None
+
+    @staticmethod
+    def _copy_value(value):
+        if isinstance(value, dict):
+            return {
+                key: copy(item) if isinstance(item, MUTABLE_TYPES) else item
+                for key, item in value.items()
+            }
+
+        return copy(value) if isinstance(value, MUTABLE_TYPES) else None
+
+    def _set_encoded(self, data: bytes) -> bytes:
+        self._encoded = (data, self._copy_value(self._value))
+        return data
+
+    def clone(self) -> "CertificateField":
+        """
+        Returns a copy of the field with its own copy of the value,
+        sharing the encoded bytes until either value is changed
+
+        Returns:
+            CertificateField: The copy of the field
+        """
+        state = {
+            name: getattr(self, name)
+            for klass in type(self).__mro__
+            for name in getattr(klass, "__slots__", ())
+            if hasattr(self, name)
+        }
+        if isinstance(self._value, MUTABLE_TYPES):
+            state["_value"] = self._copy_value(self._value)
+
+        return self._from_state(state)
+
+    @classmethod
+    def _from_state(cls, state: dict) -> "CertificateField":
+        # Creates a field from the values of its slots, without validating them
+        field = cls.__new__(cls)
+        for name, value in state.items():
+            setattr(field, name, value)
+
+        return field
+
+    def __init_subclass__(cls, attribute: str = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "name" not in cls.__dict__:
+            cls.name = "_".join(re.findall("[A-Z][^A-Z]*", cls.__name__)[:-1]).lower()
+
+        if attribute is not None:
+            if attribute in FIELD_REGISTRY:
+                raise _EX.InvalidCertificateFieldException(
+                    f"The certificate attribute {attribute} is already registered "
+                    f"({FIELD_REGISTRY[attribute].__name__})"
+                )
+
+            FIELD_REGISTRY[attribute] = cls
 
     def __table__(self):
         return (str(self.name), str(self.value))
@@ -104,7 +225,11 @@ class CertificateField:
         return f"{self.name}: {self.value}"
 
     def __bytes__(self) -> bytes:
-        return self.encode(self.value)
+        data = self._get_cached()
+        if data is None:
+            data = self._set_encoded(self.encode(self.value))
+
+        return data
 
     @classmethod
     def get_name(cls) -> str:
@@ -114,7 +239,7 @@ class CertificateField:
         Returns:
             str: The name/id of the field
         """
-        return "_".join(re.findall("[A-Z][^A-Z]*", cls.__name__)[:-1]).lower()
+        return cls.name
 
     @classmethod
     def __validate_type__(cls, value, do_raise: bool = False) -> Union[bool, Exception]:
@@ -123,7 +248,7 @@ class CertificateField:
         """
         if not isinstance(value, cls.DATA_TYPE):
             ex = _EX.InvalidDataException(
-                f"Invalid data type for {cls.get_name()}"
+                f"Invalid data type for {cls.name}"
                 + f"(expected {cls.DATA_TYPE}, got {type(value)})"
             )
 
@@ -139,9 +264,7 @@ class CertificateField:
         Validates if the field is set when required
         """
         if self.DEFAULT == self.value is None:
-            return _EX.InvalidFieldDataException(
-                f"{self.get_name()} is a required field"
-            )
+            return _EX.InvalidFieldDataException(f"{self.name} is a required field")
         return True
 
     def __validate_value__(self) -> Union[bool, Exception]:
@@ -168,17 +291,66 @@ class CertificateField:
         return self.exception == (True, True, True)
 
     @staticmethod
-    def decode(data: bytes) -> tuple:
+    def read(reader: WireReader):
         """
-        Returns the decoded value of the field
+        Reads the value of the field from the current position of a WireReader
         """
 
+    @classmethod
+    def decode(cls, data: bytes) -> tuple:
+        """
+        Returns the decoded value of the field and the remainder of the data
+        """
+        reader = WireReader(data)
+        return cls.read(reader), reader.rest()
+
     @classmethod
     def encode(cls, value) -> bytes:
         """
         Returns the encoded value of the field
         """
 
+    def encoded_size(self) -> int:
+        """
+        Returns the length of the encoded field in bytes
+        """
+        return len(bytes(self))
+
+    def write_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """
+        Writes the encoded field into a buffer
+
+        Args:
+            buffer (bytearray): A writable buffer with room for the field
+            offset (int, optional): The position in the buffer to write at.
+                                    Defaults to 0.
+
+        Returns:
+            int: The position in the buffer after the field
+        """
+        data = bytes(self)
+        end = offset + len(data)
+        buffer[offset:end] = data
+        return end
+
+    @classmethod
+    def from_reader(cls, reader: WireReader) -> "CertificateField":
+        """
+        Creates a field class from the current position of a WireReader
+
+        Args:
+            reader (WireReader): The reader positioned at the start of the field
+
+        Returns:
+            CertificateField: A new CertificateField subclass instance
+        """
+        start = reader.offset
+        field = cls(cls.read(reader))
+
+        # Only the length is kept, the certificate holds the bytes as read
+        field._encoded = reader.offset - start
+        return field
+
     @classmethod
     def from_decode(cls, data: bytes) -> Tuple["CertificateField", bytes]:
         """
@@ -187,8 +359,8 @@ class CertificateField:
         Returns:
             tuple: CertificateField, remaining bytes
         """
-        value, data = cls.decode(data)
-        return cls(value), data
+        reader = WireReader(data)
+        return cls.from_reader(reader), reader.rest()
 
     @classmethod
     # pylint: disable=not-callable
@@ -211,11 +383,111 @@ class CertificateField:
         return cls(cls.DEFAULT)
 
 
+class LazyField(CertificateField):
+    """
+    Base class for the key and signature fields, which can keep their encoded
+    bytes when decoded and only decode the value when it is first accessed
+    """
+
+    __slots__ = ("_pending",)
+
+    # The number of SSH strings/mpints the encoded field consists of
+    WIRE_STRINGS = 1
+
+    @property
+    def value(self):
+        """
+        The value of the field, decoded from the encoded bytes on first access
+        """
+        if self._pending is not None:
+            self._value = self.decode_pending(self._pending)
+            self._pending = None
+
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._pending = None
+        self._encoded = None
+        self._value = value
+
+    @property
+    def is_pending(self) -> bool:
+        """
+        True if the value is kept encoded and has not been decoded yet
+        """
+        return self._pending is not None
+
+    def set_pending(self, data: bytes) -> None:
+        """
+        Sets the encoded field, to be decoded when the value is accessed
+
+        Args:
+            data (bytes): The encoded field
+        """
+        self._value = None
+        self._pending = data
+        self._encoded = len(data)
+
+    def __bytes__(self) -> bytes:
+        if self._pending is not None:
+            return self._pending
+
+        return super().__bytes__()
+
+    def decode_pending(self, data: bytes):
+        """
+        Decodes the value from the encoded field
+
+        Args:
+            data (bytes): The encoded field
+
+        Returns:
+            mixed: The decoded value
+        """
+        return self.read(WireReader(data))
+
+    @classmethod
+    def capture(cls, reader: WireReader) -> bytes:
+        """
+        Reads past the encoded field without decoding it
+
+        Args:
+            reader (WireReader): The reader positioned at the start of the field
+
+        Returns:
+            bytes: The encoded field
+        """
+        start = reader.offset
+        for _ in range(cls.WIRE_STRINGS):
+            reader.skip_string()
+
+        return reader.view[start : reader.offset].tobytes()
+
+    @classmethod
+    def from_reader_lazy(cls, reader: WireReader) -> "CertificateField":
+        """
+        Creates a field class from the current position of a WireReader,
+        deferring the decoding of the value until it is accessed
+
+        Args:
+            reader (WireReader): The reader positioned at the start of the field
+
+        Returns:
+            CertificateField: A new CertificateField subclass instance
+        """
+        field = cls()
+        field.set_pending(cls.capture(reader))
+        return field
+
+
 class BooleanField(CertificateField):
     """
     Field representing a boolean value (True/False) or (1/0)
     """
 
+    __slots__ = ()
+
     DATA_TYPE = (bool, int)
 
     @classmethod
@@ -233,14 +505,14 @@ class BooleanField(CertificateField):
         return pack("B", 1 if value else 0)
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[bool, bytes]:
+    def read(reader: WireReader) -> bool:
         """
-        Decodes a boolean from a bytestring
+        Reads a boolean from a WireReader
 
         Args:
-            data (bytes): The byte string starting with an encoded boolean
+            reader (WireReader): The reader positioned at an encoded boolean
         """
-        return bool(unpack("B", data[:1])[0]), data[1:]
+        return bool(reader.read_uint8())
 
     def __validate_value__(self) -> Union[bool, Exception]:
         """
@@ -250,7 +522,7 @@ class BooleanField(CertificateField):
             True
             if self.value in (True, False, 1, 0)
             else _EX.InvalidFieldDataException(
-                f"{self.get_name()} must be a boolean (True/1 or False/0)"
+                f"{self.name} must be a boolean (True/1 or False/0)"
             )
         )
 
@@ -260,6 +532,8 @@ class BytestringField(CertificateField):
     Field representing a bytestring value
     """
 
+    __slots__ = ()
+
     DATA_TYPE = (bytes, str)
     DEFAULT = b""
 
@@ -279,19 +553,17 @@ class BytestringField(CertificateField):
         return pack(">I", len(value)) + ensure_bytestring(value)
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[bytes, bytes]:
+    def read(reader: WireReader) -> bytes:
         """
-        Unpacks the next string from a packed byte string
+        Reads the next string from a WireReader
 
         Args:
-            data (bytes): The packed byte string to unpack
+            reader (WireReader): The reader positioned at a packed byte string
 
         Returns:
-            tuple(bytes, bytes):  The next block of bytes from the packed byte
-                                  string and remainder of the data
+            bytes: The next block of bytes from the packed byte string
         """
-        length = unpack(">I", data[:4])[0] + 4
-        return ensure_bytestring(data[4:length]), data[length:]
+        return reader.read_string().tobytes()
 
 
 class StringField(BytestringField):
@@ -299,6 +571,8 @@ class StringField(BytestringField):
     Field representing a string value
     """
 
+    __slots__ = ()
+
     DATA_TYPE = (str, bytes)
     DEFAULT = ""
 
@@ -318,7 +592,21 @@ class StringField(BytestringField):
         return BytestringField.encode(ensure_bytestring(value, encoding))
 
     @staticmethod
-    def decode(data: bytes, encoding: str = "utf-8") -> Tuple[str, bytes]:
+    def read(reader: WireReader, encoding: str = "utf-8") -> str:
+        """
+        Reads the next string from a WireReader
+
+        Args:
+            reader (WireReader): The reader positioned at a packed string
+            encoding (str): The encoding of the string
+
+        Returns:
+            str: The next string from the packed byte string
+        """
+        return str(reader.read_string(), encoding)
+
+    @classmethod
+    def decode(cls, data: bytes, encoding: str = "utf-8") -> Tuple[str, bytes]:
         """
         Unpacks the next string from a packed byte string
 
@@ -329,9 +617,8 @@ class StringField(BytestringField):
             tuple(bytes, bytes):  The next block of bytes from the packed byte
                                   string and remainder of the data
         """
-        value, data = BytestringField.decode(data)
-
-        return value.decode(encoding), data
+        reader = WireReader(data)
+        return cls.read(reader, encoding), reader.rest()
 
 
 class Integer32Field(CertificateField):
@@ -339,6 +626,8 @@ class Integer32Field(CertificateField):
     Certificate field representing a 32-bit integer
     """
 
+    __slots__ = ()
+
     DATA_TYPE = int
     DEFAULT = 0
 
@@ -356,16 +645,16 @@ class Integer32Field(CertificateField):
         return pack(">I", value)
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[int, bytes]:
-        """Decodes a 32-bit integer from a block of bytes
+    def read(reader: WireReader) -> int:
+        """Reads a 32-bit integer from a WireReader
 
         Args:
-            data (bytes): Block of bytes containing an integer
+            reader (WireReader): The reader positioned at an integer
 
         Returns:
-            tuple: Tuple with integer and remainder of data
+            int: The decoded integer
         """
-        return int(unpack(">I", data[:4])[0]), data[4:]
+        return reader.read_uint32()
 
     def __validate_value__(self) -> Union[bool, Exception]:
         """
@@ -373,15 +662,13 @@ class Integer32Field(CertificateField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         if self.value < MAX_INT32:
             return True
 
-        return _EX.InvalidFieldDataException(
-            f"{self.get_name()} must be a 32-bit integer"
-        )
+        return _EX.InvalidFieldDataException(f"{self.name} must be a 32-bit integer")
 
 
 class Integer64Field(CertificateField):
@@ -389,6 +676,8 @@ class Integer64Field(CertificateField):
     Certificate field representing a 64-bit integer
     """
 
+    __slots__ = ()
+
     DATA_TYPE = int
     DEFAULT = 0
 
@@ -406,16 +695,16 @@ class Integer64Field(CertificateField):
         return pack(">Q", value)
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[int, bytes]:
-        """Decodes a 64-bit integer from a block of bytes
+    def read(reader: WireReader) -> int:
+        """Reads a 64-bit integer from a WireReader
 
         Args:
-            data (bytes): Block of bytes containing an integer
+            reader (WireReader): The reader positioned at an integer
 
         Returns:
-            tuple: Tuple with integer and remainder of data
+            int: The decoded integer
         """
-        return int(unpack(">Q", data[:8])[0]), data[8:]
+        return reader.read_uint64()
 
     def __validate_value__(self) -> Union[bool, Exception]:
         """
@@ -423,15 +712,13 @@ class Integer64Field(CertificateField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         if self.value < MAX_INT64:
             return True
 
-        return _EX.InvalidFieldDataException(
-            f"{self.get_name()} must be a 64-bit integer"
-        )
+        return _EX.InvalidFieldDataException(f"{self.name} must be a 64-bit integer")
 
 
 class DateTimeField(Integer64Field):
@@ -440,6 +727,8 @@ class DateTimeField(Integer64Field):
     The value is saved as a 64-bit integer (unix timestamp)
     """
 
+    __slots__ = ()
+
     DATA_TYPE = (datetime, int)
     DEFAULT = datetime.now
 
@@ -461,17 +750,16 @@ class DateTimeField(Integer64Field):
         return Integer64Field.encode(value)
 
     @staticmethod
-    def decode(data: bytes) -> datetime:
-        """Decodes a datetime object from a block of bytes
+    def read(reader: WireReader) -> datetime:
+        """Reads a datetime object from a WireReader
 
         Args:
-            data (bytes): Block of bytes containing a datetime object
+            reader (WireReader): The reader positioned at a timestamp
 
         Returns:
-            tuple: Tuple with datetime and remainder of data
+            datetime: The decoded datetime
         """
-        timestamp, data = Integer64Field.decode(data)
-        return datetime.fromtimestamp(timestamp), data
+        return datetime.fromtimestamp(reader.read_uint64())
 
     def __validate_value__(self) -> Union[bool, Exception]:
         """
@@ -479,7 +767,7 @@ class DateTimeField(Integer64Field):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         check = self.value if isinstance(self.value, int) else self.value.timestamp()
@@ -488,7 +776,7 @@ class DateTimeField(Integer64Field):
             return True
 
         return _EX.InvalidFieldDataException(
-            f"{self.get_name()} must be a 64-bit integer or datetime object"
+            f"{self.name} must be a 64-bit integer or datetime object"
         )
 
 
@@ -498,6 +786,8 @@ class MpIntegerField(BytestringField):
     an integer too large to fit in 64 bits.
     """
 
+    __slots__ = ()
+
     DATA_TYPE = int
     DEFAULT = 0
 
@@ -517,17 +807,16 @@ class MpIntegerField(BytestringField):
         return BytestringField.encode(long_to_bytes(value))
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[int, bytes]:
-        """Decodes a multiprecision integer (integer larger than 64bit)
+    def read(reader: WireReader) -> int:
+        """Reads a multiprecision integer (integer larger than 64bit)
 
         Args:
-            data (bytes): Block of bytes containing a long (mp) integer
+            reader (WireReader): The reader positioned at a long (mp) integer
 
         Returns:
-            tuple: Tuple with integer and remainder of data
+            int: The decoded integer
         """
-        mpint, data = BytestringField.decode(data)
-        return bytes_to_long(mpint), data
+        return reader.read_mpint()
 
 
 class ListField(CertificateField):
@@ -535,6 +824,8 @@ class ListField(CertificateField):
     Certificate field representing a list or tuple of strings
     """
 
+    __slots__ = ()
+
     DATA_TYPE = (list, set, tuple)
     DEFAULT = []
 
@@ -549,35 +840,54 @@ class ListField(CertificateField):
         Returns:
             bytes: Packed byte string containing the source data
         """
+        return encode_string(
+            b"".join([encode_string(item) for item in cls.to_bytes_list(value)])
+        )
+
+    @classmethod
+    def to_bytes_list(cls, value: Union[list, tuple, set]) -> List[bytes]:
+        """Validates the items of a list and converts them to bytestrings
+
+        Args:
+            value (Union[list, tuple, set]): list of strings
+
+        Raises:
+            _EX.InvalidFieldDataException: The list contains other items than strings
+
+        Returns:
+            List[bytes]: The items of the list as bytestrings
+        """
         cls.__validate_type__(value, True)
 
-        try:
-            if sum(not isinstance(item, (str, bytes)) for item in value) > 0:
-                raise TypeError
-        except TypeError:
-            raise _EX.InvalidFieldDataException(
-                "Expected list or tuple containing strings or bytes"
-            ) from TypeError
+        items = []
+        for item in value:
+            if isinstance(item, str):
+                item = item.encode("utf-8")
+            elif not isinstance(item, bytes):
+                raise _EX.InvalidFieldDataException(
+                    "Expected list or tuple containing strings or bytes"
+                )
+
+            items.append(item)
 
-        return BytestringField.encode(b"".join([StringField.encode(x) for x in value]))
+        return items
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[list, bytes]:
-        """Decodes a list of strings from a block of bytes
+    def read(reader: WireReader) -> list:
+        """Reads a list of strings from a WireReader
 
         Args:
-            data (bytes): The block of bytes containing a list of strings
+            reader (WireReader): The reader positioned at a list of strings
         Returns:
-            tuple: _description_
+            list: The decoded strings
         """
-        list_bytes, data = BytestringField.decode(data)
+        list_reader = WireReader(reader.read_string())
 
         decoded = []
-        while len(list_bytes) > 0:
-            elem, list_bytes = StringField.decode(list_bytes)
-            decoded.append(elem)
+        while not list_reader.at_end():
+            decoded.append(StringField.read(list_reader))
 
-        return ensure_string(decoded), data
+        return decoded
 
     def __validate_value__(self) -> Union[bool, Exception]:
         """
@@ -585,7 +895,7 @@ class ListField(CertificateField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         if hasattr(self.value, "__iter__") and not all(
@@ -603,6 +913,8 @@ class KeyValueField(CertificateField):
     separated in byte-form by null-bytes.
     """
 
+    __slots__ = ()
+
     DATA_TYPE = (list, tuple, set, dict)
     DEFAULT = {}
 
@@ -619,55 +931,74 @@ class KeyValueField(CertificateField):
         Returns:
             bytes: Packed byte string containing the source data
         """
+        return encode_string(
+            b"".join(
+                [
+                    encode_string(key)
+                    + encode_string(b"".join([encode_string(x) for x in items]))
+                    for key, items in cls.to_bytes_pairs(value)
+                ]
+            )
+        )
+
+    @classmethod
+    def to_bytes_pairs(
+        cls, value: Union[list, tuple, dict, set]
+    ) -> List[Tuple[bytes, List[bytes]]]:
+        """
+        Validates the key-value pairs and converts them to bytestrings.
+        Keys without a value get an empty list of values.
+
+        Args:
+            value (Union[list, tuple, dict, set]): The keys, or a dict of keys and values
+
+        Returns:
+            List[Tuple[bytes, List[bytes]]]: The keys and their values as bytestrings
+        """
         cls.__validate_type__(value, True)
 
         if not isinstance(value, dict):
             value = {item: "" for item in value}
 
-        list_data = b""
-
+        pairs = []
         for key, item in value.items():
-            list_data += StringField.encode(key)
+            StringField.__validate_type__(key, True)
 
-            item = (
-                StringField.encode("")
-                if item in ["", b""]
-                else ListField.encode(
-                    [item] if isinstance(item, (str, bytes)) else item
-                )
-            )
+            if isinstance(key, str):
+                key = key.encode("utf-8")
+
+            if item in ["", b""]:
+                item = []
+            elif isinstance(item, (str, bytes)):
+                item = [item]
 
-            list_data += item
+            pairs.append((key, ListField.to_bytes_list(item)))
 
-        return BytestringField.encode(list_data)
+        return pairs
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[dict, bytes]:
-        """Decodes a list of strings from a block of bytes
+    def read(reader: WireReader) -> Union[dict, list]:
+        """Reads a set of key-value pairs from a WireReader
 
         Args:
-            data (bytes): The block of bytes containing a list of strings
+            reader (WireReader): The reader positioned at the key-value list
         Returns:
-            tuple: _description_
+            Union[dict, list]: A dict of the options, or a list of the keys if
+                               none of the options have a value
         """
-        list_bytes, data = BytestringField.decode(data)
+        list_reader = WireReader(reader.read_string())
 
         decoded = {}
-        while len(list_bytes) > 0:
-            key, list_bytes = StringField.decode(list_bytes)
-            value, list_bytes = BytestringField.decode(list_bytes)
-
-            if value != b"":
-                value = StringField.decode(value)[0]
-
-            decoded[key] = value
+        while not list_reader.at_end():
+            key = StringField.read(list_reader)
+            value = list_reader.read_string()
 
-        decoded = ensure_string(decoded)
+            decoded[key] = StringField.read(WireReader(value)) if len(value) else ""
 
         if "".join(decoded.values()) == "":
-            return list(decoded.keys()), data
+            return list(decoded.keys())
 
-        return decoded, data
+        return decoded
 
     def __validate_value__(self) -> Union[bool, Exception]:
         """
@@ -675,7 +1006,7 @@ class KeyValueField(CertificateField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         testvals = (
@@ -694,13 +1025,15 @@ class KeyValueField(CertificateField):
         return True
 
 
-class PubkeyTypeField(StringField):
+class PubkeyTypeField(StringField, attribute="pubkey_type"):
     """
     Contains the certificate type, which is based on the
     public key type the certificate is created for, e.g.
     'ssh-ed25519-cert-v01@openssh.com' for an ED25519 key
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = (str, bytes)
     ALLOWED_VALUES = (
@@ -720,7 +1053,7 @@ class PubkeyTypeField(StringField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         if ensure_string(self.value) not in self.ALLOWED_VALUES:
@@ -732,13 +1065,15 @@ class PubkeyTypeField(StringField):
         return True
 
 
-class NonceField(StringField):
+class NonceField(StringField, attribute="nonce"):
     """
     Contains the nonce for the certificate, randomly generated
     this protects the integrity of the private key, especially
     for ecdsa.
     """
 
+    __slots__ = ()
+
     DEFAULT = generate_secure_nonce
     DATA_TYPE = (str, bytes)
 
@@ -748,7 +1083,7 @@ class NonceField(StringField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         if hasattr(self.value, "__count__") and len(self.value) < 32:
@@ -759,12 +1094,14 @@ class NonceField(StringField):
         return True
 
 
-class PublicKeyField(CertificateField):
+class PublicKeyField(LazyField, attribute="public_key"):
     """
     Contains the subject (User or Host) public key for whom/which
     the certificate is created.
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = PublicKey
 
@@ -821,25 +1158,25 @@ class RsaPubkeyField(PublicKeyField):
     Holds the RSA Public Key for RSA Certificates
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = RsaPublicKey
+    WIRE_STRINGS = 2
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[RsaPublicKey, bytes]:
+    def read(reader: WireReader) -> RsaPublicKey:
         """
-        Decode the certificate field from a byte string
-        starting with the encoded public key
+        Read the public key from a WireReader positioned
+        at the start of the encoded public key
 
         Args:
-            data (bytes): The byte string starting with the encoded key
+            reader (WireReader): The reader positioned at the encoded key
 
         Returns:
-            Tuple[RsaPublicKey, bytes]: The PublicKey field and remainder of the data
+            RsaPublicKey: The decoded public key
         """
-        e, data = MpIntegerField.decode(data)
-        n, data = MpIntegerField.decode(data)
-
-        return RsaPublicKey.from_numbers(e=e, n=n), data
+        return RsaPublicKey.from_reader(reader)
 
 
 class DsaPubkeyField(PublicKeyField):
@@ -847,27 +1184,25 @@ class DsaPubkeyField(PublicKeyField):
     Holds the DSA Public Key for DSA Certificates
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = DsaPublicKey
+    WIRE_STRINGS = 4
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[DsaPublicKey, bytes]:
+    def read(reader: WireReader) -> DsaPublicKey:
         """
-        Decode the certificate field from a byte string
-        starting with the encoded public key
+        Read the public key from a WireReader positioned
+        at the start of the encoded public key
 
         Args:
-            data (bytes): The byte string starting with the encoded key
+            reader (WireReader): The reader positioned at the encoded key
 
         Returns:
-            Tuple[RsaPublicKey, bytes]: The PublicKey field and remainder of the data
+            DsaPublicKey: The decoded public key
         """
-        p, data = MpIntegerField.decode(data)
-        q, data = MpIntegerField.decode(data)
-        g, data = MpIntegerField.decode(data)
-        y, data = MpIntegerField.decode(data)
-
-        return DsaPublicKey.from_numbers(p=p, q=q, g=g, y=y), data
+        return DsaPublicKey.from_reader(reader)
 
 
 class EcdsaPubkeyField(PublicKeyField):
@@ -875,38 +1210,25 @@ class EcdsaPubkeyField(PublicKeyField):
     Holds the ECDSA Public Key for ECDSA Certificates
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = EcdsaPublicKey
+    WIRE_STRINGS = 2
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[EcdsaPublicKey, bytes]:
+    def read(reader: WireReader) -> EcdsaPublicKey:
         """
-        Decode the certificate field from a byte string
-        starting with the encoded public key
+        Read the public key from a WireReader positioned
+        at the start of the encoded public key
 
         Args:
-            data (bytes): The byte string starting with the encoded key
+            reader (WireReader): The reader positioned at the encoded key
 
         Returns:
-            Tuple[ECPublicKey, bytes]: The PublicKey field and remainder of the data
+            EcdsaPublicKey: The decoded public key
         """
-        curve, data = StringField.decode(data)
-        key, data = BytestringField.decode(data)
-
-        key_type = "ecdsa-sha2-" + curve
-
-        return (
-            EcdsaPublicKey.from_string(
-                key_type
-                + " "
-                + b64encode(
-                    StringField.encode(key_type)
-                    + StringField.encode(curve)
-                    + BytestringField.encode(key)
-                ).decode("utf-8")
-            ),
-            data,
-        )
+        return EcdsaPublicKey.from_reader(reader)
 
 
 class Ed25519PubkeyField(PublicKeyField):
@@ -914,43 +1236,47 @@ class Ed25519PubkeyField(PublicKeyField):
     Holds the ED25519 Public Key for ED25519 Certificates
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = Ed25519PublicKey
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[Ed25519PublicKey, bytes]:
+    def read(reader: WireReader) -> Ed25519PublicKey:
         """
-        Decode the certificate field from a byte string
-        starting with the encoded public key
+        Read the public key from a WireReader positioned
+        at the start of the encoded public key
 
         Args:
-            data (bytes): The byte string starting with the encoded key
+            reader (WireReader): The reader positioned at the encoded key
 
         Returns:
-            Tuple[Ed25519PublicKey, bytes]: The PublicKey field and remainder of the data
+            Ed25519PublicKey: The decoded public key
         """
-        pubkey, data = BytestringField.decode(data)
+        return Ed25519PublicKey.from_reader(reader)
 
-        return Ed25519PublicKey.from_raw_bytes(pubkey), data
 
-
-class SerialField(Integer64Field):
+class SerialField(Integer64Field, attribute="serial"):
     """
     Contains the numeric serial number of the certificate,
     maximum is (2**64)-1
     """
 
+    __slots__ = ()
+
     DEFAULT = random_serial
     DATA_TYPE = int
 
 
-class CertificateTypeField(Integer32Field):
+class CertificateTypeField(Integer32Field, attribute="cert_type"):
     """
     Contains the certificate type
     User certificate: CERT_TYPE.USER/1
     Host certificate: CERT_TYPE.HOST/2
     """
 
+    __slots__ = ()
+
     DEFAULT = CERT_TYPE.USER
     DATA_TYPE = (CERT_TYPE, int)
     ALLOWED_VALUES = (CERT_TYPE.USER, CERT_TYPE.HOST, 1, 2)
@@ -979,7 +1305,7 @@ class CertificateTypeField(Integer32Field):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         if self.value not in self.ALLOWED_VALUES:
@@ -990,17 +1316,19 @@ class CertificateTypeField(Integer32Field):
         return True
 
 
-class KeyIdField(StringField):
+class KeyIdField(StringField, attribute="key_id"):
     """
     Contains the key identifier (subject) of the certificate,
     alphanumeric string
     """
 
+    __slots__ = ()
+
     DEFAULT = random_keyid
     DATA_TYPE = (str, bytes)
 
 
-class PrincipalsField(ListField):
+class PrincipalsField(ListField, attribute="principals"):
     """
     Contains a list of principals for the certificate,
     e.g. SERVERHOSTNAME01 or all-web-servers.
@@ -1008,26 +1336,32 @@ class PrincipalsField(ListField):
     only for servers that have no allowed principals specified
     """
 
+    __slots__ = ()
+
     DEFAFULT = []
     DATA_TYPE = (list, set, tuple)
 
 
-class ValidAfterField(DateTimeField):
+class ValidAfterField(DateTimeField, attribute="valid_after"):
     """
     Contains the start of the validity period for the certificate,
     represented by a datetime object
     """
 
+    __slots__ = ()
+
     DEFAULT = datetime.now()
     DATA_TYPE = (datetime, int)
 
 
-class ValidBeforeField(DateTimeField):
+class ValidBeforeField(DateTimeField, attribute="valid_before"):
     """
     Contains the end of the validity period for the certificate,
     represented by a datetime object
     """
 
+    __slots__ = ()
+
     DEFAULT = datetime.now() + timedelta(minutes=10)
     DATA_TYPE = (datetime, int)
 
@@ -1040,7 +1374,7 @@ class ValidBeforeField(DateTimeField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         super().__validate_value__()
@@ -1059,7 +1393,7 @@ class ValidBeforeField(DateTimeField):
         return True
 
 
-class CriticalOptionsField(KeyValueField):
+class CriticalOptionsField(KeyValueField, attribute="critical_options"):
     """
     Contains the critical options part of the certificate (optional).
     This should be a list of strings with one of the following
@@ -1076,6 +1410,8 @@ class CriticalOptionsField(KeyValueField):
             if using a hardware token
     """
 
+    __slots__ = ()
+
     DEFAULT = []
     DATA_TYPE = (list, set, tuple, dict)
     ALLOWED_VALUES = ("force-command", "source-address", "verify-required")
@@ -1086,7 +1422,7 @@ class CriticalOptionsField(KeyValueField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         for elem in (
@@ -1101,7 +1437,7 @@ class CriticalOptionsField(KeyValueField):
         return True
 
 
-class ExtensionsField(KeyValueField):
+class ExtensionsField(KeyValueField, attribute="extensions"):
     """
     Contains a list of extensions for the certificate,
     set to give the user limitations and/or additional
@@ -1129,6 +1465,8 @@ class ExtensionsField(KeyValueField):
 
     """
 
+    __slots__ = ()
+
     DEFAULT = []
     DATA_TYPE = (list, set, tuple, dict)
     ALLOWED_VALUES = (
@@ -1146,7 +1484,7 @@ class ExtensionsField(KeyValueField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         for item in self.value:
@@ -1159,12 +1497,14 @@ class ExtensionsField(KeyValueField):
         return True
 
 
-class ReservedField(StringField):
+class ReservedField(StringField, attribute="reserved"):
     """
     This field is reserved for future use, and
     doesn't contain any actual data, just an empty string.
     """
 
+    __slots__ = ()
+
     DEFAULT = ""
     DATA_TYPE = str
 
@@ -1174,7 +1514,7 @@ class ReservedField(StringField):
         """
         if isinstance(self.__validate_type__(self.value), Exception):
             return _EX.InvalidFieldDataException(
-                f"{self.get_name()} Could not validate value, invalid type"
+                f"{self.name} Could not validate value, invalid type"
             )
 
         return (
@@ -1184,12 +1524,14 @@ class ReservedField(StringField):
         )
 
 
-class CAPublicKeyField(BytestringField):
+class CAPublicKeyField(LazyField, BytestringField, attribute="ca_pubkey"):
     """
     Contains the public key of the certificate authority
     that is used to sign the certificate.
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = (str, bytes)
 
@@ -1206,7 +1548,27 @@ class CAPublicKeyField(BytestringField):
         )
 
     def __bytes__(self) -> bytes:
-        return self.encode(self.value.raw_bytes())
+        if self._pending is not None:
+            return self._pending
+
+        data = self._get_cached()
+        if data is None:
+            data = self._set_encoded(self.encode(self.value.raw_bytes()))
+
+        return data
+
+    def raw_bytes(self) -> bytes:
+        """
+        Get the wire format of the CA public key, without decoding it
+        if the field has not been accessed yet
+
+        Returns:
+            bytes: The CA public key in wire format
+        """
+        if self._pending is not None:
+            return self._pending[4:]
+
+        return self.value.raw_bytes()
 
     def __table__(self) -> tuple:
         return ("CA Public Key", self.value.get_fingerprint())
@@ -1226,26 +1588,18 @@ class CAPublicKeyField(BytestringField):
         return True
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[PublicKey, bytes]:
+    def read(reader: WireReader) -> PublicKey:
         """
-        Decode the certificate field from a byte string
-        starting with the encoded public key
+        Read the CA public key from a WireReader positioned
+        at the start of the encoded public key
 
         Args:
-            data (bytes): The byte string starting with the encoded key
+            reader (WireReader): The reader positioned at the encoded key
 
         Returns:
-            Tuple[PublicKey, bytes]: The PublicKey field and remainder of the data
+            PublicKey: The decoded public key
         """
-        pubkey, data = BytestringField.decode(data)
-        pubkey_type = StringField.decode(pubkey)[0]
-
-        return (
-            PublicKey.from_string(
-                concat_to_string(pubkey_type, " ", b64encode(pubkey))
-            ),
-            data,
-        )
+        return PublicKey.from_wire(reader.read_string())
 
     @classmethod
     def from_object(cls, public_key: PublicKey) -> "CAPublicKeyField":
@@ -1255,11 +1609,13 @@ class CAPublicKeyField(BytestringField):
         return cls(value=public_key)
 
 
-class SignatureField(CertificateField):
+class SignatureField(LazyField, attribute="signature"):
     """
     Creates and contains the signature of the certificate
     """
 
+    __slots__ = ("private_key", "is_signed")
+
     DEFAULT = None
     DATA_TYPE = bytes
 
@@ -1303,12 +1659,29 @@ class SignatureField(CertificateField):
             ) from KeyError
 
     @staticmethod
-    def from_decode(data: bytes) -> Tuple["SignatureField", bytes]:
+    def from_reader(reader: WireReader) -> "SignatureField":
         """
         Generates a SignatureField child class from the encoded signature
 
         Args:
-            data (bytes): The bytestring containing the encoded signature
+            reader (WireReader): The reader positioned at the encoded signature
+
+        Raises:
+            _EX.InvalidDataException: Invalid data
+
+        Returns:
+            SignatureField: child of SignatureField
+        """
+        return SignatureField.get_class(reader).from_reader(reader)
+
+    @staticmethod
+    def from_reader_lazy(reader: WireReader) -> "SignatureField":
+        """
+        Generates a SignatureField child class from the encoded signature,
+        deferring the decoding of the signature until it is accessed
+
+        Args:
+            reader (WireReader): The reader positioned at the encoded signature
 
         Raises:
             _EX.InvalidDataException: Invalid data
@@ -1316,15 +1689,61 @@ class SignatureField(CertificateField):
         Returns:
             SignatureField: child of SignatureField
         """
-        signature, _ = BytestringField.decode(data)
-        signature_type = BytestringField.decode(signature)[0]
+        return SignatureField.get_class(reader).from_reader_lazy(reader)
+
+    @staticmethod
+    def get_class(reader: WireReader) -> type:
+        """
+        Finds the SignatureField child class for an encoded signature
+
+        Args:
+            reader (WireReader): The reader positioned at the encoded signature
+
+        Raises:
+            _EX.InvalidDataException: Unknown signature type
+
+        Returns:
+            type: child of SignatureField
+        """
+        signature_type = BytestringField.read(WireReader(reader.peek_string()))
 
         for key, value in SIGNATURE_TYPE_MAP.items():
             if key in signature_type:
-                return globals()[value].from_decode(data)
+                return globals()[value]
 
         raise _EX.InvalidDataException("No matching signature type found")
 
+    @staticmethod
+    def peek_type(reader: WireReader) -> str:
+        """
+        Reads the signature type without moving the reader
+
+        Args:
+            reader (WireReader): The reader positioned at the encoded signature
+
+        Returns:
+            str: The signature type, e.g. 'rsa-sha2-512'
+        """
+        return StringField.read(WireReader(reader.peek_string()))
+
+    @classmethod
+    def from_pending(cls, data: bytes, **kwargs) -> "SignatureField":
+        """
+        Creates a signed field from the encoded signature,
+        which is decoded when the signature is accessed
+
+        Args:
+            data (bytes): The encoded signature
+            **kwargs: Arguments for the constructor of the child class
+
+        Returns:
+            SignatureField: child of SignatureField
+        """
+        field = cls(private_key=None, **kwargs)
+        field.set_pending(data)
+        field.is_signed = True
+        return field
+
     def can_sign(self):
         """
         Determines if a signature can be generated from
@@ -1338,7 +1757,21 @@ class SignatureField(CertificateField):
         """
         raise _EX.InvalidClassCallException("The base class has no sign function")
 
+    def set_signature(self, signature: bytes) -> None:
+        """
+        Sets a signature created outside of the field with the
+        same private key, e.g. by a worker in a batch signing job
+
+        Args:
+            signature (bytes): The signature bytes
+        """
+        self.value = signature
+        self.is_signed = True
+
     def __bytes__(self) -> None:
+        if self._pending is not None:
+            return self._pending
+
         return self.encode(self.value)
 
 
@@ -1347,6 +1780,8 @@ class RsaSignatureField(SignatureField):
     Creates and contains the RSA signature from an RSA Private Key
     """
 
+    __slots__ = ("hash_alg",)
+
     DEFAULT = None
     DATA_TYPE = bytes
 
@@ -1380,48 +1815,55 @@ class RsaSignatureField(SignatureField):
         )
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[Tuple[bytes, bytes], bytes]:
+    def read(reader: WireReader) -> Tuple[str, bytes]:
         """
-        Decodes a bytestring containing a signature
+        Reads a signature from a WireReader
 
         Args:
-            data (bytes): The bytestring starting with the RSA Signature
+            reader (WireReader): The reader positioned at the RSA Signature
 
         Returns:
-            Tuple[ Tuple[ bytes, bytes ], bytes ]: (signature_type, signature), remainder of data
+            Tuple[ str, bytes ]: (signature_type, signature)
         """
-        signature, data = BytestringField.decode(data)
+        signature = WireReader(reader.read_string())
 
-        sig_type, signature = StringField.decode(signature)
-        signature, _ = BytestringField.decode(signature)
-
-        return (sig_type, signature), data
+        sig_type = StringField.read(signature)
+        return sig_type, BytestringField.read(signature)
 
     @classmethod
-    def from_decode(cls, data: bytes) -> Tuple["RsaSignatureField", bytes]:
+    def from_reader(cls, reader: WireReader) -> "RsaSignatureField":
         """
         Generates an RsaSignatureField class from the encoded signature
 
         Args:
-            data (bytes): The bytestring containing the encoded signature
+            reader (WireReader): The reader positioned at the encoded signature
 
         Raises:
             _EX.InvalidDataException: Invalid data
 
         Returns:
-            Tuple[RsaSignatureField, bytes]: RSA Signature field and remainder of data
+            RsaSignatureField: RSA Signature field
         """
-        signature, data = cls.decode(data)
+        signature = cls.read(reader)
 
-        return (
-            cls(
-                private_key=None,
-                hash_alg=[alg for alg in RsaAlgs if alg.value[0] == signature[0]][0],
-                signature=signature[1],
-            ),
-            data,
+        return cls(
+            private_key=None,
+            hash_alg=[alg for alg in RsaAlgs if alg.value[0] == signature[0]][0],
+            signature=signature[1],
+        )
+
+    @classmethod
+    def from_reader_lazy(cls, reader: WireReader) -> "RsaSignatureField":
+        sig_type = cls.peek_type(reader)
+
+        return cls.from_pending(
+            cls.capture(reader),
+            hash_alg=[alg for alg in RsaAlgs if alg.value[0] == sig_type][0],
         )
 
+    def decode_pending(self, data: bytes) -> bytes:
+        return self.read(WireReader(data))[1]
+
     # pylint: disable=unused-argument
     def sign(self, data: bytes, hash_alg: RsaAlgs = RsaAlgs.SHA512, **kwargs) -> None:
         """
@@ -1438,6 +1880,9 @@ class RsaSignatureField(SignatureField):
         self.is_signed = True
 
     def __bytes__(self):
+        if self._pending is not None:
+            return self._pending
+
         return self.encode(self.value, self.hash_alg)
 
 
@@ -1446,6 +1891,8 @@ class DsaSignatureField(SignatureField):
     Creates and contains the DSA signature from an DSA Private Key
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = bytes
 
@@ -1475,40 +1922,41 @@ class DsaSignatureField(SignatureField):
         )
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[bytes, bytes]:
+    def read(reader: WireReader) -> bytes:
         """
-        Decodes a bytestring containing a signature
+        Reads a signature from a WireReader
 
         Args:
-            data (bytes): The bytestring starting with the Signature
+            reader (WireReader): The reader positioned at the Signature
 
         Returns:
-            Tuple[ bytes, bytes ]: signature, remainder of the data
+            bytes: The signature
         """
-        signature, data = BytestringField.decode(data)
+        signature = WireReader(reader.read_string())
+        signature.skip_string()
 
-        signature = BytestringField.decode(BytestringField.decode(signature)[1])[0]
+        signature = BytestringField.read(signature)
         r = bytes_to_long(signature[:20])
         s = bytes_to_long(signature[20:])
 
-        signature = encode_dss_signature(r, s)
-
-        return signature, data
+        return encode_dss_signature(r, s)
 
     @classmethod
-    def from_decode(cls, data: bytes) -> Tuple["DsaSignatureField", bytes]:
+    def from_reader(cls, reader: WireReader) -> "DsaSignatureField":
         """
         Creates a signature field class from the encoded signature
 
         Args:
-            data (bytes): The bytestring starting with the Signature
+            reader (WireReader): The reader positioned at the Signature
 
         Returns:
-            Tuple[ DsaSignatureField, bytes ]: signature, remainder of the data
+            DsaSignatureField: The signature field
         """
-        signature, data = cls.decode(data)
+        return cls(private_key=None, signature=cls.read(reader))
 
-        return cls(private_key=None, signature=signature), data
+    @classmethod
+    def from_reader_lazy(cls, reader: WireReader) -> "SignatureField":
+        return cls.from_pending(cls.capture(reader))
 
     # pylint: disable=unused-argument
     def sign(self, data: bytes, **kwargs) -> None:
@@ -1527,6 +1975,8 @@ class EcdsaSignatureField(SignatureField):
     Creates and contains the ECDSA signature from an ECDSA Private Key
     """
 
+    __slots__ = ("curve",)
+
     DEFAULT = None
     DATA_TYPE = bytes
 
@@ -1569,45 +2019,49 @@ class EcdsaSignatureField(SignatureField):
         )
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[Tuple[bytes, bytes], bytes]:
+    def read(reader: WireReader) -> Tuple[str, bytes]:
         """
-        Decodes a bytestring containing a signature
+        Reads a signature from a WireReader
 
         Args:
-            data (bytes): The bytestring starting with the Signature
+            reader (WireReader): The reader positioned at the Signature
 
         Returns:
-            Tuple[ Tuple[ bytes, bytes ], bytes]: (curve, signature), remainder of the data
+            Tuple[ str, bytes ]: (curve, signature)
         """
-        signature, data = BytestringField.decode(data)
-
-        curve, signature = StringField.decode(signature)
-        signature, _ = BytestringField.decode(signature)
+        signature = WireReader(reader.read_string())
 
-        r, signature = MpIntegerField.decode(signature)
-        s, _ = MpIntegerField.decode(signature)
+        curve = StringField.read(signature)
+        signature = WireReader(signature.read_string())
 
-        signature = encode_dss_signature(r, s)
+        r = signature.read_mpint()
+        s = signature.read_mpint()
 
-        return (curve, signature), data
+        return curve, encode_dss_signature(r, s)
 
     @classmethod
-    def from_decode(cls, data: bytes) -> Tuple["EcdsaSignatureField", bytes]:
+    def from_reader(cls, reader: WireReader) -> "EcdsaSignatureField":
         """
         Creates a signature field class from the encoded signature
 
         Args:
-            data (bytes): The bytestring starting with the Signature
+            reader (WireReader): The reader positioned at the Signature
 
         Returns:
-            Tuple[ EcdsaSignatureField , bytes ]: signature, remainder of the data
+            EcdsaSignatureField: The signature field
         """
-        signature, data = cls.decode(data)
+        curve, signature = cls.read(reader)
 
-        return (
-            cls(private_key=None, signature=signature[1], curve_name=signature[0]),
-            data,
-        )
+        return cls(private_key=None, signature=signature, curve_name=curve)
+
+    @classmethod
+    def from_reader_lazy(cls, reader: WireReader) -> "EcdsaSignatureField":
+        curve = cls.peek_type(reader)
+
+        return cls.from_pending(cls.capture(reader), curve_name=curve)
+
+    def decode_pending(self, data: bytes) -> bytes:
+        return self.read(WireReader(data))[1]
 
     # pylint: disable=unused-argument
     def sign(self, data: bytes, **kwargs) -> None:
@@ -1621,6 +2075,9 @@ class EcdsaSignatureField(SignatureField):
         self.is_signed = True
 
     def __bytes__(self):
+        if self._pending is not None:
+            return self._pending
+
         return self.encode(self.value, self.curve)
 
 
@@ -1629,6 +2086,8 @@ class Ed25519SignatureField(SignatureField):
     Creates and contains the ED25519 signature from an ED25519 Private Key
     """
 
+    __slots__ = ()
+
     DEFAULT = None
     DATA_TYPE = bytes
 
@@ -1658,36 +2117,37 @@ class Ed25519SignatureField(SignatureField):
         )
 
     @staticmethod
-    def decode(data: bytes) -> Tuple[bytes, bytes]:
+    def read(reader: WireReader) -> bytes:
         """
-        Decodes a bytestring containing a signature
+        Reads a signature from a WireReader
 
         Args:
-            data (bytes): The bytestring starting with the Signature
+            reader (WireReader): The reader positioned at the Signature
 
         Returns:
-            Tuple[ bytes, bytes ]: signature, remainder of the data
+            bytes: The signature
         """
-        signature, data = BytestringField.decode(data)
+        signature = WireReader(reader.read_string())
+        signature.skip_string()
 
-        signature = BytestringField.decode(BytestringField.decode(signature)[1])[0]
-
-        return signature, data
+        return BytestringField.read(signature)
 
     @classmethod
-    def from_decode(cls, data: bytes) -> Tuple["Ed25519SignatureField", bytes]:
+    def from_reader(cls, reader: WireReader) -> "Ed25519SignatureField":
         """
         Creates a signature field class from the encoded signature
 
         Args:
-            data (bytes): The bytestring starting with the Signature
+            reader (WireReader): The reader positioned at the Signature
 
         Returns:
-            Tuple[ Ed25519SignatureField , bytes ]: signature, remainder of the data
+            Ed25519SignatureField: The signature field
         """
-        signature, data = cls.decode(data)
+        return cls(private_key=None, signature=cls.read(reader))
 
-        return cls(private_key=None, signature=signature), data
+    @classmethod
+    def from_reader_lazy(cls, reader: WireReader) -> "SignatureField":
+        return cls.from_pending(cls.capture(reader))
 
     # pylint: disable=unused-argument
     def sign(self, data: bytes, **kwargs) -> None:
@@ -0,0 +1,738 @@
+"""
+Persistent index of certificate files, queried through a memory map
+without parsing the certificates or loading the index.
+
+The index file consists of a header, fixed-width records sorted by serial,
+sections of record numbers sorted by subject fingerprint and by key ID,
+a section of (principal, record) pairs sorted by principal, and a string
+table holding the key IDs, principals and file paths. Lookups are binary
+searches over these sections.
+
+Certificates added after the index was written are appended to the end
+of the file as self-contained entries, which are read into memory when
+the index is opened. An incomplete entry left at the end by an interrupted
+append is ignored, and overwritten by the next append. Compacting the index
+sorts the appended entries into the sections, and re-reads or drops
+certificate files that changed since they were indexed.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from base64 import b64decode, b64encode
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+from . import exceptions as _EX
+from .batch import BatchResult, load_certificates
+from .cert import SSHCertificate
+from .fields import CERT_TYPE
+from .keys import PublicKey
+from .utils import WireReader, encode_string, to_timestamp
+
+INDEX_MAGIC = b"SSHCIDX\0"
+INDEX_VERSION = 1
+
+# magic, version, records, principal pairs, then the offsets of the records,
+# subject, key ID and principal sections, string table and appended entries
+HEADER = struct.Struct(">8sIII6Q")
+
+# serial, subject and CA SHA256 digests, valid_after, valid_before, cert_type,
+# string offsets of the key ID, principals and path, and file mtime_ns and size
+RECORD = struct.Struct(">Q32s32sQQIIIIQQ")
+
+# Position of the key ID string offset in a record
+RECORD_KEY_ID = struct.calcsize(">Q32s32sQQI")
+
+UINT32 = struct.Struct(">I")
+PAIR = struct.Struct(">II")
+
+
+class _IndexHeader(NamedTuple):
+    """The values packed in the index header, in HEADER order"""
+
+    magic: bytes
+    version: int
+    count: int
+    pair_count: int
+    records: int
+    subjects: int
+    key_ids: int
+    principals: int
+    strings: int
+    tail: int
+
+
+def _digest(key: Union[PublicKey, str, bytes]) -> bytes:
+    """The raw SHA256 digest of a key, from the key or its fingerprint"""
+    if isinstance(key, PublicKey):
+        return hashlib.sha256(key.raw_bytes()).digest()
+
+    if isinstance(key, str):
+        fingerprint = key[7:] if key.startswith("SHA256:") else key
+        return b64decode(fingerprint + "=" * (-len(fingerprint) % 4))
+
+    return key
+
+
+def _encode_list(items: List[str]) -> bytes:
+    return b"".join(encode_string(item) for item in items)
+
+
+@dataclass
+class IndexEntry:  # pylint: disable=too-many-instance-attributes
+    """
+    The indexed information about a certificate file
+
+    Attributes:
+        serial (int): The serial number
+        key_id (str): The key ID
+        principals (list): The principals
+        subject (bytes): SHA256 digest of the subject public key
+        ca (bytes): SHA256 digest of the CA public key
+        valid_after (int): Start of the validity period (unix time)
+        valid_before (int): End of the validity period (unix time)
+        cert_type (int): The certificate type
+        path (str): The path of the certificate file
+        mtime_ns (int): Modification time of the file when it was indexed
+        size (int): Size of the file when it was indexed
+    """
+
+    serial: int
+    key_id: str
+    principals: list
+    subject: bytes
+    ca: bytes
+    valid_after: int
+    valid_before: int
+    cert_type: int
+    path: str
+    mtime_ns: int = 0
+    size: int = 0
+
+    @classmethod
+    def from_certificate(cls, certificate: SSHCertificate, path: str) -> "IndexEntry":
+        """
+        Creates the entry for a certificate file
+
+        Args:
+            certificate (SSHCertificate): The certificate in the file
+            path (str): The path of the file
+
+        Returns:
+            IndexEntry: The index entry
+        """
+        stat = os.stat(path)
+
+        return cls(
+            serial=certificate.get("serial"),
+            key_id=certificate.get("key_id"),
+            principals=list(certificate.get("principals")),
+            subject=_digest(certificate.get("public_key")),
+            ca=hashlib.sha256(certificate.footer.ca_pubkey.raw_bytes()).digest(),
+            valid_after=to_timestamp(certificate.get("valid_after")),
+            valid_before=to_timestamp(certificate.get("valid_before")),
+            cert_type=CERT_TYPE(certificate.get("cert_type")).value,
+            path=os.path.abspath(path),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
+    @property
+    def subject_fingerprint(self) -> str:
+        """The SHA256 fingerprint of the subject public key"""
+        return "SHA256:" + b64encode(self.subject).decode("utf-8").rstrip("=")
+
+    @property
+    def ca_fingerprint(self) -> str:
+        """The SHA256 fingerprint of the CA public key"""
+        return "SHA256:" + b64encode(self.ca).decode("utf-8").rstrip("=")
+
+    def is_current(self) -> bool:
+        """
+        Checks if the certificate file is unchanged since it was indexed
+
+        Returns:
+            bool: True if the file exists with the same size and modification time
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        return (stat.st_mtime_ns, stat.st_size) == (self.mtime_ns, self.size)
+
+    def load(self, lazy: bool = False) -> SSHCertificate:
+        """
+        Loads the certificate from its file
+
+        Args:
+            lazy (bool, optional): Keep the keys and signature encoded until
+                                   they are accessed. Defaults to False.
+
+        Returns:
+            SSHCertificate: The certificate
+        """
+        return SSHCertificate.from_file(self.path, lazy=lazy)
+
+    def encode(self) -> bytes:
+        """
+        Encodes the entry as appended to the index file
+
+        Returns:
+            bytes: The record followed by the key ID, principals and path
+        """
+        data = RECORD.pack(*self.record_values(0, 0, 0)) + b"".join(
+            (
+                encode_string(self.key_id),
+                encode_string(_encode_list(self.principals)),
+                encode_string(self.path),
+            )
+        )
+        return UINT32.pack(len(data)) + data
+
+    @classmethod
+    def decode(cls, data: Union[bytes, memoryview]) -> "IndexEntry":
+        """
+        Decodes an entry appended to the index file
+
+        Args:
+            data (bytes): The encoded entry, without the length
+
+        Returns:
+            IndexEntry: The index entry
+        """
+        reader = WireReader(data)
+        values = RECORD.unpack(reader.read_bytes(RECORD.size))
+        key_id = str(reader.read_string(), "utf-8")
+        principals = WireReader(reader.read_string())
+        path = str(reader.read_string(), "utf-8")
+
+        return cls.from_record(
+            values,
+            key_id,
+            _read_list(principals),
+            path,
+        )
+
+    def record_values(
+        self, key_id_offset: int, principals_offset: int, path_offset: int
+    ) -> tuple:
+        """
+        Lists the values of the fixed-width record for the entry
+
+        Args:
+            key_id_offset (int): String table offset of the key ID
+            principals_offset (int): String table offset of the principals
+            path_offset (int): String table offset of the path
+
+        Returns:
+            tuple: The values to pack with RECORD
+        """
+        return (
+            self.serial,
+            self.subject,
+            self.ca,
+            self.valid_after,
+            self.valid_before,
+            self.cert_type,
+            key_id_offset,
+            principals_offset,
+            path_offset,
+            self.mtime_ns,
+            self.size,
+        )
+
+    @classmethod
+    def from_record(
+        cls, values: tuple, key_id: str, principals: list, path: str
+    ) -> "IndexEntry":
+        """
+        Creates an entry from the values unpacked from a record
+
+        Args:
+            values (tuple): The values unpacked with RECORD
+            key_id (str): The key ID
+            principals (list): The principals
+            path (str): The path of the certificate file
+
+        Returns:
+            IndexEntry: The index entry
+        """
+        serial, subject, ca, valid_after, valid_before, cert_type = values[:6]
+        mtime_ns, size = values[9:]
+
+        return cls(
+            serial,
+            key_id,
+            principals,
+            subject,
+            ca,
+            valid_after,
+            valid_before,
+            cert_type,
+            path,
+            mtime_ns,
+            size,
+        )
+
+
+def _read_list(reader: WireReader) -> List[str]:
+    items = []
+    while not reader.at_end():
+        items.append(str(reader.read_string(), "utf-8"))
+
+    return items
+
+
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets: Dict[bytes, int] = {}
+
+    def add(self, value: bytes) -> int:
+        """Adds a string once, and returns its offset in the table"""
+        offset = self.offsets.get(value)
+        if offset is None:
+            offset = self.offsets[value] = len(self.data)
+            self.data += encode_string(value)
+
+        return offset
+
+    def add_text(self, value: str) -> int:
+        """Adds a UTF-8 encoded string once, and returns its offset in the table"""
+        return self.add(value.encode("utf-8"))
+
+
+def _encode_records(
+    entries: List[IndexEntry], strings: _StringTable
+) -> Tuple[bytes, List[tuple]]:
+    # The records, and the (principal, string offset, record) pairs sorted
+    # by principal, with the strings added to the table
+    records = bytearray()
+    principal_pairs = []
+
+    for number, entry in enumerate(entries):
+        records += RECORD.pack(
+            *entry.record_values(
+                strings.add_text(entry.key_id),
+                strings.add(_encode_list(entry.principals)),
+                strings.add_text(entry.path),
+            )
+        )
+        principal_pairs.extend(
+            (principal.encode("utf-8"), strings.add_text(principal), number)
+            for principal in set(entry.principals)
+        )
+
+    principal_pairs.sort()
+    return bytes(records), principal_pairs
+
+
+def _encode_header(count: int, pair_count: int, sections: List[bytes]) -> bytes:
+    # The sections follow the header, and the appended entries the sections
+    offsets = accumulate((len(section) for section in sections), initial=HEADER.size)
+    return HEADER.pack(
+        *_IndexHeader(INDEX_MAGIC, INDEX_VERSION, count, pair_count, *offsets)
+    )
+
+
+def _replace_file(path: str, chunks: Iterable[bytes]) -> None:
+    # Writes to a temporary file in the same directory and moves it over the
+    # file, so readers see either the old or the new contents
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".sshkey-index-")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _write_index(path: str, entries: List[IndexEntry]) -> None:
+    entries = sorted(entries, key=lambda entry: (entry.serial, entry.subject))
+    strings = _StringTable()
+    records, principal_pairs = _encode_records(entries, strings)
+
+    count = len(entries)
+    subjects = sorted(range(count), key=lambda number: entries[number].subject)
+    key_ids = sorted(range(count), key=lambda number: entries[number].key_id.encode())
+
+    sections = [
+        records,
+        b"".join(UINT32.pack(number) for number in subjects),
+        b"".join(UINT32.pack(number) for number in key_ids),
+        b"".join(PAIR.pack(offset, number) for _, offset, number in principal_pairs),
+        bytes(strings.data),
+    ]
+
+    _replace_file(
+        path, [_encode_header(count, len(principal_pairs), sections), *sections]
+    )
+
+
+class CertificateIndex:
+    """
+    A persistent index of certificate files, queried through a memory map.
+
+    The sorted sections are binary searched in place, so opening an index
+    does not read the entries, and looking up a certificate takes O(log n)
+    steps for n indexed certificates. Only the matching entries are decoded.
+
+    An index has a single writer at a time. Appended certificates are visible
+    to readers that open the index afterwards.
+
+    Args:
+        path (str): The path of the index file
+
+    Raises:
+        _EX.InvalidDataException: The file is not a certificate index
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._header: _IndexHeader = None
+        self._end = 0
+        self._appended: List[IndexEntry] = []
+        self._replaced = set()
+        self._open()
+
+    def _open(self) -> None:
+        # pylint: disable=consider-using-with
+        self._file = open(self.path, "rb")
+
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exception:
+            self._file.close()
+            raise _EX.InvalidDataException(
+                f"{self.path} is not a certificate index"
+            ) from exception
+
+        try:
+            self._read_header()
+        except (struct.error, _EX.InvalidDataException) as exception:
+            self.close()
+            raise _EX.InvalidDataException(
+                f"{self.path} is not a certificate index"
+            ) from exception
+
+    def _read_header(self) -> None:
+        header = _IndexHeader._make(HEADER.unpack_from(self._map))
+
+        if header.magic != INDEX_MAGIC or header.version != INDEX_VERSION:
+            raise _EX.InvalidDataException("Invalid index header")
+
+        if header.tail > len(self._map):
+            raise _EX.InvalidDataException("Truncated index")
+
+        self._header = header
+
+        self._appended = []
+        reader = WireReader(self._map[self._header.tail :])
+        end = 0
+        while not reader.at_end():
+            try:
+                entry = IndexEntry.decode(reader.read_string())
+            except (struct.error, ValueError, _EX.InvalidDataException):
+                # An incomplete entry from an interrupted append
+                break
+
+            self._appended.append(entry)
+            end = reader.offset
+
+        self._end = self._header.tail + end
+
+        # Appended entries replace the sorted entries for the same file
+        self._replaced = {entry.path for entry in self._appended}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self) -> Iterator[IndexEntry]:
+        return self._select(range(self._header.count), lambda entry: True)
+
+    def close(self) -> None:
+        """Closes the memory map and the index file"""
+        self._map.close()
+        self._file.close()
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        sources: Union[str, Iterable[str]],
+        workers: int = None,
+        use_processes: bool = True,
+    ) -> "CertificateIndex":
+        """
+        Writes a new index of certificate files and opens it.
+        The certificates are parsed across a pool of workers,
+        files that cannot be parsed are skipped.
+
+        Args:
+            path (str): The path of the index file
+            sources (Union[str, Iterable[str]]): A directory of *-cert.pub files,
+                                                 or an iterable of file paths
+            workers (int, optional): Number of workers. Defaults to the number of CPUs.
+            use_processes (bool, optional): Use a process pool instead of a thread pool.
+                                            Defaults to True.
+
+        Returns:
+            CertificateIndex: The opened index
+        """
+        entries = [
+            IndexEntry.from_certificate(item.result, item.source)
+            for item in load_certificates(sources, workers, use_processes)
+            if item.ok
+        ]
+        _write_index(path, entries)
+
+        return cls(path)
+
+    def _string(self, offset: int) -> bytes:
+        start = self._header.strings + offset
+        (length,) = UINT32.unpack_from(self._map, start)
+        return self._map[start + 4 : start + 4 + length]
+
+    def _serial_at(self, number: int) -> int:
+        return struct.unpack_from(
+            ">Q", self._map, self._header.records + number * RECORD.size
+        )[0]
+
+    def _entry_at(self, number: int) -> IndexEntry:
+        values = RECORD.unpack_from(
+            self._map, self._header.records + number * RECORD.size
+        )
+        key_id, principals, path = (self._string(offset) for offset in values[6:9])
+
+        return IndexEntry.from_record(
+            values,
+            key_id.decode("utf-8"),
+            _read_list(WireReader(principals)),
+            path.decode("utf-8"),
+        )
+
+    def _subject_at(self, position: int) -> bytes:
+        (number,) = UINT32.unpack_from(self._map, self._header.subjects + 4 * position)
+        start = self._header.records + number * RECORD.size + 8
+        return self._map[start : start + 32]
+
+    def _key_id_at(self, position: int) -> bytes:
+        (number,) = UINT32.unpack_from(self._map, self._header.key_ids + 4 * position)
+        (offset,) = UINT32.unpack_from(
+            self._map, self._header.records + number * RECORD.size + RECORD_KEY_ID
+        )
+        return self._string(offset)
+
+    def _principal_at(self, position: int) -> bytes:
+        offset, _ = PAIR.unpack_from(self._map, self._header.principals + 8 * position)
+        return self._string(offset)
+
+    @staticmethod
+    def _equal_range(count: int, key_at: Callable, value) -> range:
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if key_at(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+
+        end, high = low, count
+        while end < high:
+            middle = (end + high) // 2
+            if key_at(middle) <= value:
+                end = middle + 1
+            else:
+                high = middle
+
+        return range(low, end)
+
+    def _select(
+        self, numbers: Iterable[int], matches: Callable[[IndexEntry], bool]
+    ) -> Iterator[IndexEntry]:
+        for number in numbers:
+            entry = self._entry_at(number)
+            if entry.path not in self._replaced:
+                yield entry
+
+        for entry in self._appended:
+            if matches(entry):
+                yield entry
+
+    def find_serial(self, serial: int) -> List[IndexEntry]:
+        """
+        Finds the certificates with a serial number
+
+        Args:
+            serial (int): The serial number
+
+        Returns:
+            List[IndexEntry]: The matching entries
+        """
+        numbers = self._equal_range(self._header.count, self._serial_at, serial)
+        return list(self._select(numbers, lambda entry: entry.serial == serial))
+
+    def find_subject(self, subject: Union[PublicKey, str]) -> List[IndexEntry]:
+        """
+        Finds the certificates for a subject public key
+
+        Args:
+            subject (Union[PublicKey, str]): The public key, or its SHA256 fingerprint
+
+        Returns:
+            List[IndexEntry]: The matching entries
+        """
+        digest = _digest(subject)
+        positions = self._equal_range(self._header.count, self._subject_at, digest)
+        numbers = (
+            UINT32.unpack_from(self._map, self._header.subjects + 4 * position)[0]
+            for position in positions
+        )
+        return list(self._select(numbers, lambda entry: entry.subject == digest))
+
+    def find_key_id(self, key_id: str) -> List[IndexEntry]:
+        """
+        Finds the certificates with a key ID
+
+        Args:
+            key_id (str): The key ID
+
+        Returns:
+            List[IndexEntry]: The matching entries
+        """
+        value = key_id.encode("utf-8")
+        positions = self._equal_range(self._header.count, self._key_id_at, value)
+        numbers = (
+            UINT32.unpack_from(self._map, self._header.key_ids + 4 * position)[0]
+            for position in positions
+        )
+        return list(self._select(numbers, lambda entry: entry.key_id == key_id))
+
+    def find_principal(self, principal: str) -> List[IndexEntry]:
+        """
+        Finds the certificates listing a principal
+
+        Args:
+            principal (str): The principal
+
+        Returns:
+            List[IndexEntry]: The matching entries
+        """
+        value = principal.encode("utf-8")
+        positions = self._equal_range(
+            self._header.pair_count, self._principal_at, value
+        )
+        numbers = (
+            PAIR.unpack_from(self._map, self._header.principals + 8 * position)[1]
+            for position in positions
+        )
+        return list(self._select(numbers, lambda entry: principal in entry.principals))
+
+    def append(self, path: str, certificate: SSHCertificate = None) -> IndexEntry:
+        """
+        Adds a certificate file to the end of the index, replacing the
+        entry for the same file if there is one. The entry is written
+        to disk before it is added.
+
+        Args:
+            path (str): The path of the certificate file
+            certificate (SSHCertificate, optional): The certificate in the file.
+                                                    Defaults to loading it.
+
+        Returns:
+            IndexEntry: The added entry
+        """
+        if certificate is None:
+            certificate = SSHCertificate.from_file(path)
+
+        entry = IndexEntry.from_certificate(certificate, path)
+        data = entry.encode()
+        with open(self.path, "r+b") as file:
+            # Overwrites an incomplete entry from an interrupted append
+            file.seek(self._end)
+            file.write(data)
+            file.truncate()
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._end += len(data)
+
+        self._appended = [item for item in self._appended if item.path != entry.path]
+        self._appended.append(entry)
+        self._replaced.add(entry.path)
+
+        return entry
+
+    def write_certificate(
+        self, certificate: SSHCertificate, path: str, encoding: str = "utf-8"
+    ) -> IndexEntry:
+        """
+        Writes a certificate to a file with SSHCertificate.to_file,
+        and adds it to the index
+
+        Args:
+            certificate (SSHCertificate): The certificate
+            path (str): The path of the certificate file
+            encoding (str, optional): The encoding of the file. Defaults to 'utf-8'.
+
+        Returns:
+            IndexEntry: The added entry
+        """
+        certificate.to_file(path, encoding)
+        return self.append(path, certificate)
+
+    def compact(self, errors: List[BatchResult] = None) -> int:
+        """
+        Rewrites the index with the appended entries sorted into it.
+        Files that were removed are dropped from the index, and files that
+        changed since they were indexed are loaded again. Changed files that
+        can no longer be read or parsed are dropped as well.
+
+        The index is rewritten to a temporary file that replaces it, and is
+        opened again even if the rewrite fails.
+
+        Args:
+            errors (List[BatchResult], optional): A list to append a BatchResult
+                                                  to for each changed file that
+                                                  could not be loaded
+
+        Returns:
+            int: The number of certificates in the index
+        """
+        entries = []
+        for entry in self:
+            if entry.is_current():
+                entries.append(entry)
+                continue
+
+            try:
+                certificate = SSHCertificate.from_file(entry.path)
+            except FileNotFoundError:
+                continue
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                if errors is not None:
+                    errors.append(BatchResult(source=entry.path, exception=exception))
+                continue
+
+            entries.append(IndexEntry.from_certificate(certificate, entry.path))
+
+        self.close()
+        try:
+            _write_index(self.path, entries)
+        finally:
+            self._open()
+
+        return len(entries)
@@ -0,0 +1,299 @@
+"""
+Streaming parsers for authorized_keys and known_hosts files
+"""
+import hashlib
+import hmac
+import re
+from base64 import b64decode
+from typing import Iterable, Iterator, Tuple
+
+from . import exceptions as _EX
+from .keys import PUBKEY_TYPE_MAP, PublicKey
+from .utils import WireReader, ensure_string
+
+HASHED_HOST_PREFIX = "|1|"
+
+
+class KeyEntry:
+    """
+    Base class for a public key entry from an authorized_keys or known_hosts file.
+    The key is kept in its base64 form and only loaded when accessed.
+    """
+
+    __slots__ = ("key_type", "key_data", "comment", "line_number", "_key")
+
+    def __init__(
+        self,
+        key_type: str,
+        key_data: str,
+        comment: str = None,
+        line_number: int = None,
+    ):
+        self.key_type = key_type
+        self.key_data = key_data
+        self.comment = comment
+        self.line_number = line_number
+        self._key = None
+
+    def __str__(self):
+        return " ".join(
+            item for item in (self.key_type, self.key_data, self.comment) if item
+        )
+
+    @property
+    def key(self) -> PublicKey:
+        """
+        The public key of the entry, loaded on first access
+
+        Raises:
+            _EX.InvalidKeyException: The key is invalid or of an unsupported type
+
+        Returns:
+            PublicKey: Any of the PublicKey child classes
+        """
+        if self._key is None:
+            try:
+                wire_data = b64decode(self.key_data, validate=True)
+            except ValueError as exception:
+                raise _EX.InvalidKeyException(
+                    f"Invalid key data on line {self.line_number}"
+                ) from exception
+
+            key = PublicKey.from_wire(wire_data)
+            if WireReader(wire_data).read_string() != self.key_type.encode("utf-8"):
+                raise _EX.InvalidKeyException(
+                    f"The key type does not match the key on line {self.line_number}"
+                )
+
+            key.comment = self.comment
+            self._key = key
+
+        return self._key
+
+
+class AuthorizedKey(KeyEntry):
+    """
+    An entry from an authorized_keys file
+
+    Attributes:
+        options (list): The options preceding the key, e.g. 'no-pty' or 'command="..."'
+    """
+
+    __slots__ = ("options",)
+
+    def __init__(self, options: list = None, **kwargs):
+        super().__init__(**kwargs)
+        self.options = options or []
+
+    def __str__(self):
+        if self.options:
+            return ",".join(self.options) + " " + super().__str__()
+
+        return super().__str__()
+
+
+class KnownHost(KeyEntry):
+    """
+    An entry from a known_hosts file
+
+    Attributes:
+        marker (str): 'cert-authority', 'revoked' or None
+        hosts (list): The host patterns, or a single hashed hostname
+    """
+
+    __slots__ = ("marker", "hosts")
+
+    def __init__(self, hosts: list, marker: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.hosts = hosts
+        self.marker = marker
+
+    def __str__(self):
+        entry = ",".join(self.hosts) + " " + super().__str__()
+        if self.marker:
+            return f"@{self.marker} {entry}"
+
+        return entry
+
+    @property
+    def is_hashed(self) -> bool:
+        """True if the hostname is hashed (HashKnownHosts)"""
+        return len(self.hosts) == 1 and self.hosts[0].startswith(HASHED_HOST_PREFIX)
+
+    def matches(self, hostname: str, port: int = 22) -> bool:
+        """
+        Checks if the entry applies to a host, following the matching
+        rules of ssh: wildcards, negated patterns and hashed hostnames
+
+        Args:
+            hostname (str): The hostname or IP address
+            port (int, optional): The port of the host. Defaults to 22.
+
+        Returns:
+            bool: True if the entry matches the host
+        """
+        hostname = hostname.lower()
+        if port != 22:
+            hostname = f"[{hostname}]:{port}"
+
+        if self.is_hashed:
+            return _match_hashed_host(self.hosts[0], hostname)
+
+        matched = False
+        for pattern in self.hosts:
+            negated = pattern.startswith("!")
+            if _match_host_pattern(pattern.lstrip("!").lower(), hostname):
+                if negated:
+                    return False
+                matched = True
+
+        return matched
+
+
+def _match_host_pattern(pattern: str, hostname: str) -> bool:
+    regex = re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".")
+    return re.fullmatch(regex, hostname) is not None
+
+
+def _match_hashed_host(hashed: str, hostname: str) -> bool:
+    try:
+        salt, digest = hashed[len(HASHED_HOST_PREFIX) :].split("|")
+        salt, digest = b64decode(salt), b64decode(digest)
+    except ValueError:
+        return False
+
+    expected = hmac.new(salt, hostname.encode("utf-8"), hashlib.sha1).digest()
+    return hmac.compare_digest(expected, digest)
+
+
+def _is_key_type(token: str) -> bool:
+    return (
+        token in PUBKEY_TYPE_MAP
+        or token.startswith("sk-")
+        or token.endswith("-cert-v01@openssh.com")
+    )
+
+
+def _split_options(line: str) -> Tuple[list, str]:
+    """
+    Splits the leading options from an authorized_keys line,
+    respecting quoted values containing commas or whitespace
+    """
+    options, current, quoted, escaped = [], [], False, False
+
+    for index, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == "\\" and quoted:
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted and char == ",":
+            options.append("".join(current))
+            current = []
+            continue
+        elif not quoted and char in " \t":
+            options.append("".join(current))
+            return options, line[index:].lstrip()
+
+        current.append(char)
+
+    return options + ["".join(current)], ""
+
+
+def parse_authorized_keys(lines: Iterable[str]) -> Iterator[AuthorizedKey]:
+    """
+    Parses the entries of an authorized_keys file, line by line.
+    Blank lines, comments and malformed lines are skipped, like sshd does.
+
+    Args:
+        lines (Iterable[str]): The lines of the file, e.g. an open file object
+
+    Yields:
+        AuthorizedKey: The entry for each key, with the key loaded on access
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = ensure_string(line).strip()
+        if not line or line.startswith("#"):
+            continue
+
+        options = []
+        if not _is_key_type(line.split(None, 1)[0]):
+            options, line = _split_options(line)
+
+        parts = line.split(None, 2)
+        if len(parts) < 2 or not _is_key_type(parts[0]):
+            continue
+
+        yield AuthorizedKey(
+            options=options,
+            key_type=parts[0],
+            key_data=parts[1],
+            comment=parts[2] if len(parts) > 2 else None,
+            line_number=line_number,
+        )
+
+
+def parse_known_hosts(lines: Iterable[str]) -> Iterator[KnownHost]:
+    """
+    Parses the entries of a known_hosts file, line by line.
+    Blank lines, comments and malformed lines are skipped, like ssh does.
+
+    Args:
+        lines (Iterable[str]): The lines of the file, e.g. an open file object
+
+    Yields:
+        KnownHost: The entry for each key, with the key loaded on access
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = ensure_string(line).strip()
+        if not line or line.startswith("#"):
+            continue
+
+        marker = None
+        if line.startswith("@"):
+            marker, _, line = line[1:].partition(" ")
+            line = line.lstrip()
+
+        parts = line.split(None, 3)
+        if len(parts) < 3 or not _is_key_type(parts[1]):
+            continue
+
+        yield KnownHost(
+            hosts=parts[0].split(","),
+            marker=marker,
+            key_type=parts[1],
+            key_data=parts[2],
+            comment=parts[3] if len(parts) > 3 else None,
+            line_number=line_number,
+        )
+
+
+def read_authorized_keys(path: str, encoding: str = "utf-8") -> Iterator[AuthorizedKey]:
+    """
+    Streams the entries of an authorized_keys file
+
+    Args:
+        path (str): The path to the file
+        encoding (str, optional): The encoding of the file. Defaults to 'utf-8'.
+
+    Yields:
+        AuthorizedKey: The entry for each key, with the key loaded on access
+    """
+    with open(path, "r", encoding=encoding) as file:
+        yield from parse_authorized_keys(file)
+
+
+def read_known_hosts(path: str, encoding: str = "utf-8") -> Iterator[KnownHost]:
+    """
+    Streams the entries of a known_hosts file
+
+    Args:
+        path (str): The path to the file
+        encoding (str, optional): The encoding of the file. Defaults to 'utf-8'.
+
+    Yields:
+        KnownHost: The entry for each key, with the key loaded on access
+    """
+    with open(path, "r", encoding=encoding) as file:
+        yield from parse_known_hosts(file)
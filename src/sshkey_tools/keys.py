@@ -1,7 +1,8 @@
 """
 Classes for handling SSH public/private keys
 """
-from base64 import b64decode
+# pylint: disable=too-many-lines
+from base64 import b64decode, b64encode
 from enum import Enum
 from struct import unpack
 from typing import Union
@@ -26,7 +27,13 @@ from cryptography.hazmat.primitives.asymmetric import padding as _PADDING
 from cryptography.hazmat.primitives.asymmetric import rsa as _RSA
 
 from . import exceptions as _EX
-from .utils import ensure_bytestring, ensure_string
+from .utils import (
+    WireReader,
+    encode_mpint,
+    encode_string,
+    ensure_bytestring,
+    ensure_string,
+)
 from .utils import md5_fingerprint as _FP_MD5
 from .utils import sha256_fingerprint as _FP_SHA256
 from .utils import sha512_fingerprint as _FP_SHA512
@@ -46,6 +53,23 @@ PRIVKEY_MAP = {
     _Ed25519PrivateKey: "Ed25519PrivateKey",
 }
 
+PUBKEY_TYPE_MAP = {
+    "ssh-rsa": "RsaPublicKey",
+    "ssh-dss": "DsaPublicKey",
+    "ecdsa-sha2-nistp256": "EcdsaPublicKey",
+    "ecdsa-sha2-nistp384": "EcdsaPublicKey",
+    "ecdsa-sha2-nistp521": "EcdsaPublicKey",
+    "ssh-ed25519": "Ed25519PublicKey",
+}
+
+ED25519_RAW_KEY_LENGTH = 32
+
+ECDSA_CURVES = {
+    "nistp256": _ECDSA.SECP256R1,
+    "nistp384": _ECDSA.SECP384R1,
+    "nistp521": _ECDSA.SECP521R1,
+}
+
 ECDSA_HASHES = {
     "secp256r1": _HASHES.SHA256,
     "secp384r1": _HASHES.SHA384,
@@ -119,6 +143,7 @@ class PublicKey:
     def __init__(
         self, key: PrivkeyClasses = None, comment: Union[str, bytes] = None, **kwargs
     ) -> None:
+        self._cache = {}
         self.key = key
         self.comment = comment
         self.public_numbers = kwargs.get("public_numbers", None)
@@ -130,6 +155,23 @@ class PublicKey:
             _SERIALIZATION.PublicFormat.OpenSSH,
         ]
 
+    def __setattr__(self, name, value):
+        # The cached encoding and fingerprints are only valid for the current key,
+        # the comment is not part of them
+        if name in ("key", "public_numbers"):
+            self.__dict__["_cache"] = {}
+
+        super().__setattr__(name, value)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["key"] = self.serialize()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["key"] = _SERIALIZATION.load_ssh_public_key(state["key"])
+        self.__dict__.update(state)
+
     @classmethod
     def from_class(
         cls,
@@ -178,10 +220,19 @@ class PublicKey:
         if len(split) > 2:
             comment = split[2]
 
-        return cls.from_class(
-            key_class=_SERIALIZATION.load_ssh_public_key(b" ".join(split[:2])),
-            comment=comment,
-        )
+        try:
+            wire_data = b64decode(split[1])
+        except (IndexError, ValueError) as exception:
+            raise _EX.InvalidKeyException("Invalid public key") from exception
+
+        key = cls.from_wire(wire_data)
+        if WireReader(wire_data).read_string() != split[0]:
+            raise _EX.InvalidKeyException(
+                "The key type does not match the type of the encoded key"
+            )
+
+        key.comment = comment
+        return key
 
     @classmethod
     def from_file(cls, path: str) -> "PublicKey":
@@ -200,28 +251,84 @@ class PublicKey:
         return cls.from_string(data)
 
     @classmethod
-    # pylint: disable=broad-except
     def from_bytes(cls, data: bytes) -> "PublicKey":
         """
-        Loads a public key from byte data
+        Loads a public key from byte data, either in the SSH wire format
+        or as the 32 raw bytes of an Ed25519 public key
 
         Args:
             data (bytes): The bytestring containing the public key
 
         Raises:
-            _EX.InvalidKeyException: Invalid data input
+            _EX.InvalidKeyException: Invalid data input or unsupported key type
+
+        Returns:
+            PublicKey: PublicKey subclass depending on the key type
+        """
+        if len(data) == ED25519_RAW_KEY_LENGTH and issubclass(Ed25519PublicKey, cls):
+            return Ed25519PublicKey.from_raw_bytes(data)
+
+        return cls.from_wire(data)
+
+    @classmethod
+    def from_wire(cls, data: bytes) -> "PublicKey":
+        """
+        Loads a public key from the SSH wire format
+        (the base64-decoded middle part of an OpenSSH public key),
+        dispatching on the leading key type string
+
+        Args:
+            data (bytes): The encoded public key
+
+        Raises:
+            _EX.InvalidKeyException: Unsupported key type or invalid key data
 
         Returns:
             PublicKey: PublicKey subclass depending on the key type
         """
-        for key_class in PUBKEY_MAP.values():
-            try:
-                key = globals()[key_class].from_raw_bytes(data)
-                return key
-            except Exception:
-                pass
+        reader = WireReader(data)
 
-        raise _EX.InvalidKeyException("Invalid public key")
+        try:
+            key_type = str(reader.read_string(), "utf-8")
+        except (_EX.InvalidDataException, UnicodeDecodeError) as exception:
+            raise _EX.InvalidKeyException("Invalid public key data") from exception
+
+        key_class = globals().get(PUBKEY_TYPE_MAP.get(key_type))
+        if key_class is None or not issubclass(key_class, cls):
+            raise _EX.InvalidKeyException(
+                f"Unsupported public key type for {cls.__name__}: {key_type}"
+            )
+
+        try:
+            key = key_class.from_reader(reader, key_type)
+        except (_EX.InvalidDataException, ValueError) as exception:
+            raise _EX.InvalidKeyException(
+                f"Invalid {key_type} public key data"
+            ) from exception
+
+        if not reader.at_end():
+            raise _EX.InvalidKeyException("Unexpected data after the public key")
+
+        key.cache_raw_bytes(data)
+        return key
+
+    @classmethod
+    def from_reader(cls, reader: WireReader, key_type: str = None) -> "PublicKey":
+        """
+        Reads the key components following the key type string in
+        the SSH wire format, implemented by the child classes
+
+        Args:
+            reader (WireReader): The reader positioned after the key type
+            key_type (str, optional): The key type string, checked against
+                                      the key data where it names the curve
+
+        Returns:
+            PublicKey: Any of the PublicKey child classes
+        """
+        raise _EX.InvalidClassCallException(
+            "The base class cannot be read from the wire format"
+        )
 
     def get_fingerprint(
         self, hash_method: FingerprintHashes = FingerprintHashes.SHA256
@@ -235,7 +342,11 @@ class PublicKey:
         Returns:
             str: The hash of the public key
         """
-        return hash_method(self.raw_bytes())
+        fingerprint = self._cache.get(hash_method)
+        if fingerprint is None:
+            fingerprint = self._cache[hash_method] = hash_method(self.raw_bytes())
+
+        return fingerprint
 
     def serialize(self) -> bytes:
         """
@@ -244,7 +355,26 @@ class PublicKey:
         Returns:
             bytes: The serialized key in OpenSSH format
         """
-        return self.key.public_bytes(*self.export_opts)
+        serialized = self._cache.get("serialized")
+        if serialized is None:
+            raw_bytes = self.raw_bytes()
+            serialized = self._cache["serialized"] = (
+                WireReader(raw_bytes).read_string().tobytes()
+                + b" "
+                + b64encode(raw_bytes)
+            )
+
+        return serialized
+
+    def cache_raw_bytes(self, data: bytes) -> None:
+        """
+        Keeps the SSH wire encoding the key was read from,
+        so that it is not encoded again by raw_bytes
+
+        Args:
+            data (bytes): The public key in the SSH wire format
+        """
+        self._cache["raw_bytes"] = bytes(data)
 
     def raw_bytes(self) -> bytes:
         """
@@ -253,7 +383,18 @@ class PublicKey:
         Returns:
             bytes: The raw certificate bytes
         """
-        return b64decode(self.serialize().split(b" ")[1])
+        raw_bytes = self._cache.get("raw_bytes")
+        if raw_bytes is None:
+            raw_bytes = self._cache["raw_bytes"] = self._encode_wire()
+
+        return raw_bytes
+
+    def _encode_wire(self) -> bytes:
+        """
+        Encodes the public key in the SSH wire format,
+        overridden by child classes to encode from the public numbers
+        """
+        return b64decode(self.key.public_bytes(*self.export_opts).split(b" ")[1])
 
     def to_string(self, encoding: str = "utf-8") -> str:
         """
@@ -463,6 +604,30 @@ class RsaPublicKey(PublicKey):
         """
         return cls(key=_RSA.RSAPublicNumbers(e, n).public_key())
 
+    @classmethod
+    # pylint: disable=unused-argument
+    def from_reader(cls, reader: WireReader, key_type: str = None) -> "RsaPublicKey":
+        """
+        Reads the RSA public numbers (e, n) from the SSH wire format
+
+        Args:
+            reader (WireReader): The reader positioned after the key type
+            key_type (str, optional): The key type string, not used
+
+        Returns:
+            RsaPublicKey: An instance of RsaPublicKey
+        """
+        e = reader.read_mpint()
+        n = reader.read_mpint()
+
+        return cls.from_numbers(e=e, n=n)
+
+    def _encode_wire(self) -> bytes:
+        numbers = self.key.public_numbers()
+        return (
+            encode_string("ssh-rsa") + encode_mpint(numbers.e) + encode_mpint(numbers.n)
+        )
+
     def verify(
         self, data: bytes, signature: bytes, hash_alg: RsaAlgs = RsaAlgs.SHA512
     ) -> None:
@@ -632,6 +797,38 @@ class DsaPublicKey(PublicKey):
             ).public_key()
         )
 
+    @classmethod
+    # pylint: disable=unused-argument
+    def from_reader(cls, reader: WireReader, key_type: str = None) -> "DsaPublicKey":
+        """
+        Reads the DSA parameters (p, q, g) and public number (y)
+        from the SSH wire format
+
+        Args:
+            reader (WireReader): The reader positioned after the key type
+            key_type (str, optional): The key type string, not used
+
+        Returns:
+            DsaPublicKey: An instance of DsaPublicKey
+        """
+        p = reader.read_mpint()
+        q = reader.read_mpint()
+        g = reader.read_mpint()
+        y = reader.read_mpint()
+
+        return cls.from_numbers(p=p, q=q, g=g, y=y)
+
+    def _encode_wire(self) -> bytes:
+        numbers = self.key.public_numbers()
+        parameters = numbers.parameter_numbers
+        return (
+            encode_string("ssh-dss")
+            + encode_mpint(parameters.p)
+            + encode_mpint(parameters.q)
+            + encode_mpint(parameters.g)
+            + encode_mpint(numbers.y)
+        )
+
     def verify(self, data: bytes, signature: bytes) -> None:
         """
         Verifies a signature
@@ -764,6 +961,57 @@ class EcdsaPublicKey(PublicKey):
             ).public_key()
         )
 
+    @classmethod
+    def from_reader(cls, reader: WireReader, key_type: str = None) -> "EcdsaPublicKey":
+        """
+        Reads the curve name and the encoded public point
+        from the SSH wire format
+
+        Args:
+            reader (WireReader): The reader positioned after the key type
+            key_type (str, optional): The key type string, which must name
+                                      the same curve. Defaults to not checked.
+
+        Raises:
+            _EX.InvalidCurveException: The curve is not supported
+            _EX.InvalidKeyException: The curve does not match the key type
+
+        Returns:
+            EcdsaPublicKey: An instance of EcdsaPublicKey
+        """
+        curve_name = str(reader.read_string(), "utf-8")
+        point = reader.read_string().tobytes()
+
+        try:
+            curve = ECDSA_CURVES[curve_name]()
+        except KeyError:
+            raise _EX.InvalidCurveException(
+                f"Invalid curve, must be one of {', '.join(ECDSA_CURVES.keys())}"
+            ) from KeyError
+
+        if key_type is not None and key_type != f"ecdsa-sha2-{curve_name}":
+            raise _EX.InvalidKeyException(
+                f"The curve {curve_name} does not match the key type {key_type}"
+            )
+
+        return cls(key=_ECDSA.EllipticCurvePublicKey.from_encoded_point(curve, point))
+
+    def _encode_wire(self) -> bytes:
+        numbers = self.key.public_numbers()
+        key_size = numbers.curve.key_size
+        coord_size = (key_size + 7) // 8
+        curve_name = f"nistp{key_size}"
+
+        return (
+            encode_string("ecdsa-sha2-" + curve_name)
+            + encode_string(curve_name)
+            + encode_string(
+                b"\x04"
+                + numbers.x.to_bytes(coord_size, "big")
+                + numbers.y.to_bytes(coord_size, "big")
+            )
+        )
+
     def verify(self, data: bytes, signature: bytes) -> None:
         """
         Verifies a signature
@@ -894,6 +1142,35 @@ class Ed25519PublicKey(PublicKey):
             _ED25519.Ed25519PublicKey.from_public_bytes(data=raw_bytes)
         )
 
+    @classmethod
+    # pylint: disable=unused-argument
+    def from_reader(
+        cls, reader: WireReader, key_type: str = None
+    ) -> "Ed25519PublicKey":
+        """
+        Reads the raw public key bytes from the SSH wire format
+
+        Args:
+            reader (WireReader): The reader positioned after the key type
+            key_type (str, optional): The key type string, not used
+
+        Returns:
+            Ed25519PublicKey: Instance of Ed25519PublicKey
+        """
+        return cls(
+            key=_ED25519.Ed25519PublicKey.from_public_bytes(
+                data=reader.read_string().tobytes()
+            )
+        )
+
+    def _encode_wire(self) -> bytes:
+        return encode_string("ssh-ed25519") + encode_string(
+            self.key.public_bytes(
+                encoding=_SERIALIZATION.Encoding.Raw,
+                format=_SERIALIZATION.PublicFormat.Raw,
+            )
+        )
+
     def verify(self, data: bytes, signature: bytes) -> None:
         """
         Verifies a signature
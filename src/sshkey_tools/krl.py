@@ -0,0 +1,617 @@
+"""
+OpenSSH Key Revocation Lists (KRL), as described in PROTOCOL.krl
+of the OpenSSH source.
+
+Certificates are revoked by serial number or key ID for a given CA,
+and keys (including the subject keys of certificates) explicitly or by
+their SHA1 or SHA256 hash. The revoked items are held in hash sets,
+so checking a certificate does not depend on the number of revoked serials.
+"""
+import hashlib
+import time
+from bisect import bisect_right
+from struct import pack
+from typing import Dict, Iterator, List, Tuple, Union
+
+from . import exceptions as _EX
+from .cert import SSHCertificate
+from .keys import PublicKey
+from .utils import WireReader, encode_string
+
+KRL_MAGIC = 0x5353484B524C0A00
+KRL_FORMAT_VERSION = 1
+
+SECTION_CERTIFICATES = 1
+SECTION_EXPLICIT_KEY = 2
+SECTION_FINGERPRINT_SHA1 = 3
+SECTION_SIGNATURE = 4
+SECTION_FINGERPRINT_SHA256 = 5
+
+CERT_SERIAL_LIST = 0x20
+CERT_SERIAL_RANGE = 0x21
+CERT_SERIAL_BITMAP = 0x22
+CERT_KEY_ID = 0x23
+
+# Serials closer than this are grouped in a bitmap when that is smaller than a list
+BITMAP_MAX_GAP = 64
+
+MAX_SERIAL = 0xFFFFFFFFFFFFFFFF
+
+
+def _encode_uint64(value: int) -> bytes:
+    return pack(">Q", value)
+
+
+def _encode_section(section_type: int, data: bytes) -> bytes:
+    return bytes((section_type,)) + encode_string(data)
+
+
+def _key_blob(key: Union[PublicKey, bytes, None]) -> bytes:
+    if key is None:
+        return b""
+
+    if isinstance(key, PublicKey):
+        return key.raw_bytes()
+
+    return bytes(key)
+
+
+def _encode_bitmap(serials: List[int]) -> bytes:
+    # An mpint with the lowest bit for the first serial
+    offset = serials[0]
+    bitmap = bytearray((serials[-1] - offset) // 8 + 1)
+    for serial in serials:
+        serial -= offset
+        bitmap[-1 - (serial >> 3)] |= 1 << (serial & 7)
+
+    if bitmap[0] & 0x80:
+        bitmap.insert(0, 0)
+
+    return encode_string(bytes(bitmap))
+
+
+class RevokedCertificates:
+    """
+    The certificates revoked for one CA, by serial number and key ID
+
+    Individual serials are kept in a set, and ranges of serials as sorted,
+    non-overlapping intervals, so a serial is checked with a hash lookup
+    and a binary search over the ranges.
+
+    Args:
+        ca_key (bytes): The CA public key in the wire format,
+                        empty for certificates signed by any CA
+    """
+
+    def __init__(self, ca_key: bytes = b""):
+        self.ca_key = ca_key
+        self.serials = set()
+        self.key_ids = set()
+
+        self._range_starts = []
+        self._range_ends = []
+
+    def __len__(self) -> int:
+        # The number of entries, a range counts once however wide it is
+        return len(self.serials) + len(self._range_starts) + len(self.key_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.serials or self._range_starts or self.key_ids)
+
+    def count(self) -> int:
+        """
+        Counts the revoked serial numbers and key IDs, with every serial
+        in a range counted separately
+
+        Returns:
+            int: The number of revoked serial numbers and key IDs
+        """
+        return (
+            len(self.serials)
+            + len(self.key_ids)
+            + sum(
+                end - start + 1
+                for start, end in zip(self._range_starts, self._range_ends)
+            )
+        )
+
+    @property
+    def ranges(self) -> List[Tuple[int, int]]:
+        """The revoked ranges of serials, as (first, last) tuples"""
+        return list(zip(self._range_starts, self._range_ends))
+
+    def revoke_serial(self, serial: int, serial_max: int = None) -> None:
+        """
+        Revokes a serial number, or a range of serial numbers
+
+        Args:
+            serial (int): The serial number, or the first of the range
+            serial_max (int, optional): The last serial number of the range
+
+        Raises:
+            _EX.InvalidDataException: The serial number or range is invalid
+        """
+        if serial_max is None or serial_max == serial:
+            if not 0 < serial <= MAX_SERIAL:
+                raise _EX.InvalidDataException(f"Invalid serial number {serial}")
+
+            self.serials.add(serial)
+            return
+
+        if not 0 < serial < serial_max <= MAX_SERIAL:
+            raise _EX.InvalidDataException(
+                f"Invalid serial number range {serial}-{serial_max}"
+            )
+
+        self._add_range(serial, serial_max)
+
+    def _add_range(self, start: int, end: int) -> None:
+        # Merge with any overlapping or adjacent ranges
+        first = bisect_right(self._range_ends, start - 2)
+        last = bisect_right(self._range_starts, end + 1)
+
+        if first < last:
+            start = min(start, self._range_starts[first])
+            end = max(end, self._range_ends[last - 1])
+
+        self._range_starts[first:last] = [start]
+        self._range_ends[first:last] = [end]
+
+    def revoke_key_id(self, key_id: str) -> None:
+        """
+        Revokes the certificates with a key ID
+
+        Args:
+            key_id (str): The key ID
+        """
+        self.key_ids.add(key_id)
+
+    def merge(self, other: "RevokedCertificates") -> None:
+        """
+        Adds the serial numbers and key IDs revoked in another section
+
+        Args:
+            other (RevokedCertificates): The other section
+        """
+        self.serials |= other.serials
+        self.key_ids |= other.key_ids
+
+        for start, end in other.ranges:
+            self._add_range(start, end)
+
+    def is_serial_revoked(self, serial: int) -> bool:
+        """
+        Checks if a serial number is revoked
+
+        Args:
+            serial (int): The serial number
+
+        Returns:
+            bool: True if the serial is revoked
+        """
+        if serial in self.serials:
+            return True
+
+        index = bisect_right(self._range_starts, serial) - 1
+        return index >= 0 and serial <= self._range_ends[index]
+
+    def is_revoked(self, certificate: SSHCertificate) -> bool:
+        """
+        Checks if a certificate is revoked by its serial number or key ID.
+        A serial number of zero is never revoked.
+
+        Args:
+            certificate (SSHCertificate): The certificate
+
+        Returns:
+            bool: True if the certificate is revoked
+        """
+        serial = certificate.get("serial")
+        if serial and self.is_serial_revoked(serial):
+            return True
+
+        return bool(self.key_ids) and certificate.get("key_id") in self.key_ids
+
+    def _get_intervals(self) -> List[Tuple[int, int]]:
+        intervals = []
+        ranges = iter(self.ranges + [(MAX_SERIAL + 1, MAX_SERIAL + 1)])
+        next_range = next(ranges)
+
+        for serial in sorted(self.serials):
+            while next_range[1] < serial:
+                intervals.append(next_range)
+                next_range = next(ranges)
+
+            if serial < next_range[0]:
+                intervals.append((serial, serial))
+
+        intervals.append(next_range)
+        intervals.extend(ranges)
+
+        # Join adjacent intervals, the sentinel is dropped
+        merged = []
+        for start, end in intervals[:-1]:
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+
+        return merged
+
+    def _encode_subsections(self) -> Iterator[bytes]:
+        listed = []
+        bitmaps = []
+        group = []
+
+        def close_group():
+            # A bitmap costs the offset, the mpint and the subsection header,
+            # a list entry eight bytes per serial
+            size = 8 + 4 + (group[-1] - group[0]) // 8 + 2 + 5
+            if len(group) > 1 and size < 8 * len(group):
+                bitmaps.append(_encode_uint64(group[0]) + _encode_bitmap(group))
+            else:
+                listed.extend(group)
+
+        for start, end in self._get_intervals():
+            if end - start >= 2:
+                yield _encode_section(
+                    CERT_SERIAL_RANGE, _encode_uint64(start) + _encode_uint64(end)
+                )
+                continue
+
+            for serial in range(start, end + 1):
+                if group and serial - group[-1] > BITMAP_MAX_GAP:
+                    close_group()
+                    group = []
+                group.append(serial)
+
+        if group:
+            close_group()
+
+        if listed:
+            yield _encode_section(
+                CERT_SERIAL_LIST, b"".join(_encode_uint64(s) for s in listed)
+            )
+
+        for bitmap in bitmaps:
+            yield _encode_section(CERT_SERIAL_BITMAP, bitmap)
+
+        if self.key_ids:
+            yield _encode_section(
+                CERT_KEY_ID,
+                b"".join(encode_string(key_id) for key_id in sorted(self.key_ids)),
+            )
+
+    def __bytes__(self):
+        return b"".join(
+            (
+                encode_string(self.ca_key),
+                encode_string(b""),
+                *self._encode_subsections(),
+            )
+        )
+
+    @classmethod
+    def from_reader(cls, reader: WireReader) -> "RevokedCertificates":
+        """
+        Decodes a certificate section of a KRL
+
+        Args:
+            reader (WireReader): The reader over the section data
+
+        Raises:
+            _EX.InvalidDataException: The section is invalid
+
+        Returns:
+            RevokedCertificates: The revoked certificates for the CA of the section
+        """
+        revoked = cls(reader.read_string().tobytes())
+        reader.skip_string()
+
+        while not reader.at_end():
+            section_type = reader.read_uint8()
+            section = WireReader(reader.read_string())
+
+            if section_type == CERT_SERIAL_LIST:
+                while not section.at_end():
+                    revoked.revoke_serial(section.read_uint64())
+            elif section_type == CERT_SERIAL_RANGE:
+                revoked.revoke_serial(section.read_uint64(), section.read_uint64())
+            elif section_type == CERT_SERIAL_BITMAP:
+                revoked._read_bitmap(section.read_uint64(), section.read_string())
+            elif section_type == CERT_KEY_ID:
+                while not section.at_end():
+                    revoked.revoke_key_id(str(section.read_string(), "utf-8"))
+            else:
+                raise _EX.InvalidDataException(
+                    f"Unsupported KRL certificate section {section_type}"
+                )
+
+            if not section.at_end():
+                raise _EX.InvalidDataException("Unexpected data in KRL section")
+
+        return revoked
+
+    def _read_bitmap(self, offset: int, bitmap: memoryview) -> None:
+        # The bitmap is big-endian, the lowest bit is the serial at the offset
+        position = offset + 8 * len(bitmap)
+        for byte in bitmap:
+            position -= 8
+            for bit in range(8) if byte else ():
+                if byte & (1 << bit):
+                    self.revoke_serial(position + bit)
+
+
+class KRL:
+    """
+    An OpenSSH Key Revocation List, for use with the RevokedKeys
+    option of sshd, or to check certificates and keys before use.
+
+    Signature sections are skipped when reading, since OpenSSH
+    does not create them.
+
+    Args:
+        version (int, optional): The version number of the KRL. Defaults to 0.
+        comment (str, optional): A comment for the KRL. Defaults to "".
+        generated_date (int, optional): Time of generation (unix timestamp).
+                                        Defaults to the time of encoding.
+    """
+
+    def __init__(self, version: int = 0, comment: str = "", generated_date: int = None):
+        self.version = version
+        self.comment = comment
+        self.generated_date = generated_date
+
+        self.certificates: Dict[bytes, RevokedCertificates] = {}
+        self.keys = set()
+        self.sha1_hashes = set()
+        self.sha256_hashes = set()
+
+    def get_certificates(self, ca_key: Union[PublicKey, bytes] = None):
+        """
+        Gets the certificates revoked for a CA, creating the section if needed
+
+        Args:
+            ca_key (Union[PublicKey, bytes], optional): The CA public key, or its
+                wire format. Defaults to None, for certificates from any CA.
+
+        Returns:
+            RevokedCertificates: The revoked certificates for the CA
+        """
+        ca_blob = _key_blob(ca_key)
+        revoked = self.certificates.get(ca_blob)
+        if revoked is None:
+            revoked = self.certificates[ca_blob] = RevokedCertificates(ca_blob)
+
+        return revoked
+
+    def revoke_certificate(self, certificate: SSHCertificate) -> None:
+        """
+        Revokes a certificate by the serial number, or the key ID if the
+        serial number is zero, for the CA that signed it
+
+        Args:
+            certificate (SSHCertificate): The certificate to revoke
+        """
+        revoked = self.get_certificates(certificate.footer.ca_pubkey.raw_bytes())
+        serial = certificate.get("serial")
+
+        if serial:
+            revoked.revoke_serial(serial)
+        else:
+            revoked.revoke_key_id(certificate.get("key_id"))
+
+    def revoke_serial(
+        self, ca_key: Union[PublicKey, bytes, None], serial: int, serial_max: int = None
+    ) -> None:
+        """
+        Revokes a serial number or range of serial numbers for a CA
+
+        Args:
+            ca_key (Union[PublicKey, bytes, None]): The CA public key, or None for any CA
+            serial (int): The serial number, or the first of the range
+            serial_max (int, optional): The last serial number of the range
+        """
+        self.get_certificates(ca_key).revoke_serial(serial, serial_max)
+
+    def revoke_key_id(self, ca_key: Union[PublicKey, bytes, None], key_id: str) -> None:
+        """
+        Revokes the certificates with a key ID for a CA
+
+        Args:
+            ca_key (Union[PublicKey, bytes, None]): The CA public key, or None for any CA
+            key_id (str): The key ID
+        """
+        self.get_certificates(ca_key).revoke_key_id(key_id)
+
+    def revoke_key(self, key: Union[PublicKey, SSHCertificate]) -> None:
+        """
+        Revokes a public key, along with all certificates for it and,
+        if it is a CA key, all certificates it has signed
+
+        Args:
+            key (Union[PublicKey, SSHCertificate]): The key, or a certificate
+                                                    for the key
+        """
+        self.keys.add(self._get_key_blob(key))
+
+    def revoke_key_hash(
+        self, key: Union[PublicKey, SSHCertificate], sha1: bool = False
+    ) -> None:
+        """
+        Revokes a public key by its hash, which does not reveal the key
+
+        Args:
+            key (Union[PublicKey, SSHCertificate]): The key, or a certificate
+                                                    for the key
+            sha1 (bool, optional): Use SHA1 instead of SHA256, for older
+                                   versions of OpenSSH. Defaults to False.
+        """
+        blob = self._get_key_blob(key)
+
+        if sha1:
+            self.sha1_hashes.add(hashlib.sha1(blob).digest())
+        else:
+            self.sha256_hashes.add(hashlib.sha256(blob).digest())
+
+    @staticmethod
+    def _get_key_blob(key: Union[PublicKey, SSHCertificate]) -> bytes:
+        if isinstance(key, SSHCertificate):
+            key = key.get("public_key")
+
+        return key.raw_bytes()
+
+    def _is_key_revoked(self, blob: bytes) -> bool:
+        return (
+            blob in self.keys
+            or (
+                bool(self.sha256_hashes)
+                and hashlib.sha256(blob).digest() in self.sha256_hashes
+            )
+            or (
+                bool(self.sha1_hashes)
+                and hashlib.sha1(blob).digest() in self.sha1_hashes
+            )
+        )
+
+    def is_revoked(self, key: Union[PublicKey, SSHCertificate]) -> bool:
+        """
+        Checks if a key or certificate is revoked. A certificate is revoked
+        if its subject key or CA key is revoked, or if it is revoked by serial
+        or key ID for its CA or for any CA.
+
+        Args:
+            key (Union[PublicKey, SSHCertificate]): The key or certificate
+
+        Returns:
+            bool: True if revoked
+        """
+        if not isinstance(key, SSHCertificate):
+            return self._is_key_revoked(key.raw_bytes())
+
+        ca_blob = key.footer.ca_pubkey.raw_bytes()
+        for section in (self.certificates.get(ca_blob), self.certificates.get(b"")):
+            if section is not None and section.is_revoked(key):
+                return True
+
+        if self.keys or self.sha1_hashes or self.sha256_hashes:
+            return self._is_key_revoked(
+                self._get_key_blob(key)
+            ) or self._is_key_revoked(ca_blob)
+
+        return False
+
+    def __bytes__(self):
+        generated_date = self.generated_date
+        if generated_date is None:
+            generated_date = int(time.time())
+
+        sections = [
+            _encode_uint64(KRL_MAGIC),
+            pack(">I", KRL_FORMAT_VERSION),
+            _encode_uint64(self.version),
+            _encode_uint64(generated_date),
+            _encode_uint64(0),
+            encode_string(b""),
+            encode_string(self.comment),
+        ]
+
+        for ca_blob in sorted(self.certificates):
+            sections.append(
+                _encode_section(SECTION_CERTIFICATES, bytes(self.certificates[ca_blob]))
+            )
+
+        for section_type, items in (
+            (SECTION_EXPLICIT_KEY, self.keys),
+            (SECTION_FINGERPRINT_SHA1, self.sha1_hashes),
+            (SECTION_FINGERPRINT_SHA256, self.sha256_hashes),
+        ):
+            if items:
+                sections.append(
+                    _encode_section(
+                        section_type,
+                        b"".join(encode_string(item) for item in sorted(items)),
+                    )
+                )
+
+        return b"".join(sections)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KRL":
+        """
+        Decodes a KRL in the binary format
+
+        Args:
+            data (bytes): The KRL data
+
+        Raises:
+            _EX.InvalidDataException: The data is not a valid KRL
+
+        Returns:
+            KRL: The decoded KRL
+        """
+        reader = WireReader(data)
+
+        if reader.read_uint64() != KRL_MAGIC:
+            raise _EX.InvalidDataException("The data is not a KRL")
+
+        if reader.read_uint32() != KRL_FORMAT_VERSION:
+            raise _EX.InvalidDataException("Unsupported KRL format version")
+
+        version = reader.read_uint64()
+        generated_date = reader.read_uint64()
+        reader.read_uint64()
+        reader.skip_string()
+
+        krl = cls(version, str(reader.read_string(), "utf-8"), generated_date)
+        targets = {
+            SECTION_EXPLICIT_KEY: krl.keys,
+            SECTION_FINGERPRINT_SHA1: krl.sha1_hashes,
+            SECTION_FINGERPRINT_SHA256: krl.sha256_hashes,
+        }
+
+        while not reader.at_end():
+            section_type = reader.read_uint8()
+            section = WireReader(reader.read_string())
+
+            if section_type == SECTION_CERTIFICATES:
+                revoked = RevokedCertificates.from_reader(section)
+                if revoked.ca_key in krl.certificates:
+                    krl.certificates[revoked.ca_key].merge(revoked)
+                else:
+                    krl.certificates[revoked.ca_key] = revoked
+            elif section_type in targets:
+                while not section.at_end():
+                    targets[section_type].add(section.read_string().tobytes())
+            elif section_type == SECTION_SIGNATURE:
+                break
+            else:
+                raise _EX.InvalidDataException(
+                    f"Unsupported KRL section type {section_type}"
+                )
+
+        return krl
+
+    @classmethod
+    def from_file(cls, path: str) -> "KRL":
+        """
+        Loads a KRL from a file
+
+        Args:
+            path (str): The path to the file
+
+        Returns:
+            KRL: The decoded KRL
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    def to_file(self, path: str) -> None:
+        """
+        Writes the KRL to a file
+
+        Args:
+            path (str): The path to the file
+        """
+        with open(path, "wb") as file:
+            file.write(bytes(self))
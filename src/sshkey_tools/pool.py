@@ -0,0 +1,312 @@
+"""
+Pools of pre-generated private keys, refilled in the background by a pool of workers
+"""
+import threading
+import time
+from dataclasses import dataclass
+from queue import Empty, Queue
+from typing import Dict, Tuple
+
+from .batch import create_executor, generate_key_data
+from .keys import PrivateKey
+
+# Failed key generations are retried this many times before giving up
+GENERATION_RETRIES = 2
+
+
+@dataclass
+class KeyPoolStats:
+    """
+    Statistics for the keys of one algorithm and size in a KeyPool
+
+    Attributes:
+        hits (int): Keys handed out straight from the pool
+        misses (int): Requests made while the pool was empty
+        generated (int): Keys generated by the workers
+        failed (int): Key generations that raised an exception, including retries
+        refill_time (float): Total seconds from requesting to receiving the keys
+    """
+
+    hits: int = 0
+    misses: int = 0
+    generated: int = 0
+    failed: int = 0
+    refill_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of requests served straight from the pool"""
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    @property
+    def refill_latency(self) -> float:
+        """The average seconds from requesting to receiving a generated key"""
+        return self.refill_time / self.generated if self.generated else 0.0
+
+
+class _KeyQueue:  # pylint: disable=too-few-public-methods
+    """The available keys and refill state for one algorithm and size"""
+
+    def __init__(self, key_class: type, args: tuple):
+        self.key_class = key_class
+        self.args = args
+        self.keys = Queue()
+        self.pending = 0
+        self.waiting = 0
+        self.error = None
+        self.stats = KeyPoolStats()
+
+    def stock(self) -> int:
+        """The number of keys available or underway that no request is waiting for"""
+        return self.keys.qsize() + self.pending - self.waiting
+
+
+class KeyPool:
+    """
+    Keeps a number of pre-generated private keys for each algorithm and size,
+    so that keys can be handed out without waiting for the key generation.
+
+    When the number of available keys for an algorithm and size drops to the
+    low water mark, the pool is filled up again in the background.
+
+    A failed key generation is retried, up to GENERATION_RETRIES times.
+    After that the exception is raised to the requests waiting for a key, or
+    if none are waiting, by the next fill or the next acquire that finds the
+    pool empty. The refill starts again after the exception has been raised.
+
+    Args:
+        size (int, optional): The number of keys to keep per algorithm and size.
+                              Defaults to 8.
+        low_water (int, optional): Refill when this many keys or fewer are left.
+                                   Defaults to half the size.
+        workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        use_processes (bool, optional): Generate the keys in a process pool
+                                        instead of a thread pool. Defaults to True.
+
+    Example:
+        with KeyPool(size=16) as pool:
+            pool.fill(RsaPrivateKey, 4096)
+            key = pool.acquire(RsaPrivateKey, 4096)
+    """
+
+    def __init__(
+        self,
+        size: int = 8,
+        low_water: int = None,
+        workers: int = None,
+        use_processes: bool = True,
+    ):
+        self.size = size
+        self.low_water = size // 2 if low_water is None else low_water
+        self._executor = create_executor(workers, use_processes)
+        self._queues: Dict[Tuple[type, tuple], _KeyQueue] = {}
+        self._futures = set()
+        # Reentrant, the callback for a generation runs in the submitting thread
+        # if the generation is done (or cancelled) before the callback is added
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def __enter__(self) -> "KeyPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def fill(self, key_class: type, *args) -> None:
+        """
+        Starts generating keys of an algorithm and size, up to the pool size
+
+        Args:
+            key_class (type): The PrivateKey child class, e.g. RsaPrivateKey
+            *args: The arguments for the generate method, e.g. the key size
+
+        Raises:
+            Exception: The key generation failed since the last fill or acquire
+        """
+        queue = self._get_queue(key_class, args)
+
+        with self._lock:
+            self._raise_error(queue)
+            self._refill(queue, self.size - 1)
+
+    def acquire(
+        self, key_class: type, *args, block: bool = True, timeout: float = None
+    ) -> PrivateKey:
+        """
+        Takes a key from the pool, and refills the pool in the background
+        if it has reached the low water mark
+
+        Args:
+            key_class (type): The PrivateKey child class, e.g. RsaPrivateKey
+            *args: The arguments for the generate method, e.g. the key size
+            block (bool, optional): Wait for a key if the pool is empty.
+                                    Defaults to True.
+            timeout (float, optional): The maximum number of seconds to wait.
+                                       Defaults to no limit.
+
+        Raises:
+            RuntimeError: The pool is closed, or was closed while waiting
+            TimeoutError: No key was generated within the timeout
+            Exception: The key generation failed, and the pool is empty
+
+        Returns:
+            PrivateKey: The private key, None if the pool is empty and block is False
+        """
+        queue = self._get_queue(key_class, args)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The key pool is closed")
+
+            key = self._take(queue)
+            if key is None:
+                queue.stats.misses += 1
+                self._raise_error(queue)
+                queue.waiting += int(block)
+            else:
+                queue.stats.hits += 1
+
+            self._refill(queue, self.low_water)
+
+        if key is None and block:
+            try:
+                key = queue.keys.get(timeout=timeout)
+            except Empty:
+                raise TimeoutError("No key was generated within the timeout") from None
+            finally:
+                with self._lock:
+                    queue.waiting -= 1
+
+        if isinstance(key, Exception):
+            raise key
+
+        return key
+
+    def available(self, key_class: type, *args) -> int:
+        """
+        Get the number of keys of an algorithm and size ready in the pool
+
+        Args:
+            key_class (type): The PrivateKey child class, e.g. RsaPrivateKey
+            *args: The arguments for the generate method, e.g. the key size
+
+        Returns:
+            int: The number of available keys
+        """
+        return self._get_queue(key_class, args).keys.qsize()
+
+    def get_stats(self, key_class: type, *args) -> KeyPoolStats:
+        """
+        Get the statistics for the keys of an algorithm and size
+
+        Args:
+            key_class (type): The PrivateKey child class, e.g. RsaPrivateKey
+            *args: The arguments for the generate method, e.g. the key size
+
+        Returns:
+            KeyPoolStats: A copy of the statistics
+        """
+        queue = self._get_queue(key_class, args)
+
+        with self._lock:
+            return KeyPoolStats(**queue.stats.__dict__)
+
+    def close(self) -> None:
+        """
+        Stops the workers, key generations that have not started are cancelled
+        and requests waiting for a key raise RuntimeError
+        """
+        with self._lock:
+            self._closed = True
+            for future in list(self._futures):
+                future.cancel()
+
+            for queue in self._queues.values():
+                for _ in range(queue.waiting):
+                    queue.keys.put(RuntimeError("The key pool is closed"))
+
+        self._executor.shutdown(wait=True)
+
+    def _get_queue(self, key_class: type, args: tuple) -> _KeyQueue:
+        with self._lock:
+            queue = self._queues.get((key_class, args))
+            if queue is None:
+                queue = self._queues[key_class, args] = _KeyQueue(key_class, args)
+
+            return queue
+
+    @staticmethod
+    def _take(queue: _KeyQueue) -> PrivateKey:
+        # Takes an available key, skipping errors left for requests that timed out
+        while True:
+            try:
+                key = queue.keys.get_nowait()
+            except Empty:
+                return None
+
+            if not isinstance(key, Exception):
+                return key
+
+    @staticmethod
+    def _raise_error(queue: _KeyQueue) -> None:
+        # Raises the error of a refill that gave up, the next refill starts over
+        error, queue.error = queue.error, None
+        if error is not None:
+            raise error
+
+    def _refill(self, queue: _KeyQueue, threshold: int):
+        # Tops the keys up to the pool size if the stock is at or below the threshold,
+        # must be called with the lock held
+        stock = queue.stock()
+        if self._closed or queue.error is not None or stock > threshold:
+            return
+
+        for _ in range(self.size - stock):
+            queue.pending += 1
+            self._submit(queue)
+
+    def _submit(self, queue: _KeyQueue, retries: int = GENERATION_RETRIES) -> None:
+        # Must be called with the lock held
+        future = self._executor.submit(generate_key_data, queue.key_class, queue.args)
+        self._futures.add(future)
+        future.add_done_callback(
+            lambda future, start=time.monotonic(): self._receive(
+                queue, future, start, retries
+            )
+        )
+
+    def _receive(self, queue: _KeyQueue, future, start: float, retries: int) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+        if future.cancelled():
+            return
+
+        try:
+            key = PrivateKey.from_string(future.result())
+            exception = None
+        except Exception as ex:  # pylint: disable=broad-except
+            key, exception = None, ex
+
+        with self._lock:
+            if exception is None:
+                queue.pending -= 1
+                queue.stats.generated += 1
+                queue.stats.refill_time += time.monotonic() - start
+                queue.keys.put(key)
+                return
+
+            queue.stats.failed += 1
+            if not self._closed and retries > 0:
+                self._submit(queue, retries - 1)
+                return
+
+            # Given up, the requests that no key is underway for get the exception
+            queue.pending -= 1
+            unserved = queue.waiting - queue.keys.qsize() - queue.pending
+            if unserved > 0:
+                for _ in range(unserved):
+                    queue.keys.put(exception)
+            else:
+                queue.error = exception
@@ -0,0 +1,391 @@
+"""
+In-memory inventory of certificates, indexed for lookups by serial,
+key ID, principal, subject and CA fingerprint and validity period
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import chain
+from time import time
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+from .cert import SSHCertificate
+from .keys import PublicKey
+from .utils import sha256_fingerprint, to_timestamp
+
+# Pending entries up to this number are inserted in place, more are merged by sorting
+SORTED_INSERT_LIMIT = 64
+
+
+def _fingerprint(key: Union[PublicKey, str]) -> str:
+    return key.get_fingerprint() if isinstance(key, PublicKey) else key
+
+
+class _SortedIndex:
+    """
+    Certificate ids sorted by a timestamp, for range queries.
+    Insertions are buffered and merged before the next query,
+    and removed ids are skipped until they are compacted away.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._ids = []
+        self._pending = []
+        self._removed = set()
+
+    def add(self, key: int, cert_id: int) -> None:
+        """Adds a certificate id under a key, merged in before the next query"""
+        self._pending.append((key, cert_id))
+
+    def discard(self, cert_id: int) -> None:
+        """Removes a certificate id, skipped until it is compacted away"""
+        self._removed.add(cert_id)
+
+    def _settle(self) -> None:
+        if len(self._pending) <= SORTED_INSERT_LIMIT and (
+            2 * len(self._removed) <= len(self._ids)
+        ):
+            for key, cert_id in self._pending:
+                index = bisect_right(self._keys, key)
+                self._keys.insert(index, key)
+                self._ids.insert(index, cert_id)
+        else:
+            entries = [
+                entry
+                for entry in chain(zip(self._keys, self._ids), self._pending)
+                if entry[1] not in self._removed
+            ]
+            entries.sort()
+
+            self._keys = [key for key, _ in entries]
+            self._ids = [cert_id for _, cert_id in entries]
+            self._removed = set()
+
+        self._pending = []
+
+    def _bounds(self, low: int, high: int) -> Tuple[int, int]:
+        if self._pending or 2 * len(self._removed) > len(self._ids):
+            self._settle()
+
+        start = 0 if low is None else bisect_left(self._keys, low)
+        end = len(self._keys) if high is None else bisect_right(self._keys, high)
+        return start, end
+
+    def count(self, low: int = None, high: int = None) -> int:
+        """
+        Counts the ids with low <= key <= high, including removed ids
+        that are not compacted yet
+        """
+        start, end = self._bounds(low, high)
+        return max(end - start, 0)
+
+    def range(self, low: int = None, high: int = None) -> Iterator[int]:
+        """Yields the ids with low <= key <= high, in key order"""
+        start, end = self._bounds(low, high)
+
+        for cert_id in self._ids[start:end]:
+            if cert_id not in self._removed:
+                yield cert_id
+
+
+class CertificateStore:
+    """
+    Holds certificates in memory with secondary indexes, so queries take
+    time in proportion to the number of matching certificates rather than
+    the size of the store.
+
+    The equality indexes (serial, key ID, principal, subject and CA
+    fingerprint) are hash maps to sets of certificate ids, and a query
+    intersects them starting from the smallest. The validity indexes are
+    sorted by valid_after and valid_before, for range queries and for
+    evicting expired certificates. A query for the certificates valid at
+    a time walks the smaller of the two ranges found by binary search.
+
+    Fingerprints are SHA256 fingerprints as returned by PublicKey.get_fingerprint.
+
+    Args:
+        certificates (Iterable[SSHCertificate], optional): Certificates to add
+    """
+
+    def __init__(self, certificates: Iterable[SSHCertificate] = ()):
+        self._certificates: Dict[int, SSHCertificate] = {}
+        self._entries: Dict[int, tuple] = {}
+        self._next_id = 0
+
+        self._indexes = {
+            "serial": {},
+            "key_id": {},
+            "principal": {},
+            "subject": {},
+            "ca": {},
+        }
+        self._valid_after = _SortedIndex()
+        self._valid_before = _SortedIndex()
+
+        self.add_many(certificates)
+
+    def __len__(self) -> int:
+        return len(self._certificates)
+
+    def __iter__(self) -> Iterator[SSHCertificate]:
+        return iter(self._certificates.values())
+
+    def __contains__(self, cert_id: int) -> bool:
+        return cert_id in self._certificates
+
+    def get(self, cert_id: int) -> SSHCertificate:
+        """
+        Gets a certificate by the id returned when it was added
+
+        Args:
+            cert_id (int): The certificate id
+
+        Returns:
+            SSHCertificate: The certificate, None if not in the store
+        """
+        return self._certificates.get(cert_id)
+
+    @staticmethod
+    def _get_entry(certificate: SSHCertificate) -> tuple:
+        principals = certificate.get("principals")
+
+        return (
+            (
+                ("serial", (certificate.get("serial"),)),
+                ("key_id", (certificate.get("key_id"),)),
+                # Certificates without principals are valid for any principal
+                ("principal", tuple(set(principals)) if principals else (None,)),
+                ("subject", (certificate.get("public_key").get_fingerprint(),)),
+                ("ca", (sha256_fingerprint(certificate.footer.ca_pubkey.raw_bytes()),)),
+            ),
+            to_timestamp(certificate.get("valid_after")),
+            to_timestamp(certificate.get("valid_before")),
+        )
+
+    def add(self, certificate: SSHCertificate) -> int:
+        """
+        Adds a certificate to the store and its indexes
+
+        Args:
+            certificate (SSHCertificate): The certificate to add
+
+        Returns:
+            int: The id of the certificate in the store
+        """
+        entry = self._get_entry(certificate)
+        keys, valid_after, valid_before = entry
+
+        cert_id = self._next_id
+        self._next_id += 1
+        self._certificates[cert_id] = certificate
+        self._entries[cert_id] = entry
+
+        for name, values in keys:
+            index = self._indexes[name]
+            for value in values:
+                index.setdefault(value, set()).add(cert_id)
+
+        self._valid_after.add(valid_after, cert_id)
+        self._valid_before.add(valid_before, cert_id)
+
+        return cert_id
+
+    def add_many(self, certificates: Iterable[SSHCertificate]) -> List[int]:
+        """
+        Adds certificates to the store and its indexes
+
+        Args:
+            certificates (Iterable[SSHCertificate]): The certificates to add
+
+        Returns:
+            List[int]: The ids of the certificates, in order
+        """
+        return [self.add(certificate) for certificate in certificates]
+
+    def remove(self, cert_id: int) -> SSHCertificate:
+        """
+        Removes a certificate from the store and its indexes
+
+        Args:
+            cert_id (int): The id of the certificate
+
+        Raises:
+            KeyError: The certificate is not in the store
+
+        Returns:
+            SSHCertificate: The removed certificate
+        """
+        certificate = self._certificates.pop(cert_id)
+        keys, _, _ = self._entries.pop(cert_id)
+
+        for name, values in keys:
+            index = self._indexes[name]
+            for value in values:
+                ids = index[value]
+                ids.discard(cert_id)
+                if not ids:
+                    del index[value]
+
+        self._valid_after.discard(cert_id)
+        self._valid_before.discard(cert_id)
+
+        return certificate
+
+    def evict_expired(self, now: Union[datetime, int] = None) -> int:
+        """
+        Removes the certificates that expired before a point in time
+
+        Args:
+            now (Union[datetime, int], optional): The point in time.
+                                                  Defaults to the current time.
+
+        Returns:
+            int: The number of removed certificates
+        """
+        now = int(time()) if now is None else to_timestamp(now)
+        expired = list(self._valid_before.range(high=now - 1))
+
+        for cert_id in expired:
+            self.remove(cert_id)
+
+        return len(expired)
+
+    def _get_valid_ids(
+        self, valid_at: int, issued_after: int, issued_before: int
+    ) -> Iterator[int]:
+        if valid_at is None:
+            yield from self._valid_after.range(issued_after, issued_before)
+            return
+
+        # Certificates valid at a time became valid before it and expire after
+        # it. The smaller of the two ranges is walked and checked for the other.
+        high = valid_at if issued_before is None else min(valid_at, issued_before)
+        if self._valid_after.count(issued_after, high) <= self._valid_before.count(
+            low=valid_at
+        ):
+            for cert_id in self._valid_after.range(issued_after, high):
+                _, _, valid_before = self._entries[cert_id]
+                if valid_before >= valid_at:
+                    yield cert_id
+            return
+
+        for cert_id in self._valid_before.range(low=valid_at):
+            _, valid_after, _ = self._entries[cert_id]
+            if valid_after <= valid_at and self._in_range(
+                valid_after, issued_after, issued_before
+            ):
+                yield cert_id
+
+    @staticmethod
+    def _in_range(value: int, low: int, high: int) -> bool:
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def find_ids(
+        self,
+        *,
+        serial: int = None,
+        key_id: str = None,
+        principal: str = None,
+        subject: Union[PublicKey, str] = None,
+        ca: Union[PublicKey, str] = None,
+        valid_at: Union[datetime, int] = None,
+        issued_after: Union[datetime, int] = None,
+        issued_before: Union[datetime, int] = None,
+    ) -> Set[int]:
+        """
+        Finds the ids of the certificates matching all the given criteria,
+        see CertificateStore.find
+        """
+        candidates = []
+        for name, value in (
+            ("serial", serial),
+            ("key_id", key_id),
+            ("subject", None if subject is None else _fingerprint(subject)),
+            ("ca", None if ca is None else _fingerprint(ca)),
+        ):
+            if value is not None:
+                candidates.append(self._indexes[name].get(value, set()))
+
+        if principal is not None:
+            index = self._indexes["principal"]
+            candidates.append(index.get(principal, set()) | index.get(None, set()))
+
+        times = [
+            None if value is None else to_timestamp(value)
+            for value in (valid_at, issued_after, issued_before)
+        ]
+
+        if not candidates:
+            if all(value is None for value in times):
+                return set(self._certificates)
+
+            return set(self._get_valid_ids(*times))
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            result &= ids
+            if not result:
+                return result
+
+        if any(value is not None for value in times):
+            result = {cert_id for cert_id in result if self._is_valid(cert_id, *times)}
+
+        return result
+
+    def _is_valid(
+        self, cert_id: int, valid_at: int, issued_after: int, issued_before: int
+    ) -> bool:
+        _, valid_after, valid_before = self._entries[cert_id]
+
+        if valid_at is not None and not valid_after <= valid_at <= valid_before:
+            return False
+
+        return self._in_range(valid_after, issued_after, issued_before)
+
+    def find(self, **criteria) -> List[SSHCertificate]:
+        """
+        Finds the certificates matching all the given criteria
+
+        Args:
+            serial (int, optional): The serial number
+            key_id (str, optional): The key ID
+            principal (str, optional): A principal the certificate is valid for,
+                                       certificates without principals match any
+            subject (Union[PublicKey, str], optional): The subject public key,
+                                                       or its fingerprint
+            ca (Union[PublicKey, str], optional): The CA public key, or its fingerprint
+            valid_at (Union[datetime, int], optional): A time the certificate is valid at
+            issued_after (Union[datetime, int], optional): Earliest valid_after
+            issued_before (Union[datetime, int], optional): Latest valid_after
+
+        Returns:
+            List[SSHCertificate]: The matching certificates, in the order they were added
+        """
+        return [self._certificates[i] for i in sorted(self.find_ids(**criteria))]
+
+    def find_live(
+        self, now: Union[datetime, int] = None, **criteria
+    ) -> List[SSHCertificate]:
+        """
+        Finds the certificates valid at the current time matching the given
+        criteria, see CertificateStore.find
+
+        Args:
+            now (Union[datetime, int], optional): The current time.
+                                                  Defaults to the system time.
+
+        Returns:
+            List[SSHCertificate]: The matching certificates
+        """
+        return self.find(valid_at=int(time()) if now is None else now, **criteria)
+
+    def items(self) -> Iterator[Tuple[int, SSHCertificate]]:
+        """
+        Iterates over the certificates and their ids
+
+        Yields:
+            Tuple[int, SSHCertificate]: The id and the certificate
+        """
+        return iter(self._certificates.items())
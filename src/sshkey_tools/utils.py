@@ -4,11 +4,15 @@ Utilities for handling keys and certificates
 import hashlib as hl
 import sys
 from base64 import b64encode
+from datetime import datetime
 from random import randint
 from secrets import randbits
+from struct import pack, unpack_from
 from typing import Dict, List, Union
 from uuid import uuid4
 
+from . import exceptions as _EX
+
 NoneType = type(None)
 
 
@@ -163,6 +167,44 @@ def bytes_to_long(source_bytes: bytes, byteorder: str = "big") -> int:
     return int.from_bytes(source_bytes, byteorder)
 
 
+def to_timestamp(value: Union[datetime, int]) -> int:
+    """Converts a datetime or a timestamp to an integer Unix timestamp
+
+    Args:
+        value (Union[datetime, int]): The datetime or timestamp
+
+    Returns:
+        int: The Unix timestamp in seconds
+    """
+    return int(value.timestamp()) if isinstance(value, datetime) else int(value)
+
+
+def encode_string(data: Union[str, bytes], encoding: str = "utf-8") -> bytes:
+    """Encodes a string or bytestring as a length-prefixed SSH string
+
+    Args:
+        data (Union[str, bytes]): The data to encode
+        encoding (str, optional): The encoding of the string. Defaults to 'utf-8'.
+
+    Returns:
+        bytes: The length-prefixed string
+    """
+    data = ensure_bytestring(data, encoding)
+    return pack(">I", len(data)) + data
+
+
+def encode_mpint(value: int) -> bytes:
+    """Encodes a positive integer as a length-prefixed SSH multiple precision integer
+
+    Args:
+        value (int): The integer to encode
+
+    Returns:
+        bytes: The length-prefixed integer
+    """
+    return encode_string(long_to_bytes(value))
+
+
 def generate_secure_nonce(length: int = 128):
     """Generates a secure random nonce of the specified length.
         Mainly important for ECDSA keys, but is used with all key/certificate types
@@ -250,3 +292,121 @@ def join_dicts(*dicts) -> dict:
         return_dict = {**return_dict, **add_dict}
 
     return return_dict
+
+
+class WireReader:
+    """
+    Cursor over a block of data in the SSH wire format (RFC4251).
+    The data is wrapped in a single memoryview and read by advancing an offset,
+    so decoding a certificate is one linear pass without copying the remainder
+    of the buffer for every field.
+
+    Args:
+        data (bytes): The data to read from
+    """
+
+    __slots__ = ("view", "offset")
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self.view = data if isinstance(data, memoryview) else memoryview(data)
+        self.offset = 0
+
+    def __len__(self) -> int:
+        return len(self.view) - self.offset
+
+    def at_end(self) -> bool:
+        """Checks if all data has been read
+
+        Returns:
+            bool: True if there is no data left
+        """
+        return self.offset >= len(self.view)
+
+    def _advance(self, length: int) -> int:
+        start = self.offset
+        end = start + length
+
+        if end > len(self.view):
+            raise _EX.InvalidDataException(
+                f"Unexpected end of data (needed {length} bytes at offset {start}, "
+                + f"{len(self.view) - start} available)"
+            )
+
+        self.offset = end
+        return start
+
+    def read_bytes(self, length: int) -> memoryview:
+        """Reads a fixed number of bytes
+
+        Args:
+            length (int): Number of bytes to read
+
+        Returns:
+            memoryview: View of the bytes read, not copied
+        """
+        start = self._advance(length)
+        return self.view[start : start + length]
+
+    def read_uint8(self) -> int:
+        """Reads an unsigned 8-bit integer
+
+        Returns:
+            int: The integer value
+        """
+        return self.view[self._advance(1)]
+
+    def read_uint32(self) -> int:
+        """Reads an unsigned big-endian 32-bit integer
+
+        Returns:
+            int: The integer value
+        """
+        return unpack_from(">I", self.view, self._advance(4))[0]
+
+    def read_uint64(self) -> int:
+        """Reads an unsigned big-endian 64-bit integer
+
+        Returns:
+            int: The integer value
+        """
+        return unpack_from(">Q", self.view, self._advance(8))[0]
+
+    def read_string(self) -> memoryview:
+        """Reads a length-prefixed string
+
+        Returns:
+            memoryview: View of the string contents, not copied
+        """
+        return self.read_bytes(self.read_uint32())
+
+    def peek_string(self) -> memoryview:
+        """Reads a length-prefixed string without advancing the cursor
+
+        Returns:
+            memoryview: View of the string contents, not copied
+        """
+        offset = self.offset
+        try:
+            return self.read_string()
+        finally:
+            self.offset = offset
+
+    def skip_string(self) -> None:
+        """Advances the cursor past a length-prefixed string"""
+        self._advance(self.read_uint32())
+
+    def read_mpint(self) -> int:
+        """Reads a length-prefixed multiple precision integer
+
+        Returns:
+            int: The integer value
+        """
+        return int.from_bytes(self.read_string(), "big")
+
+    def rest(self) -> bytes:
+        """Copies the data that has not been read yet
+
+        Returns:
+            bytes: The remainder of the data
+        """
+        return self.view[self.offset :].tobytes()
@@ -0,0 +1,241 @@
+"""
+Verification of certificate signatures against a set of trusted
+certificate authorities
+"""
+from typing import Iterable, Iterator, Union
+
+from . import exceptions as _EX
+from .batch import BatchResult, imap_unordered
+from .cert import SSHCertificate
+from .fields import (
+    DsaSignatureField,
+    EcdsaSignatureField,
+    Ed25519SignatureField,
+    RsaSignatureField,
+)
+from .keys import (
+    DsaPublicKey,
+    EcdsaPublicKey,
+    Ed25519PublicKey,
+    PublicKey,
+    RsaPublicKey,
+)
+from .utils import sha256_fingerprint
+
+# The signature field each type of CA public key produces
+SIGNATURE_FIELDS = {
+    RsaPublicKey: RsaSignatureField,
+    DsaPublicKey: DsaSignatureField,
+    EcdsaPublicKey: EcdsaSignatureField,
+    Ed25519PublicKey: Ed25519SignatureField,
+}
+
+# The verifier of each worker process, set by the pool initializer
+_WORKER = {}
+
+
+def _init_check_worker(verifier: "CertificateVerifier") -> None:
+    _WORKER["verifier"] = verifier
+
+
+def _check_worker(certificate: Union[SSHCertificate, bytes, str]) -> SSHCertificate:
+    return _WORKER["verifier"].check(certificate)
+
+
+class CertificateVerifier:
+    """
+    Verifies certificates against a set of trusted CA public keys.
+
+    The CA keys are indexed by the SHA256 fingerprint of their wire format,
+    so the CA key in a certificate is looked up without being decoded, and
+    the already loaded trusted key is used for the verification.
+    Certificates given as bytes or strings are decoded lazily, and the
+    signature is checked against the signed bytes as they were read.
+
+    Args:
+        ca_pubkeys (Iterable[PublicKey], optional): The trusted CA public keys
+    """
+
+    def __init__(self, ca_pubkeys: Iterable[PublicKey] = ()):
+        self._ca_pubkeys = {}
+
+        for ca_pubkey in ca_pubkeys:
+            self.add_ca(ca_pubkey)
+
+    def __len__(self) -> int:
+        return len(self._ca_pubkeys)
+
+    def __contains__(self, ca_pubkey: PublicKey) -> bool:
+        return ca_pubkey.get_fingerprint() in self._ca_pubkeys
+
+    def __getstate__(self):
+        return [ca_pubkey.raw_bytes() for ca_pubkey in self._ca_pubkeys.values()]
+
+    def __setstate__(self, state):
+        self.__init__(PublicKey.from_wire(data) for data in state)
+
+    def add_ca(self, ca_pubkey: PublicKey) -> str:
+        """
+        Adds a trusted CA public key
+
+        Args:
+            ca_pubkey (PublicKey): The CA public key
+
+        Returns:
+            str: The SHA256 fingerprint of the key
+        """
+        fingerprint = ca_pubkey.get_fingerprint()
+        self._ca_pubkeys[fingerprint] = ca_pubkey
+
+        return fingerprint
+
+    def remove_ca(self, ca_pubkey: PublicKey) -> None:
+        """
+        Removes a trusted CA public key
+
+        Args:
+            ca_pubkey (PublicKey): The CA public key
+
+        Raises:
+            KeyError: The key is not a trusted CA
+        """
+        del self._ca_pubkeys[ca_pubkey.get_fingerprint()]
+
+    def get_ca(self, certificate: SSHCertificate) -> PublicKey:
+        """
+        Finds the trusted CA public key that issued a certificate
+
+        Args:
+            certificate (SSHCertificate): The certificate
+
+        Raises:
+            _EX.InvalidSignatureException: The CA is not trusted
+
+        Returns:
+            PublicKey: The trusted CA public key
+        """
+        fingerprint = sha256_fingerprint(certificate.footer.ca_pubkey.raw_bytes())
+
+        try:
+            return self._ca_pubkeys[fingerprint]
+        except KeyError:
+            raise _EX.InvalidSignatureException(
+                f"The certificate is not issued by a trusted CA ({fingerprint})"
+            ) from None
+
+    def check(self, certificate: Union[SSHCertificate, bytes, str]) -> SSHCertificate:
+        """
+        Verifies the signature on a certificate against the trusted CA keys
+
+        Args:
+            certificate (Union[SSHCertificate, bytes, str]): The certificate,
+                its wire format, or the contents of a certificate file
+
+        Raises:
+            _EX.InvalidCertificateFormatException: The certificate cannot be parsed
+            _EX.InvalidSignatureException: The CA is not trusted, the signature
+                                           does not match the type of the CA key
+                                           or the signature is invalid
+
+        Returns:
+            SSHCertificate: The verified certificate
+        """
+        try:
+            if isinstance(certificate, str):
+                certificate = SSHCertificate.from_string(certificate, lazy=True)
+            elif isinstance(certificate, (bytes, bytearray, memoryview)):
+                certificate = SSHCertificate.from_bytes(certificate, lazy=True)
+
+            data = certificate.get_signed_data()
+            signature = certificate.footer.signature
+            signature_value = signature.value
+        except (ValueError, KeyError) as exception:
+            raise _EX.InvalidCertificateFormatException(
+                f"The certificate cannot be parsed: {exception}"
+            ) from exception
+
+        ca_pubkey = self.get_ca(certificate)
+        if not isinstance(signature, SIGNATURE_FIELDS.get(type(ca_pubkey), ())):
+            raise _EX.InvalidSignatureException(
+                f"The {type(signature).__name__} does not match "
+                f"the {type(ca_pubkey).__name__} of the CA"
+            )
+
+        if isinstance(signature, RsaSignatureField):
+            ca_pubkey.verify(data, signature_value, signature.hash_alg)
+        else:
+            ca_pubkey.verify(data, signature_value)
+
+        return certificate
+
+    def verify(
+        self, certificate: Union[SSHCertificate, bytes, str], raise_on_error=False
+    ) -> bool:
+        """
+        Verifies the signature on a certificate against the trusted CA keys
+
+        Args:
+            certificate (Union[SSHCertificate, bytes, str]): The certificate,
+                its wire format, or the contents of a certificate file
+            raise_on_error (bool, default False): Raise an exception if the
+                                                  certificate is invalid
+
+        Raises:
+            _EX.InvalidCertificateFormatException: The certificate cannot be parsed
+            _EX.InvalidSignatureException: The CA is not trusted, the signature
+                                           does not match the type of the CA key
+                                           or the signature is invalid
+
+        Returns:
+            bool: True if the certificate is signed by a trusted CA
+        """
+        try:
+            self.check(certificate)
+        except (
+            _EX.InvalidCertificateFormatException,
+            _EX.InvalidSignatureException,
+        ) as exception:
+            if raise_on_error:
+                raise exception
+            return False
+
+        return True
+
+    def verify_many(
+        self,
+        certificates: Iterable[Union[SSHCertificate, bytes, str]],
+        workers: int = None,
+        use_processes: bool = False,
+        max_pending: int = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Verifies a batch of certificates across a pool of workers.
+        Results are yielded in completion order, certificates that cannot be
+        parsed or verified are yielded with the exception.
+
+        Args:
+            certificates (Iterable[Union[SSHCertificate, bytes, str]]): The certificates
+            workers (int, optional): Number of workers. Defaults to the number of CPUs.
+            use_processes (bool, optional): Use a process pool instead of a thread pool,
+                                            the trusted keys are sent to the workers
+                                            in wire format. Defaults to False.
+            max_pending (int, optional): Maximum number of certificates in flight.
+                                         Defaults to four per worker.
+
+        Yields:
+            BatchResult: The certificate as source, and the verified SSHCertificate
+                         or exception
+        """
+        if not use_processes:
+            return imap_unordered(self.check, certificates, workers, False, max_pending)
+
+        # The trusted keys are sent to each worker once, not with every certificate
+        return imap_unordered(
+            _check_worker,
+            certificates,
+            workers,
+            True,
+            max_pending,
+            initializer=_init_check_worker,
+            initargs=(self,),
+        )
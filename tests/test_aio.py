@@ -0,0 +1,155 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import src.sshkey_tools.aio as _AIO
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.keys as _KEY
+
+
+class TestAsyncRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.runner = _AIO.AsyncRunner(self.executor, limit=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        shutil.rmtree(self.directory)
+
+    async def issue(self, ca_privkey, serial):
+        subject_key = await self.runner.generate("ed25519")
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=subject_key.public_key, ca_privkey=ca_privkey
+        )
+        certificate.fields.serial = serial
+        certificate.fields.principals = [f"user{serial}"]
+
+        await self.runner.sign(certificate)
+        return certificate
+
+    def test_sign_verify(self):
+        async def run():
+            ca_privkey = await self.runner.generate(_KEY.RsaPrivateKey, key_size=1024)
+            certificates = await asyncio.gather(
+                *(self.issue(ca_privkey, serial) for serial in range(10))
+            )
+
+            for serial, certificate in enumerate(certificates):
+                self.assertEqual(certificate.get("serial"), serial)
+                self.assertTrue(
+                    await self.runner.verify(certificate, ca_privkey.public_key)
+                )
+
+            other_key = await self.runner.generate("ed25519")
+            self.assertFalse(
+                await self.runner.verify(certificates[0], other_key.public_key)
+            )
+
+        asyncio.run(run())
+
+    def test_files(self):
+        async def run():
+            ca_privkey = await _AIO.generate("ecdsa", curve=_KEY.EcdsaCurves.P256)
+            certificate = await self.issue(ca_privkey, 1)
+
+            key_path = os.path.join(self.directory, "ca")
+            cert_path = os.path.join(self.directory, "user-cert.pub")
+            pubkey_path = os.path.join(self.directory, "user.pub")
+
+            await _AIO.save_private_key(ca_privkey, key_path, "password")
+            await _AIO.save_certificate(certificate, cert_path, "comment")
+            with open(pubkey_path, "w") as file:
+                file.write(certificate.get("public_key").serialize().decode("utf-8"))
+
+            loaded_key = await _AIO.load_private_key(key_path, "password")
+            loaded_cert = await _AIO.load_certificate(cert_path, lazy=True)
+            loaded_pubkey = await _AIO.load_public_key(pubkey_path)
+
+            self.assertEqual(
+                loaded_key.public_key.raw_bytes(), ca_privkey.public_key.raw_bytes()
+            )
+            self.assertEqual(bytes(loaded_cert), bytes(certificate))
+            self.assertTrue(await _AIO.verify(loaded_cert, loaded_key.public_key))
+            self.assertEqual(
+                loaded_pubkey.raw_bytes(),
+                certificate.get("public_key").raw_bytes(),
+            )
+
+        asyncio.run(run())
+
+    def test_sign_in_parent(self):
+        async def run():
+            ca_privkey = await self.runner.generate("ed25519")
+            certificate = await self.issue(ca_privkey, 1)
+            self.assertTrue(certificate.footer.signature.is_signed)
+            self.assertTrue(certificate.verify(ca_privkey.public_key))
+
+            # Modified after signing
+            certificate.fields.principals.value.append("other")
+            self.assertFalse(await self.runner.verify(certificate))
+
+        asyncio.run(run())
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            runner = _AIO.AsyncRunner(executor)
+
+            async def run():
+                ca_privkey = await runner.generate("ed25519")
+                certificate = _CERT.SSHCertificate.create(
+                    subject_pubkey=ca_privkey.public_key, ca_privkey=ca_privkey
+                )
+                with self.assertRaises(TypeError):
+                    await runner.sign(certificate)
+
+                certificate.sign()
+                with self.assertRaises(TypeError):
+                    await runner.verify(certificate)
+
+            asyncio.run(run())
+
+    def test_process_pool_files(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            runner = _AIO.AsyncRunner(executor)
+
+            async def run():
+                ca_privkey = await runner.generate("ed25519")
+                certificate = _CERT.SSHCertificate.create(
+                    subject_pubkey=ca_privkey.public_key, ca_privkey=ca_privkey
+                )
+                certificate.sign()
+
+                key_path = os.path.join(self.directory, "ca")
+                cert_path = os.path.join(self.directory, "ca-cert.pub")
+
+                await runner.save_private_key(ca_privkey, key_path, "password")
+                await runner.save_certificate(certificate, cert_path)
+                loaded_key = await runner.load_private_key(key_path, "password")
+                loaded_cert = await runner.load_certificate(cert_path)
+
+                self.assertEqual(
+                    loaded_key.public_key.raw_bytes(),
+                    ca_privkey.public_key.raw_bytes(),
+                )
+                self.assertEqual(bytes(loaded_cert), bytes(certificate))
+
+            asyncio.run(run())
+
+    def test_configure(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            runner = _AIO.configure(executor, limit=1)
+
+            try:
+                key = asyncio.run(_AIO.generate("rsa", key_size=1024))
+                self.assertIsInstance(key, _KEY.RsaPrivateKey)
+                self.assertEqual(runner.limit, 1)
+            finally:
+                _AIO.configure()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import src.sshkey_tools.batch as _BATCH
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.keys as _KEY
+
+
+class TestLoadCertificates(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ca = _KEY.Ed25519PrivateKey.generate()
+        self.paths = []
+
+        for serial in range(1, 6):
+            certificate = _CERT.SSHCertificate.create(
+                subject_pubkey=_KEY.Ed25519PrivateKey.generate().public_key,
+                ca_privkey=self.ca,
+            )
+            certificate.fields.serial = serial
+            certificate.fields.principals = [f"user{serial}"]
+            certificate.sign()
+
+            path = os.path.join(self.directory, f"user{serial}-cert.pub")
+            certificate.to_file(path)
+            self.paths.append(path)
+
+        with open(os.path.join(self.directory, "broken-cert.pub"), "w") as file:
+            file.write("ssh-ed25519-cert-v01@openssh.com AAAAbroken")
+
+        with open(os.path.join(self.directory, "ignored.pub"), "w") as file:
+            file.write("not a certificate")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertLoaded(self, results):
+        failed = [res for res in results if not res.ok]
+        loaded = {res.source: res.result for res in results if res.ok}
+
+        self.assertEqual(len(failed), 1)
+        self.assertTrue(failed[0].source.endswith("broken-cert.pub"))
+        self.assertIsInstance(failed[0].exception, Exception)
+
+        self.assertEqual(sorted(loaded), sorted(self.paths))
+        for path, certificate in loaded.items():
+            self.assertIsInstance(certificate, _CERT.Ed25519Certificate)
+            self.assertTrue(certificate.verify(self.ca.public_key))
+            self.assertTrue(path.endswith(f"user{certificate.get('serial')}-cert.pub"))
+
+    def test_load_directory_processes(self):
+        self.assertLoaded(list(_BATCH.load_certificates(self.directory, workers=2)))
+
+    def test_load_paths_threads(self):
+        paths = self.paths + [os.path.join(self.directory, "broken-cert.pub")]
+        self.assertLoaded(
+            list(
+                _BATCH.load_certificates(
+                    iter(paths), workers=2, use_processes=False, max_pending=2
+                )
+            )
+        )
+
+    def test_invalid_directory(self):
+        with self.assertRaises(NotADirectoryError):
+            _BATCH.load_certificates(self.paths[0])
+
+
+class TestSignMany(unittest.TestCase):
+    def setUp(self):
+        self.rsa_ca = _KEY.RsaPrivateKey.generate(1024)
+        self.ecdsa_ca = _KEY.EcdsaPrivateKey.generate()
+
+    def create_certificates(self):
+        certificates = []
+        for index in range(6):
+            certificate = _CERT.SSHCertificate.create(
+                subject_pubkey=_KEY.Ed25519PrivateKey.generate().public_key
+            )
+            certificate.fields.key_id = f"certificate-{index}"
+            certificate.fields.principals = [f"user{index}"]
+            certificates.append(certificate)
+
+        certificates[3].fields.extensions = ["not-an-extension"]
+
+        return certificates
+
+    def assertSigned(self, results, certificates, ca):
+        self.assertEqual([res.source for res in results], certificates)
+
+        for index, result in enumerate(results):
+            # Signed in place, failed certificates still get the CA key
+            self.assertEqual(
+                certificates[index].get("ca_pubkey").raw_bytes(),
+                ca.public_key.raw_bytes(),
+            )
+
+            if index == 3:
+                self.assertFalse(result.ok)
+                self.assertIsNone(result.result)
+                continue
+
+            self.assertTrue(result.ok, result.exception)
+            self.assertIs(result.result, certificates[index])
+
+            reloaded = _CERT.SSHCertificate.from_string(result.result.to_string())
+            self.assertEqual(reloaded.get("key_id"), f"certificate-{index}")
+            self.assertTrue(reloaded.verify(ca.public_key))
+
+    def test_sign_many_threads(self):
+        certificates = self.create_certificates()
+        results = _BATCH.sign_many(certificates, self.rsa_ca, workers=3)
+        self.assertSigned(results, certificates, self.rsa_ca)
+
+    def test_sign_many_processes(self):
+        certificates = self.create_certificates()
+        results = _BATCH.sign_many(
+            certificates, self.ecdsa_ca, workers=2, use_processes=True
+        )
+        self.assertSigned(results, certificates, self.ecdsa_ca)
+
+
+class TestGenerateMany(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate_many(self):
+        keys = _BATCH.generate_many("ed25519", 5, workers=2)
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(len({key.get_fingerprint() for key in keys}), 5)
+        for key in keys:
+            self.assertIsInstance(key, _KEY.Ed25519PrivateKey)
+
+        keys = _BATCH.generate_many(_KEY.RsaPrivateKey, 3, workers=2, key_size=1024)
+        self.assertEqual([key.key.key_size for key in keys], [1024] * 3)
+
+        keys = _BATCH.generate_many(
+            "ecdsa", 3, use_processes=False, curve=_KEY.EcdsaCurves.P256
+        )
+        self.assertEqual([key.key.curve.name for key in keys], ["secp256r1"] * 3)
+
+        with self.assertRaises(ValueError):
+            _BATCH.generate_many("unknown", 1)
+
+    def test_generate_to_directory(self):
+        results = list(
+            _BATCH.generate_to_directory(
+                "ed25519", 4, self.directory, workers=2, max_pending=2
+            )
+        )
+
+        self.assertEqual(sorted(res.source for res in results), [0, 1, 2, 3])
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertEqual(
+                result.result,
+                os.path.join(self.directory, f"id_ed25519_{result.source}"),
+            )
+            self.assertEqual(os.stat(result.result).st_mode & 0o777, 0o600)
+
+            key = _KEY.PrivateKey.from_file(result.result)
+            pubkey = _KEY.PublicKey.from_file(result.result + ".pub")
+            self.assertEqual(key.public_key.raw_bytes(), pubkey.raw_bytes())
+
+        results = list(
+            _BATCH.generate_to_directory(
+                _KEY.Ed25519PrivateKey, 2, self.directory, use_processes=False
+            )
+        )
+        for result in results:
+            self.assertIsInstance(result.exception, FileExistsError)
+
+        # A public key in the way is not overwritten, and no private key is left
+        path = os.path.join(self.directory, "id_ed25519_9")
+        with open(path + ".pub", "wb") as pubkey_file:
+            pubkey_file.write(b"existing")
+
+        results = list(
+            _BATCH.generate_to_directory(
+                "ed25519", 1, self.directory, filename="id_{kind}_9"
+            )
+        )
+        self.assertIsInstance(results[0].exception, FileExistsError)
+        self.assertFalse(os.path.exists(path))
+        with open(path + ".pub", "rb") as pubkey_file:
+            self.assertEqual(pubkey_file.read(), b"existing")
+
+        results = list(
+            _BATCH.generate_to_directory(
+                "rsa",
+                1,
+                self.directory,
+                filename="{kind}-key-{index}",
+                password="password",
+                key_size=1024,
+            )
+        )
+        key = _KEY.PrivateKey.from_file(results[0].result, "password")
+        self.assertEqual(key.key.key_size, 1024)
+
+        with self.assertRaises(NotADirectoryError):
+            _BATCH.generate_to_directory("rsa", 1, results[0].result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,13 @@
 # to/from file and string
 # Generated by ssh-keygen and decoded by script, created by script and verified by ssh-keygen
 
+import gc
 import os
 import random
 import shutil
+import tracemalloc
 import unittest
+from dataclasses import fields as dataclass_fields
 
 import faker
 
@@ -42,6 +45,14 @@ class TestCertificateFields(unittest.TestCase):
 
         self.assertEqual(bytestring, b"".join(bytes(x) for x in fields))
 
+        buffer = bytearray(sum(x.encoded_size() for x in fields))
+        offset = 0
+        for field in fields:
+            offset = field.write_into(buffer, offset)
+
+        self.assertEqual(offset, len(buffer))
+        self.assertEqual(bytes(buffer), bytestring)
+
         decoded = []
         while bytestring != b"":
             decode, bytestring = field_class.decode(bytestring)
@@ -532,6 +543,150 @@ class TestCertificateFields(unittest.TestCase):
         with self.assertRaises(_EX.InvalidDataException):
             field.encode(ValueError)
 
+    def test_field_slots(self):
+        field = _FIELD.KeyIdField("someuser@somehost")
+
+        self.assertFalse(hasattr(field, "__dict__"))
+        self.assertEqual(field.name, "key_id")
+        self.assertEqual(_FIELD.KeyIdField.get_name(), "key_id")
+        self.assertTrue(field.IS_SET)
+        self.assertIsNone(_FIELD.KeyIdField.IS_SET)
+
+        signature = _FIELD.RsaSignatureField(self.rsa_key)
+        self.assertFalse(hasattr(signature, "__dict__"))
+        self.assertFalse(signature.is_signed)
+
+    def test_field_encoded_cache(self):
+        field = _FIELD.PrincipalsField(["root", "admin"])
+        self.assertTrue(field.is_dirty)
+
+        encoded = bytes(field)
+        self.assertFalse(field.is_dirty)
+        self.assertIs(bytes(field), encoded)
+
+        field.value.append("user")
+        self.assertTrue(field.is_dirty)
+        self.assertEqual(bytes(field), _FIELD.PrincipalsField.encode(field.value))
+
+        field.value = ["root"]
+        self.assertTrue(field.is_dirty)
+        self.assertEqual(bytes(field), _FIELD.PrincipalsField.encode(["root"]))
+
+        # Assigning through the fieldset replaces the value of the field
+        fields = _CERT.CertificateFields(serial=1)
+        encoded = bytes(fields.serial)
+        fields.serial = 2
+        self.assertTrue(fields.serial.is_dirty)
+        self.assertNotEqual(bytes(fields.serial), encoded)
+
+        # Decoded fields only keep their length, the certificate keeps the bytes.
+        # Values that can be changed in place count as changed until encoded.
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=_KEY.Ed25519PrivateKey.generate().public_key,
+            ca_privkey=_KEY.Ed25519PrivateKey.generate(),
+        )
+        certificate.sign()
+        encoded = bytes(certificate)
+
+        for lazy in (False, True):
+            decoded = _CERT.SSHCertificate.from_bytes(encoded, lazy=lazy)
+            self.assertEqual(decoded.fields.serial.decoded_size, 8)
+            self.assertEqual(decoded.header.get_dirty(), [])
+            self.assertEqual(
+                decoded.fields.get_dirty(),
+                ["principals", "critical_options", "extensions"],
+            )
+            self.assertFalse(decoded.is_modified())
+            self.assertEqual(bytes(decoded), encoded)
+
+            # Changed decoded fields are encoded again, the others are copied
+            decoded.fields.serial = 2
+            bytes(decoded.fields)
+            self.assertIsNone(decoded.fields.serial.decoded_size)
+            self.assertEqual(decoded.fields.get_dirty(), [])
+            self.assertTrue(decoded.is_modified())
+            self.assertEqual(
+                decoded.get_signable(),
+                b"".join(
+                    (
+                        bytes(decoded.header),
+                        bytes(decoded.fields),
+                        bytes(decoded.footer),
+                    )
+                ),
+            )
+            self.assertEqual(
+                _CERT.SSHCertificate.from_bytes(
+                    decoded.get_signable() + bytes(decoded.footer.signature)
+                ).get("serial"),
+                2,
+            )
+
+    def test_field_clone(self):
+        field = _FIELD.PrincipalsField(["root", "admin"])
+        encoded = bytes(field)
+
+        clone = field.clone()
+        self.assertIsInstance(clone, _FIELD.PrincipalsField)
+        self.assertIsNot(clone.value, field.value)
+        self.assertIs(bytes(clone), encoded)
+
+        clone.value.append("user")
+        self.assertEqual(field.value, ["root", "admin"])
+        self.assertIs(bytes(field), encoded)
+        self.assertEqual(bytes(clone), _FIELD.PrincipalsField.encode(clone.value))
+
+        # The slots of the subclasses are copied, lazy fields stay encoded
+        signature = _FIELD.RsaSignatureField(self.rsa_key, _KEY.RsaAlgs.SHA256)
+        clone = signature.clone()
+        self.assertIs(clone.private_key, self.rsa_key)
+        self.assertEqual(clone.hash_alg, _KEY.RsaAlgs.SHA256)
+        self.assertFalse(clone.is_signed)
+
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.rsa_key.public_key, ca_privkey=self.rsa_key
+        )
+        certificate.sign()
+        lazy = _CERT.SSHCertificate.from_bytes(bytes(certificate), lazy=True)
+        clone = lazy.header.public_key.clone()
+        self.assertTrue(clone.is_pending)
+        self.assertEqual(clone.value.raw_bytes(), self.rsa_key.public_key.raw_bytes())
+        self.assertTrue(lazy.header.public_key.is_pending)
+
+    def test_field_registry(self):
+        for fieldset in (
+            _CERT.CertificateHeader,
+            _CERT.CertificateFields,
+            _CERT.CertificateFooter,
+        ):
+            for field in dataclass_fields(fieldset):
+                self.assertIs(_FIELD.FIELD_REGISTRY[field.name], field.type)
+
+        self.assertEqual(len(_FIELD.FIELD_REGISTRY), 14)
+        self.assertEqual(_FIELD.CertificateTypeField.name, "certificate_type")
+        self.assertEqual(_FIELD.CAPublicKeyField.name, "c_a_public_key")
+        self.assertIs(_FIELD.FIELD_REGISTRY["cert_type"], _FIELD.CertificateTypeField)
+        self.assertIs(_FIELD.FIELD_REGISTRY["ca_pubkey"], _FIELD.CAPublicKeyField)
+        self.assertNotIn("integer64", _FIELD.FIELD_REGISTRY)
+        self.assertNotIn("certificate_type", _FIELD.FIELD_REGISTRY)
+
+        with self.assertRaises(_EX.InvalidCertificateFieldException):
+
+            class SerialField(_FIELD.Integer64Field, attribute="serial"):
+                pass
+
+        self.assertIs(_FIELD.FIELD_REGISTRY["serial"], _FIELD.SerialField)
+
+        ca_privkey = _KEY.Ed25519PrivateKey.generate()
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=ca_privkey.public_key, ca_privkey=ca_privkey
+        )
+        certificate.set("cert_type", 2)
+        self.assertEqual(certificate.get("cert_type"), 2)
+        self.assertEqual(certificate.get("ca_pubkey"), ca_privkey.public_key)
+        with self.assertRaises(_EX.InvalidCertificateFieldException):
+            certificate.get("certificate_type")
+
     def assertCAPubkeyField(self, type):
         key = getattr(self, f"{type}_key").public_key
         field = _FIELD.CAPublicKeyField.from_object(key)
@@ -625,6 +780,334 @@ class TestCertificates(unittest.TestCase):
                 )
                 self.assertCertificateCreated(user_type, ca_type)
 
+    def test_decode_many_principals(self):
+        principals = [f"principal-{i}" for i in range(500)]
+        self.cert_fields.principals = principals
+
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.ed25519_user,
+            ca_privkey=self.ed25519_ca,
+            fields=self.cert_fields,
+        )
+        certificate.sign()
+
+        decoded = _CERT.SSHCertificate.from_string(certificate.to_string())
+
+        self.assertEqual(decoded.get("principals"), principals)
+        self.assertEqual(bytes(decoded), bytes(certificate))
+        self.assertTrue(decoded.verify(self.ed25519_ca.public_key))
+
+    def test_write_into(self):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.rsa_user,
+            ca_privkey=self.ecdsa_ca,
+            fields=self.cert_fields,
+        )
+        certificate.fields.critical_options = {
+            "force-command": "sftp-internal",
+            "source-address": "1.2.3.4/8,5.6.7.8/16",
+        }
+        certificate.sign()
+
+        encoded = bytes(certificate)
+        self.assertEqual(certificate.encoded_size(), len(encoded))
+
+        buffer = bytearray(b"\xff" * (len(encoded) + 8))
+        end = certificate.write_into(buffer, 4)
+
+        self.assertEqual(end, len(encoded) + 4)
+        self.assertEqual(bytes(buffer[4:end]), encoded)
+        self.assertEqual(bytes(buffer[:4]), b"\xff" * 4)
+        self.assertEqual(
+            _CERT.SSHCertificate.from_bytes(encoded).get_signable(),
+            certificate.get_signable(),
+        )
+
+        decoded = _CERT.SSHCertificate.from_bytes(encoded)
+        buffer = bytearray(decoded.encoded_size())
+        self.assertEqual(decoded.signable_size(), len(decoded.get_signable()))
+        self.assertEqual(decoded.write_into(buffer), len(encoded))
+        self.assertEqual(bytes(buffer), encoded)
+
+        unsigned = _CERT.SSHCertificate.create(
+            subject_pubkey=self.rsa_user, ca_privkey=self.ecdsa_ca
+        )
+        with self.assertRaises(_EX.InvalidCertificateFormatException):
+            unsigned.write_into(bytearray(1024))
+
+    def test_get_set_falsy_values(self):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.ed25519_user,
+            ca_privkey=self.ed25519_ca,
+        )
+
+        certificate.set("serial", 0)
+        certificate.set("principals", [])
+        certificate.set("critical_options", [])
+
+        self.assertEqual(certificate.get("serial"), 0)
+        self.assertEqual(certificate.get("principals"), [])
+        self.assertEqual(certificate.get("critical_options"), [])
+        self.assertEqual(
+            certificate.get("pubkey_type"), "ssh-ed25519-cert-v01@openssh.com"
+        )
+
+        certificate.set("serial", 1234)
+        self.assertEqual(certificate.fields.serial.value, 1234)
+
+        with self.assertRaises(_EX.InvalidCertificateFieldException):
+            certificate.get("not_a_field")
+
+        with self.assertRaises(_EX.InvalidCertificateFieldException):
+            certificate.set("not_a_field", 1)
+
+    def test_lazy_decode(self):
+        for user_pubkey, ca_privkey in [
+            (self.rsa_user, self.rsa_ca),
+            (self.dsa_user, self.dsa_ca),
+            (self.ecdsa_user, self.ecdsa_ca),
+            (self.ed25519_user, self.ed25519_ca),
+        ]:
+            certificate = _CERT.SSHCertificate.create(
+                subject_pubkey=user_pubkey,
+                ca_privkey=ca_privkey,
+                fields=self.cert_fields,
+            )
+            certificate.sign()
+            encoded = bytes(certificate)
+
+            lazy = _CERT.SSHCertificate.from_bytes(encoded, lazy=True)
+            self.assertTrue(lazy.header.public_key.is_pending)
+            self.assertTrue(lazy.footer.ca_pubkey.is_pending)
+            self.assertTrue(lazy.footer.signature.is_pending)
+
+            self.assertEqual(lazy.get("serial"), 1234567890)
+            self.assertEqual(lazy.get("principals"), ["pr_a", "pr_b", "pr_c"])
+            self.assertEqual(bytes(lazy), encoded)
+            self.assertEqual(lazy.encoded_size(), len(encoded))
+            self.assertTrue(lazy.header.public_key.is_pending)
+
+            self.assertTrue(lazy.verify())
+            self.assertFalse(lazy.footer.ca_pubkey.is_pending)
+            self.assertFalse(lazy.footer.signature.is_pending)
+            self.assertEqual(
+                lazy.get("public_key").raw_bytes(), user_pubkey.raw_bytes()
+            )
+            self.assertEqual(bytes(lazy), encoded)
+
+    def test_signed_data(self):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.ecdsa_user,
+            ca_privkey=self.ed25519_ca,
+            fields=self.cert_fields,
+        )
+        self.assertTrue(certificate.is_modified())
+        certificate.sign()
+
+        encoded = bytes(certificate)
+        signed_length = len(encoded) - len(bytes(certificate.footer.signature))
+
+        decoded = _CERT.SSHCertificate.from_bytes(encoded)
+        self.assertFalse(decoded.is_modified())
+        self.assertEqual(decoded.get_signed_data(), encoded[:signed_length])
+        self.assertTrue(decoded.verify())
+
+        decoded.set("principals", ["root"])
+        self.assertTrue(decoded.is_modified())
+        self.assertEqual(decoded.get_signed_data(), decoded.get_signable())
+        self.assertFalse(decoded.verify())
+
+        decoded = _CERT.SSHCertificate.from_bytes(encoded)
+        decoded.fields.serial = 1
+        self.assertTrue(decoded.is_modified())
+        self.assertFalse(decoded.verify())
+
+        # Values changed in place, or assigned on the field itself
+        for lazy in (False, True):
+            decoded = _CERT.SSHCertificate.from_bytes(encoded, lazy=lazy)
+            decoded.get("principals").append("root")
+            self.assertTrue(decoded.is_modified())
+            self.assertFalse(decoded.verify(self.ed25519_ca.public_key))
+
+            decoded = _CERT.SSHCertificate.from_bytes(encoded, lazy=lazy)
+            decoded.fields.serial.value = 999
+            self.assertTrue(decoded.is_modified())
+            self.assertFalse(decoded.verify(self.ed25519_ca.public_key))
+
+            # Also once the changed field has been encoded again
+            bytes(decoded)
+            self.assertTrue(decoded.is_modified())
+            self.assertFalse(decoded.verify(self.ed25519_ca.public_key))
+
+        # Reading fields and exporting leave the certificate unmodified
+        decoded = _CERT.SSHCertificate.from_bytes(encoded, lazy=True)
+        decoded.get("principals")
+        decoded.get("public_key")
+        self.assertEqual(bytes(decoded), encoded)
+        self.assertFalse(decoded.is_modified())
+        self.assertTrue(decoded.verify(self.ed25519_ca.public_key))
+
+        decoded = _CERT.SSHCertificate.from_bytes(encoded)
+        decoded.replace_ca(self.rsa_ca)
+        decoded.sign()
+        self.assertTrue(decoded.verify(self.rsa_ca.public_key))
+
+    def test_resign(self):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.rsa_user,
+            ca_privkey=self.ed25519_ca,
+            fields=self.cert_fields,
+        )
+        self.assertEqual(
+            certificate.fields.get_dirty(), _CERT.CertificateFields.ENCODE_ORDER
+        )
+        certificate.sign()
+        self.assertEqual(certificate.fields.get_dirty(), [])
+        self.assertEqual(certificate.header.get_dirty(), [])
+
+        certificate.fields.serial = 1
+        certificate.fields.valid_before = 1968534669
+        self.assertEqual(certificate.fields.get_dirty(), ["serial", "valid_before"])
+
+        certificate.sign()
+        self.assertTrue(certificate.verify(self.ed25519_ca.public_key))
+
+        decoded = _CERT.SSHCertificate.from_bytes(bytes(certificate))
+        self.assertEqual(decoded.get("serial"), 1)
+        self.assertEqual(decoded.get_signable(), certificate.get_signable())
+
+        # Values changed in place or set on the field are encoded again
+        certificate.fields.principals.value.append("pr_d")
+        certificate.fields.critical_options.value["verify-required"] = "1"
+        certificate.fields.key_id.value = "Changed"
+        self.assertEqual(
+            certificate.fields.get_dirty(),
+            ["key_id", "principals", "critical_options"],
+        )
+
+        certificate.sign()
+        decoded = _CERT.SSHCertificate.from_bytes(bytes(certificate))
+        self.assertEqual(decoded.get("principals"), ["pr_a", "pr_b", "pr_c", "pr_d"])
+        self.assertEqual(decoded.get("key_id"), "Changed")
+        self.assertTrue(decoded.verify(self.ed25519_ca.public_key))
+
+        certificate.fields.principals = {"pr_a"}
+        certificate.fields.critical_options = {"source-address": ["1.2.3.4/8"]}
+        certificate.sign()
+        certificate.fields.principals.value.add("pr_b")
+        certificate.fields.critical_options.value["source-address"].append("5.6.7.8/16")
+        self.assertEqual(
+            certificate.fields.get_dirty(), ["principals", "critical_options"]
+        )
+
+    def test_certificate_template(self):
+        template = _CERT.CertificateTemplate(
+            self.ecdsa_ca,
+            principals=["pr_a", "pr_b"],
+            critical_options={"force-command": "sftp-internal"},
+            extensions=["permit-pty"],
+        )
+
+        for user_type in CERTIFICATE_TYPES:
+            certificate = template.issue(
+                getattr(self, f"{user_type}_user"),
+                serial=1234,
+                key_id=f"{user_type}-user",
+                valid_after=1968491468,
+                valid_before=1968534668,
+            )
+
+            self.assertTrue(certificate.footer.signature.is_signed)
+            self.assertEqual(
+                template._get_signable(certificate), certificate.get_signable()
+            )
+
+            reloaded = _CERT.SSHCertificate.from_string(certificate.to_string())
+            self.assertTrue(reloaded.verify(self.ecdsa_ca.public_key))
+            self.assertEqual(reloaded.get("key_id"), f"{user_type}-user")
+            self.assertEqual(reloaded.get("principals"), ["pr_a", "pr_b"])
+
+    def test_certificate_template_copies(self):
+        principals = ["pr_a"]
+        critical_options = {"source-address": ["1.2.3.4/8"]}
+        template = _CERT.CertificateTemplate(
+            self.ecdsa_ca, principals=principals, critical_options=critical_options
+        )
+
+        # Changing the arguments or the returned values does not change the template
+        principals.append("pr_b")
+        critical_options["source-address"].append("5.6.7.8/16")
+        template.critical_options["source-address"].append("5.6.7.8/16")
+        with self.assertRaises(AttributeError):
+            template.principals.append("pr_b")
+        with self.assertRaises(AttributeError):
+            template.principals = ["pr_b"]
+
+        certificate = template.issue(self.ed25519_user)
+        self.assertTrue(certificate.verify(self.ecdsa_ca.public_key))
+        self.assertEqual(certificate.get("principals"), ["pr_a"])
+        self.assertEqual(
+            certificate.get("critical_options"), {"source-address": ["1.2.3.4/8"]}
+        )
+
+    def test_certificate_template_shared_fields(self):
+        template = _CERT.CertificateTemplate(
+            self.ed25519_ca,
+            principals=["pr_a"],
+            critical_options={"source-address": ["1.2.3.4/8"]},
+        )
+        first = template.issue(self.ed25519_user)
+        second = template.issue(self.ed25519_user)
+
+        # The encoded bytes of the template are reused, not encoded again
+        for name in ("principals", "critical_options"):
+            self.assertIs(
+                bytes(getattr(first.fields, name)), bytes(getattr(second.fields, name))
+            )
+        self.assertEqual(first.fields.get_dirty(), [])
+
+        # The values are not shared between the certificates
+        first.fields.principals.value.append("pr_b")
+        first.fields.critical_options.value["source-address"].append("5.6.7.8/16")
+        self.assertEqual(first.fields.get_dirty(), ["principals", "critical_options"])
+        self.assertEqual(second.fields.get_dirty(), [])
+        self.assertEqual(template.issue(self.ed25519_user).get("principals"), ["pr_a"])
+        self.assertTrue(second.verify(self.ed25519_ca.public_key))
+
+    def test_invalid_certificate_template(self):
+        with self.assertRaises(_EX.SignatureNotPossibleException):
+            _CERT.CertificateTemplate(self.rsa_ca, extensions=["invalid-extension"])
+
+        template = _CERT.CertificateTemplate(self.rsa_ca)
+        with self.assertRaises(_EX.SignatureNotPossibleException):
+            template.issue(self.rsa_user, valid_before=1)
+
+    def test_memory_usage(self):
+        # Guards the numbers recorded in benchmarks/memory_usage.py
+        encoded = []
+        for serial in range(1, 201):
+            certificate = _CERT.SSHCertificate.create(
+                subject_pubkey=self.ed25519_user,
+                ca_privkey=self.ed25519_ca,
+                fields=_CERT.CertificateFields(
+                    serial=serial,
+                    key_id=f"user-{serial}",
+                    principals=["webservers", "databases"],
+                ),
+            )
+            certificate.sign()
+            encoded.append(bytes(certificate))
+
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        parsed = [_CERT.SSHCertificate.from_bytes(data) for data in encoded]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        self.assertLess(used // len(parsed), 4226)
+
 
 if __name__ == "__main__":
     unittest.main()
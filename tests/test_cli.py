@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.cli as _CLI
+import src.sshkey_tools.keys as _KEY
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.runner = CliRunner()
+
+        self.ca = _KEY.Ed25519PrivateKey.generate()
+        self.ca_path = os.path.join(self.directory, "ca")
+        self.ca.to_file(self.ca_path, "password")
+
+        self.ca_pubkey_path = os.path.join(self.directory, "ca.pub")
+        with open(self.ca_pubkey_path, "w") as file:
+            file.write(self.ca.public_key.serialize().decode("utf-8"))
+
+        self.subject_keys = [_KEY.Ed25519PrivateKey.generate() for _ in range(4)]
+        self.requests_path = os.path.join(self.directory, "requests")
+        with open(self.requests_path, "w") as file:
+            file.write("# Requests\n\n")
+            for index, key in enumerate(self.subject_keys[:3]):
+                file.write(
+                    key.public_key.serialize().decode("utf-8") + f" user{index}\n"
+                )
+
+            file.write(
+                json.dumps(
+                    {
+                        "public_key": self.subject_keys[3]
+                        .public_key.serialize()
+                        .decode("utf-8"),
+                        "key_id": "json-request",
+                        "serial": 1234,
+                        "valid_after": 1000,
+                        "valid_before": 4102444800,
+                        "cert_type": "host",
+                        "principals": ["host.example.com"],
+                    }
+                )
+                + "\n"
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def invoke(self, *args, stdin=None):
+        result = self.runner.invoke(_CLI.main, list(args), input=stdin)
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        return result, sorted(lines, key=lambda line: line["line"])
+
+    def sign(self, *args):
+        return self.invoke(
+            "sign",
+            "--ca",
+            self.ca_path,
+            "--ca-password",
+            "password",
+            "-n",
+            "default",
+            "-e",
+            "permit-pty",
+            "--validity",
+            "3600",
+            *args,
+        )
+
+    def test_sign(self):
+        for args in (["--threads", "-w", "2"], ["-w", "2", "--max-pending", "2"]):
+            result, lines = self.sign(self.requests_path, *args)
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual([line["line"] for line in lines], [3, 4, 5, 6])
+
+            for index, line in enumerate(lines):
+                certificate = _CERT.SSHCertificate.from_string(line["certificate"])
+                self.assertTrue(certificate.verify(self.ca.public_key))
+                self.assertEqual(
+                    certificate.get("public_key").raw_bytes(),
+                    self.subject_keys[index].public_key.raw_bytes(),
+                )
+
+            self.assertEqual(lines[0]["key_id"], "user0")
+            certificate = _CERT.SSHCertificate.from_string(lines[0]["certificate"])
+            self.assertEqual(certificate.get("principals"), ["default"])
+            self.assertEqual(certificate.get("extensions"), ["permit-pty"])
+
+            self.assertEqual(lines[3]["key_id"], "json-request")
+            self.assertEqual(lines[3]["serial"], 1234)
+            certificate = _CERT.SSHCertificate.from_string(lines[3]["certificate"])
+            self.assertEqual(certificate.get("principals"), ["host.example.com"])
+            self.assertEqual(certificate.get("cert_type"), 2)
+
+    def test_sign_errors(self):
+        result, lines = self.invoke(
+            "sign",
+            "--ca",
+            self.ca_path,
+            "--ca-password",
+            "password",
+            "--threads",
+            stdin="ssh-ed25519 broken\n",
+        )
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["file"], "<stdin>")
+        self.assertIn("error", lines[0])
+
+    def test_inspect_verify(self):
+        _, lines = self.sign(self.requests_path, "--threads")
+        certificates = "\n".join(line["certificate"] for line in lines)
+
+        result, lines = self.invoke("inspect", "--threads", stdin=certificates)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(lines), 4)
+        for line in lines:
+            self.assertEqual(line["type"], "certificate")
+            self.assertTrue(line["signature_valid"])
+            self.assertEqual(line["ca"], self.ca.public_key.get_fingerprint())
+
+        self.assertEqual(lines[0]["principals"], ["default"])
+        self.assertEqual(lines[0]["cert_type"], "user")
+        self.assertEqual(lines[3]["cert_type"], "host")
+        self.assertEqual(lines[3]["valid_after"], 1000)
+
+        # The JSON request on the last line is not a key
+        result, lines = self.invoke("inspect", self.requests_path)
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(lines[0]["type"], "public_key")
+        self.assertEqual(lines[0]["comment"], "user0")
+        self.assertIn("error", lines[3])
+
+        result, lines = self.invoke(
+            "verify", "--ca", self.ca_pubkey_path, "-w", "2", stdin=certificates
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([line["key_id"] for line in lines][:1], ["user0"])
+
+        other_ca_path = os.path.join(self.directory, "other-ca.pub")
+        with open(other_ca_path, "w") as file:
+            file.write(
+                _KEY.Ed25519PrivateKey.generate().public_key.serialize().decode("utf-8")
+            )
+
+        result, lines = self.invoke(
+            "verify", "--ca", other_ca_path, "--threads", stdin=certificates
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertTrue(all("error" in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
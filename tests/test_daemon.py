@@ -0,0 +1,167 @@
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.daemon as _DAEMON
+import src.sshkey_tools.exceptions as _EX
+import src.sshkey_tools.keys as _KEY
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Requires Unix domain sockets")
+class TestSigningDaemon(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "daemon.sock")
+        self.ca = _KEY.Ed25519PrivateKey.generate()
+        self.subject = _KEY.EcdsaPrivateKey.generate().public_key
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sign_verify(self):
+        other_ca = _KEY.RsaPrivateKey.generate(1024)
+
+        with _DAEMON.SigningDaemon(
+            self.path, self.ca, [other_ca.public_key], workers=2
+        ), _DAEMON.SigningClient(self.path, timeout=10) as client:
+            self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+            certificate = client.sign(
+                self.subject, key_id="user", principals=["root", "admin"]
+            )
+            self.assertIsInstance(certificate, _CERT.EcdsaCertificate)
+            self.assertTrue(certificate.verify(self.ca.public_key))
+            self.assertEqual(certificate.get("key_id"), "user")
+            self.assertEqual(certificate.get("principals"), ["root", "admin"])
+            self.assertEqual(
+                certificate.get("public_key").raw_bytes(), self.subject.raw_bytes()
+            )
+
+            fields = _CERT.CertificateFields(
+                serial=1234,
+                cert_type=2,
+                key_id="host",
+                valid_after=1000,
+                valid_before=4102444800,
+            )
+            certificate = client.sign(self.subject, fields)
+            self.assertEqual(certificate.get("serial"), 1234)
+            self.assertEqual(certificate.get("cert_type"), 2)
+
+            # Values set for one request don't change the caller's fields
+            certificate = client.sign(self.subject, fields, principals=["web"])
+            self.assertEqual(certificate.get("principals"), ["web"])
+            self.assertEqual(certificate.get("serial"), 1234)
+            self.assertEqual(fields.get("principals"), [])
+            self.assertEqual(client.sign(self.subject, fields).get("principals"), [])
+            self.assertTrue(client.verify(certificate))
+            self.assertTrue(client.verify(bytes(certificate)))
+
+            # Signed by the additional trusted CA
+            other_cert = _CERT.SSHCertificate.create(
+                subject_pubkey=self.subject, ca_privkey=other_ca
+            )
+            other_cert.sign()
+            self.assertTrue(client.verify(other_cert))
+
+            # Signed by an unknown CA
+            other_cert.replace_ca(_KEY.Ed25519PrivateKey.generate())
+            other_cert.sign()
+            self.assertFalse(client.verify(other_cert))
+            with self.assertRaises(_EX.InvalidSignatureException):
+                client.verify(other_cert, raise_on_error=True)
+
+            self.assertFalse(client.verify(b"invalid"))
+
+            # Signed by a key of another type than the trusted CA key
+            other_cert = client.sign(self.subject)
+            other_cert.footer.ca_pubkey = other_ca.public_key
+            self.assertFalse(client.verify(other_cert))
+
+            with self.assertRaises(_EX.DaemonRequestException):
+                client.sign(self.subject, valid_after=2000, valid_before=1000)
+
+    def test_sign_many(self):
+        subjects = [_KEY.Ed25519PrivateKey.generate().public_key for _ in range(20)]
+        requests = list(subjects)
+        requests[5] = (
+            subjects[5],
+            _CERT.CertificateFields(valid_after=2000, valid_before=1000),
+        )
+
+        with _DAEMON.SigningDaemon(self.path, self.ca, workers=4) as daemon:
+            with _DAEMON.SigningClient(self.path, timeout=10) as client:
+                results = client.sign_many(requests, max_pending=4)
+
+            # Clients on separate threads share the worker pool
+            def issue(index):
+                with _DAEMON.SigningClient(self.path, timeout=10) as client:
+                    threaded[index] = client.sign(subjects[index])
+
+            threaded = {}
+            threads = [threading.Thread(target=issue, args=(i,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(threaded), 4)
+            self.assertTrue(all(daemon.verifier.verify(c) for c in threaded.values()))
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(len(results), 20)
+        self.assertIsInstance(results[5].exception, _EX.DaemonRequestException)
+
+        for index, item in enumerate(results):
+            self.assertIs(item.source, subjects[index])
+            if index != 5:
+                self.assertTrue(item.ok)
+                self.assertTrue(item.result.verify(self.ca.public_key))
+                self.assertEqual(
+                    item.result.get("public_key").raw_bytes(),
+                    subjects[index].raw_bytes(),
+                )
+
+    def test_processes(self):
+        with _DAEMON.SigningDaemon(
+            self.path, self.ca, workers=1, use_processes=True
+        ), _DAEMON.SigningClient(self.path, timeout=30) as client:
+            certificate = client.sign(self.subject, key_id="process")
+            self.assertTrue(certificate.verify(self.ca.public_key))
+            self.assertTrue(client.verify(certificate))
+
+    def test_socket_in_use(self):
+        with _DAEMON.SigningDaemon(self.path, self.ca, workers=1):
+            with self.assertRaises(OSError):
+                _DAEMON.SigningDaemon(self.path, self.ca, workers=1).start()
+
+        # A socket left behind by a stopped daemon is replaced, other files are not
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.path)
+
+        with _DAEMON.SigningDaemon(self.path, self.ca, workers=1):
+            with _DAEMON.SigningClient(self.path, timeout=10) as client:
+                self.assertTrue(client.verify(client.sign(self.subject)))
+
+        with open(self.path, "w"):
+            pass
+        with self.assertRaises(OSError):
+            _DAEMON.SigningDaemon(self.path, self.ca, workers=1).start()
+
+    def test_invalid_frame(self):
+        with _DAEMON.SigningDaemon(self.path, self.ca, workers=1):
+            client = _DAEMON.SigningClient(self.path, timeout=10)
+            client._socket.sendall(b"\xff" * 9)
+
+            with self.assertRaises(ConnectionError):
+                client._receive()
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
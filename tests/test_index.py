@@ -0,0 +1,190 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.exceptions as _EX
+import src.sshkey_tools.index as _INDEX
+import src.sshkey_tools.keys as _KEY
+
+
+class TestCertificateIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.directory, "certificates.idx")
+        self.ca = _KEY.Ed25519PrivateKey.generate()
+        self.subjects = [_KEY.Ed25519PrivateKey.generate().public_key for _ in range(3)]
+
+        for number in range(12):
+            self.issue(number, serial=100 - number % 6)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def issue(self, number, write=True, **fields):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=self.subjects[number % 3], ca_privkey=self.ca
+        )
+        certificate.fields.key_id = f"user{number % 4}"
+        certificate.fields.principals = [f"user{number % 4}", "shared"]
+        certificate.fields.valid_before = int(time.time()) + 3600
+        for name, value in fields.items():
+            certificate.set(name, value)
+        certificate.sign()
+
+        if write:
+            certificate.to_file(self.path(number))
+        return certificate
+
+    def path(self, number):
+        return os.path.join(self.directory, f"cert{number}-cert.pub")
+
+    def numbers(self, entries):
+        return sorted(
+            int(os.path.basename(entry.path)[4:].split("-")[0]) for entry in entries
+        )
+
+    def test_find(self):
+        with _INDEX.CertificateIndex.build(
+            self.index_path, self.directory, workers=2, use_processes=False
+        ) as index:
+            self.assertEqual(len(list(index)), 12)
+
+            entries = index.find_serial(100)
+            self.assertEqual(self.numbers(entries), [0, 6])
+            self.assertEqual(index.find_serial(1), [])
+
+            entry = entries[0]
+            certificate = entry.load()
+            self.assertEqual(entry.serial, certificate.get("serial"))
+            self.assertEqual(entry.key_id, certificate.get("key_id"))
+            self.assertEqual(entry.principals, certificate.get("principals"))
+            self.assertEqual(
+                entry.subject_fingerprint,
+                certificate.get("public_key").get_fingerprint(),
+            )
+            self.assertEqual(entry.ca_fingerprint, self.ca.public_key.get_fingerprint())
+            self.assertEqual(entry.cert_type, 1)
+            self.assertTrue(entry.is_current())
+
+            self.assertEqual(
+                self.numbers(index.find_subject(self.subjects[1])), [1, 4, 7, 10]
+            )
+            self.assertEqual(
+                self.numbers(index.find_subject(self.subjects[2].get_fingerprint())),
+                [2, 5, 8, 11],
+            )
+            self.assertEqual(self.numbers(index.find_key_id("user3")), [3, 7, 11])
+            self.assertEqual(self.numbers(index.find_principal("user0")), [0, 4, 8])
+            self.assertEqual(len(index.find_principal("shared")), 12)
+            self.assertEqual(index.find_principal("nobody"), [])
+
+    def test_append_compact(self):
+        index = _INDEX.CertificateIndex.build(
+            self.index_path, [self.path(number) for number in range(6)], 1, False
+        )
+        size = os.path.getsize(self.index_path)
+
+        for number in range(6, 9):
+            index.write_certificate(
+                self.issue(number, write=False, serial=100 - number % 6),
+                self.path(number),
+            )
+
+        # Replace a certificate that is already indexed
+        index.write_certificate(
+            self.issue(0, write=False, serial=500, key_id="renewed"), self.path(0)
+        )
+        index.append(self.path(9))
+
+        self.assertGreater(os.path.getsize(self.index_path), size)
+        self.assertEqual(self.numbers(index.find_serial(500)), [0])
+        self.assertEqual(self.numbers(index.find_serial(100)), [6])
+        self.assertEqual(self.numbers(index.find_key_id("user0")), [4, 8])
+        self.assertEqual(len(list(index)), 10)
+        index.close()
+
+        # Appended entries are read when the index is opened
+        with _INDEX.CertificateIndex(self.index_path) as index:
+            self.assertEqual(self.numbers(index.find_key_id("renewed")), [0])
+            self.assertEqual(len(list(index)), 10)
+
+            # Changed and removed files are updated when compacting
+            self.issue(1, serial=600)
+            os.unlink(self.path(2))
+            os.unlink(self.path(7))
+
+            self.assertEqual(index.compact(), 8)
+            self.assertEqual(index.find_serial(99), [])
+            self.assertEqual(self.numbers(index.find_serial(600)), [1])
+            self.assertEqual(self.numbers(index.find_serial(500)), [0])
+            self.assertEqual(self.numbers(index.find_key_id("user3")), [3])
+            self.assertTrue(all(entry.is_current() for entry in index))
+
+        with _INDEX.CertificateIndex(self.index_path) as index:
+            self.assertEqual(len(list(index)), 8)
+            self.assertEqual(
+                self.numbers(index.find_principal("shared")), [0, 1, 3, 4, 5, 6, 8, 9]
+            )
+
+    def test_compact_errors(self):
+        index = _INDEX.CertificateIndex.build(
+            self.index_path, [self.path(number) for number in range(6)], 1, False
+        )
+
+        # Files that can no longer be parsed are dropped and reported
+        with open(self.path(1), "w") as file:
+            file.write("ssh-ed25519-cert-v01@openssh.com AAAAbroken\n")
+
+        errors = []
+        self.assertEqual(index.compact(errors), 5)
+        self.assertEqual([error.source for error in errors], [self.path(1)])
+        self.assertFalse(errors[0].ok)
+
+        # The index stays open when it cannot be rewritten
+        with mock.patch.object(_INDEX, "_write_index", side_effect=OSError):
+            with self.assertRaises(OSError):
+                index.compact()
+
+        self.assertEqual(len(list(index)), 5)
+        self.assertEqual(self.numbers(index.find_key_id("user3")), [3])
+        index.close()
+
+    def test_interrupted_append(self):
+        index = _INDEX.CertificateIndex.build(
+            self.index_path, [self.path(number) for number in range(6)], 1, False
+        )
+        index.append(self.path(6), self.issue(6, serial=106))
+        index.close()
+
+        # An append interrupted part way through the entry
+        entry = _INDEX.IndexEntry.from_certificate(self.issue(7), self.path(7))
+        with open(self.index_path, "ab") as file:
+            file.write(entry.encode()[:-10])
+
+        with _INDEX.CertificateIndex(self.index_path) as index:
+            self.assertEqual(len(list(index)), 7)
+            self.assertEqual(self.numbers(index.find_serial(106)), [6])
+
+            index.append(self.path(8), self.issue(8, serial=108))
+
+        with _INDEX.CertificateIndex(self.index_path) as index:
+            self.assertEqual(len(list(index)), 8)
+            self.assertEqual(self.numbers(index.find_serial(108)), [8])
+            self.assertEqual(self.numbers(index.find_serial(106)), [6])
+
+    def test_invalid(self):
+        path = os.path.join(self.directory, "invalid")
+        for data in (b"", b"not an index" * 10):
+            with open(path, "wb") as file:
+                file.write(data)
+
+            with self.assertRaises(_EX.InvalidDataException):
+                _INDEX.CertificateIndex(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
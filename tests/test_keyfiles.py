@@ -0,0 +1,104 @@
+import hashlib
+import hmac
+import os
+import unittest
+from base64 import b64encode
+
+import src.sshkey_tools.exceptions as _EX
+from src.sshkey_tools.keyfiles import parse_authorized_keys, parse_known_hosts
+from src.sshkey_tools.keys import (
+    EcdsaPrivateKey,
+    EcdsaPublicKey,
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+    RsaPrivateKey,
+    RsaPublicKey,
+)
+
+
+class TestKeyFileParsing(unittest.TestCase):
+    def setUp(self):
+        self.rsa_key = RsaPrivateKey.generate(1024)
+        self.ecdsa_key = EcdsaPrivateKey.generate()
+        self.ed25519_key = Ed25519PrivateKey.generate()
+
+    def assertEqualPublicKeys(self, keyclass, a, b):
+        self.assertIsInstance(a, keyclass)
+        self.assertEqual(a.raw_bytes(), b.raw_bytes())
+
+    def test_parse_authorized_keys(self):
+        rsa = self.rsa_key.public_key.serialize().decode("utf-8")
+        ed25519 = self.ed25519_key.public_key.serialize().decode("utf-8")
+
+        lines = [
+            "# A comment",
+            "",
+            f"{rsa} user@host",
+            f'no-pty,command="echo a, b",from="10.0.0.1" {ed25519} deploy key',
+            "invalid line",
+            "restrict " + self.ecdsa_key.public_key.serialize().decode("utf-8"),
+        ]
+        entries = list(parse_authorized_keys(lines))
+
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[0].options, [])
+        self.assertEqual(entries[0].comment, "user@host")
+        self.assertEqual(entries[0].line_number, 3)
+        self.assertEqual(
+            entries[1].options, ["no-pty", 'command="echo a, b"', 'from="10.0.0.1"']
+        )
+        self.assertEqual(entries[1].comment, "deploy key")
+        self.assertEqual(entries[2].options, ["restrict"])
+
+        self.assertIsNone(entries[1]._key)
+        self.assertEqualPublicKeys(
+            Ed25519PublicKey, entries[1].key, self.ed25519_key.public_key
+        )
+        self.assertEqualPublicKeys(
+            EcdsaPublicKey, entries[2].key, self.ecdsa_key.public_key
+        )
+
+    def test_parse_known_hosts(self):
+        rsa = self.rsa_key.public_key.serialize().decode("utf-8")
+        salt = os.urandom(20)
+        digest = hmac.new(salt, b"[hashed.example.com]:2222", hashlib.sha1).digest()
+        hashed = "|1|{}|{}".format(
+            b64encode(salt).decode("utf-8"), b64encode(digest).decode("utf-8")
+        )
+
+        lines = [
+            f"host1.example.com,10.0.0.1 {rsa}",
+            f"@cert-authority *.example.com,!bad.example.com {rsa} CA",
+            f"{hashed} {rsa}",
+            f"@revoked * {rsa}",
+        ]
+        entries = list(parse_known_hosts(lines))
+
+        self.assertEqual(entries[0].hosts, ["host1.example.com", "10.0.0.1"])
+        self.assertTrue(entries[0].matches("HOST1.example.com"))
+        self.assertFalse(entries[0].matches("host1.example.com", 2222))
+
+        self.assertEqual(entries[1].marker, "cert-authority")
+        self.assertEqual(entries[1].comment, "CA")
+        self.assertTrue(entries[1].matches("good.example.com"))
+        self.assertFalse(entries[1].matches("bad.example.com"))
+
+        self.assertTrue(entries[2].is_hashed)
+        self.assertTrue(entries[2].matches("hashed.example.com", 2222))
+        self.assertFalse(entries[2].matches("hashed.example.com"))
+
+        self.assertEqual(entries[3].marker, "revoked")
+        self.assertEqual(str(entries[3]), f"@revoked * {rsa}")
+        self.assertEqualPublicKeys(
+            RsaPublicKey, entries[3].key, self.rsa_key.public_key
+        )
+
+    def test_invalid_entry_key(self):
+        entry = next(parse_authorized_keys(["ssh-ed25519 AAAAbad"]))
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            entry.key
+
+
+if __name__ == "__main__":
+    unittest.main()
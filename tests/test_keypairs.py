@@ -5,7 +5,9 @@
 import os
 import shutil
 import unittest
+from base64 import b64decode
 
+from cryptography.hazmat.primitives import serialization as _SERIALIZATION
 from cryptography.hazmat.primitives.asymmetric import dsa as _DSA
 from cryptography.hazmat.primitives.asymmetric import ec as _EC
 from cryptography.hazmat.primitives.asymmetric import ed25519 as _ED25519
@@ -20,6 +22,7 @@ from src.sshkey_tools.keys import (
     EcdsaPublicKey,
     Ed25519PrivateKey,
     Ed25519PublicKey,
+    FingerprintHashes,
     PrivateKey,
     PublicKey,
     RsaPrivateKey,
@@ -630,6 +633,107 @@ class TestFingerprint(KeypairMethods):
         self.assertEqual(key.get_fingerprint(), sshkey_fingerprint)
 
 
+class TestWireEncoding(KeypairMethods):
+    def setUp(self):
+        self.generateClasses()
+
+    def tearDown(self):
+        pass
+
+    def test_raw_bytes_match_openssh(self):
+        for key in (self.rsa_key, self.dsa_key, self.ecdsa_key, self.ed25519_key):
+            serialized = key.public_key.key.public_bytes(
+                _SERIALIZATION.Encoding.OpenSSH, _SERIALIZATION.PublicFormat.OpenSSH
+            )
+
+            self.assertEqual(key.public_key.serialize(), serialized)
+            self.assertEqual(
+                key.public_key.raw_bytes(), b64decode(serialized.split(b" ")[1])
+            )
+
+    def test_cache_invalidation(self):
+        public_key = self.rsa_key.public_key
+        fingerprint = public_key.get_fingerprint()
+        md5 = public_key.get_fingerprint(FingerprintHashes.MD5)
+
+        self.assertIs(public_key.raw_bytes(), public_key.raw_bytes())
+        self.assertNotEqual(fingerprint, md5)
+        self.assertEqual(public_key.get_fingerprint(FingerprintHashes.MD5), md5)
+
+        public_key.key = RsaPrivateKey.generate(1024).key.public_key()
+
+        self.assertNotEqual(public_key.get_fingerprint(), fingerprint)
+        self.assertEqual(
+            public_key.raw_bytes(),
+            RsaPublicKey(public_key.key).raw_bytes(),
+        )
+
+        # The comment is not part of the encoding, the bytes read are kept
+        loaded = PublicKey.from_string(self.ed25519_key.public_key.serialize())
+        raw_bytes = loaded.raw_bytes()
+        loaded.comment = "comment"
+        self.assertIs(loaded.raw_bytes(), raw_bytes)
+
+    def test_from_wire(self):
+        for key in (self.rsa_key, self.dsa_key, self.ecdsa_key, self.ed25519_key):
+            raw = key.public_key.raw_bytes()
+            loaded = PublicKey.from_wire(raw)
+
+            self.assertIsInstance(loaded, key.public_key.__class__)
+            self.assertEqual(loaded.raw_bytes(), raw)
+            self.assertEqual(
+                loaded.key.public_bytes(
+                    _SERIALIZATION.Encoding.OpenSSH,
+                    _SERIALIZATION.PublicFormat.OpenSSH,
+                ),
+                key.public_key.serialize(),
+            )
+
+    def test_from_bytes(self):
+        for key in (self.rsa_key, self.dsa_key, self.ecdsa_key, self.ed25519_key):
+            loaded = PublicKey.from_bytes(key.public_key.raw_bytes())
+
+            self.assertIsInstance(loaded, key.public_key.__class__)
+            self.assertEqual(loaded.raw_bytes(), key.public_key.raw_bytes())
+
+        raw_ed25519 = self.ed25519_key.public_key.key.public_bytes(
+            _SERIALIZATION.Encoding.Raw, _SERIALIZATION.PublicFormat.Raw
+        )
+        self.assertEqualPublicKeys(
+            Ed25519PublicKey,
+            PublicKey.from_bytes(raw_ed25519),
+            self.ed25519_key.public_key,
+        )
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            PublicKey.from_bytes(b"\x00\x00\x00\x07ssh-foo\x00\x00\x00\x00")
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            RsaPublicKey.from_bytes(raw_ed25519)
+
+    def test_invalid_from_wire(self):
+        raw = self.rsa_key.public_key.raw_bytes()
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            PublicKey.from_wire(b"\x00\x00\x00\x07ssh-foo")
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            PublicKey.from_wire(raw[:-4])
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            PublicKey.from_wire(raw + b"\x00")
+
+        with self.assertRaises(_EX.InvalidKeyException):
+            EcdsaPublicKey.from_wire(raw)
+
+        # A nistp384 point under the nistp256 key type
+        raw_p384 = EcdsaPrivateKey.generate(EcdsaCurves.P384).public_key.raw_bytes()
+        with self.assertRaises(_EX.InvalidKeyException):
+            PublicKey.from_wire(
+                raw_p384.replace(b"ecdsa-sha2-nistp384", b"ecdsa-sha2-nistp256", 1)
+            )
+
+
 class TestSignatures(KeypairMethods):
     def setUp(self):
         self.generateClasses()
@@ -0,0 +1,173 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.exceptions as _EX
+import src.sshkey_tools.keys as _KEY
+import src.sshkey_tools.krl as _KRL
+
+
+class TestKRL(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ca = _KEY.Ed25519PrivateKey.generate()
+        self.other_ca = _KEY.EcdsaPrivateKey.generate()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def issue(self, serial, key_id="user", ca=None):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=_KEY.Ed25519PrivateKey.generate().public_key,
+            ca_privkey=ca or self.ca,
+        )
+        certificate.fields.serial = serial
+        certificate.fields.key_id = key_id
+        certificate.sign()
+        return certificate
+
+    def test_revoked_serials(self):
+        revoked = _KRL.RevokedCertificates()
+        revoked.revoke_serial(10, 20)
+        revoked.revoke_serial(21, 30)
+        revoked.revoke_serial(50, 60)
+        revoked.revoke_serial(5, 12)
+        revoked.revoke_serial(100)
+
+        self.assertEqual(revoked.ranges, [(5, 30), (50, 60)])
+        self.assertEqual(revoked.count(), 26 + 11 + 1)
+        self.assertEqual(len(revoked), 3)
+
+        for serial, expected in ((4, False), (5, True), (30, True), (31, False)):
+            self.assertEqual(revoked.is_serial_revoked(serial), expected)
+        self.assertTrue(revoked.is_serial_revoked(100))
+        self.assertFalse(revoked.is_serial_revoked(99))
+
+        revoked.revoke_serial(25, 55)
+        self.assertEqual(revoked.ranges, [(5, 60)])
+
+        for serial, serial_max in ((0, None), (2**64, None), (10, 5)):
+            with self.assertRaises(_EX.InvalidDataException):
+                revoked.revoke_serial(serial, serial_max)
+
+    def test_full_width_range(self):
+        revoked = _KRL.RevokedCertificates()
+        self.assertFalse(revoked)
+
+        revoked.revoke_serial(1, _KRL.MAX_SERIAL)
+        self.assertTrue(revoked)
+        self.assertEqual(len(revoked), 1)
+        self.assertEqual(revoked.count(), _KRL.MAX_SERIAL)
+        self.assertTrue(revoked.is_serial_revoked(_KRL.MAX_SERIAL))
+
+    def test_is_revoked(self):
+        krl = _KRL.KRL()
+        certificates = [self.issue(serial) for serial in range(1, 6)]
+        other_certificate = self.issue(3, ca=self.other_ca)
+
+        krl.revoke_certificate(certificates[0])
+        krl.revoke_serial(self.ca.public_key, 3, 4)
+        krl.revoke_key_id(None, "revoked")
+
+        self.assertEqual(
+            [krl.is_revoked(cert) for cert in certificates],
+            [True, False, True, True, False],
+        )
+
+        # Serials are revoked per CA, key IDs in the wildcard section for any CA
+        self.assertFalse(krl.is_revoked(other_certificate))
+        self.assertTrue(krl.is_revoked(self.issue(100, "revoked", self.other_ca)))
+
+        # Certificates with serial zero are revoked by key ID
+        unnumbered = self.issue(0, "unnumbered")
+        krl.revoke_certificate(unnumbered)
+        self.assertTrue(krl.is_revoked(unnumbered))
+        self.assertFalse(krl.is_revoked(self.issue(0, "other")))
+
+        # Revoking a key revokes the key, its certificates and, for a CA,
+        # the certificates it signed
+        subject_key = certificates[1].get("public_key")
+        self.assertFalse(krl.is_revoked(subject_key))
+        krl.revoke_key(subject_key)
+        self.assertTrue(krl.is_revoked(subject_key))
+        self.assertTrue(krl.is_revoked(certificates[1]))
+
+        krl.revoke_key_hash(self.other_ca.public_key)
+        self.assertTrue(krl.is_revoked(other_certificate))
+
+        krl.revoke_key_hash(certificates[4], sha1=True)
+        self.assertTrue(krl.is_revoked(certificates[4]))
+        self.assertTrue(krl.is_revoked(certificates[4].get("public_key")))
+
+    def test_encode_decode(self):
+        krl = _KRL.KRL(version=5, comment="Revoked", generated_date=1000)
+        revoked = krl.get_certificates(self.ca.public_key)
+
+        # Dense serials are encoded as bitmaps, runs as ranges,
+        # and sparse serials as a list
+        for serial in range(2, 2000, 3):
+            revoked.revoke_serial(serial)
+        for serial in (10**9, 2**40, 2**64 - 1):
+            revoked.revoke_serial(serial)
+        revoked.revoke_serial(5000, 10**6)
+        revoked.revoke_key_id("user@example.com")
+
+        krl.revoke_key_id(None, "revoked")
+        krl.revoke_key(self.other_ca.public_key)
+        krl.revoke_key_hash(self.ca.public_key)
+        krl.revoke_key_hash(self.ca.public_key, sha1=True)
+
+        data = bytes(krl)
+        self.assertLess(len(data), 1000)
+
+        path = os.path.join(self.directory, "krl")
+        krl.to_file(path)
+        decoded = _KRL.KRL.from_file(path)
+
+        self.assertEqual(bytes(decoded), data)
+        self.assertEqual(decoded.version, 5)
+        self.assertEqual(decoded.comment, "Revoked")
+        self.assertEqual(decoded.generated_date, 1000)
+        self.assertEqual(decoded.keys, krl.keys)
+        self.assertEqual(decoded.sha1_hashes, krl.sha1_hashes)
+        self.assertEqual(decoded.sha256_hashes, krl.sha256_hashes)
+
+        decoded_revoked = decoded.get_certificates(self.ca.public_key)
+        self.assertEqual(decoded_revoked.serials, revoked.serials)
+        self.assertEqual(decoded_revoked.ranges, revoked.ranges)
+        self.assertEqual(decoded_revoked.key_ids, revoked.key_ids)
+        self.assertEqual(decoded.get_certificates().key_ids, {"revoked"})
+
+        with self.assertRaises(_EX.InvalidDataException):
+            _KRL.KRL.from_bytes(b"SSHKRL\n\x01" + data[8:])
+
+        with self.assertRaises(_EX.InvalidDataException):
+            _KRL.KRL.from_bytes(data[:-3])
+
+    @unittest.skipUnless(shutil.which("ssh-keygen"), "ssh-keygen is not installed")
+    def test_ssh_keygen(self):
+        krl = _KRL.KRL(comment="Revoked")
+        certificates = [self.issue(serial) for serial in range(1, 200)]
+        for certificate in certificates[::2]:
+            krl.revoke_certificate(certificate)
+
+        krl_path = os.path.join(self.directory, "krl")
+        krl.to_file(krl_path)
+
+        for index in (0, 1, 100, 101):
+            cert_path = os.path.join(self.directory, f"{index}-cert.pub")
+            certificates[index].to_file(cert_path)
+
+            result = subprocess.run(
+                ["ssh-keygen", "-Q", "-f", krl_path, cert_path],
+                capture_output=True,
+                check=False,
+            )
+            self.assertEqual(result.returncode, 1 if index % 2 == 0 else 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import time
+import unittest
+
+import src.sshkey_tools.keys as _KEY
+import src.sshkey_tools.pool as _POOL
+
+
+class TestKeyPool(unittest.TestCase):
+    def wait_for(self, condition, timeout=30):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("Timed out waiting for the key pool")
+            time.sleep(0.01)
+
+    def test_acquire(self):
+        with _POOL.KeyPool(size=4, low_water=1, workers=2) as pool:
+            pool.fill(_KEY.RsaPrivateKey, 1024)
+            pool.fill(_KEY.EcdsaPrivateKey, _KEY.EcdsaCurves.P256)
+            self.wait_for(lambda: pool.available(_KEY.RsaPrivateKey, 1024) == 4)
+            self.wait_for(
+                lambda: pool.available(_KEY.EcdsaPrivateKey, _KEY.EcdsaCurves.P256)
+                == 4
+            )
+
+            keys = [pool.acquire(_KEY.RsaPrivateKey, 1024) for _ in range(3)]
+            for key in keys:
+                self.assertIsInstance(key, _KEY.RsaPrivateKey)
+                self.assertEqual(key.key.key_size, 1024)
+
+            self.assertEqual(len({key.get_fingerprint() for key in keys}), 3)
+
+            ecdsa_key = pool.acquire(_KEY.EcdsaPrivateKey, _KEY.EcdsaCurves.P256)
+            self.assertEqual(ecdsa_key.key.curve.name, "secp256r1")
+
+            # The pool is refilled after dropping to the low water mark
+            self.wait_for(lambda: pool.available(_KEY.RsaPrivateKey, 1024) == 4)
+
+            stats = pool.get_stats(_KEY.RsaPrivateKey, 1024)
+            self.assertEqual(stats.hits, 3)
+            self.assertEqual(stats.misses, 0)
+            self.assertEqual(stats.generated, 7)
+            self.assertEqual(stats.hit_rate, 1.0)
+            self.assertGreater(stats.refill_latency, 0)
+
+    def test_acquire_empty(self):
+        with _POOL.KeyPool(size=2, workers=1, use_processes=False) as pool:
+            key = pool.acquire(_KEY.Ed25519PrivateKey, block=False)
+            self.assertIsNone(key)
+
+            key = pool.acquire(_KEY.Ed25519PrivateKey, timeout=10)
+            self.assertIsInstance(key, _KEY.Ed25519PrivateKey)
+
+            stats = pool.get_stats(_KEY.Ed25519PrivateKey)
+            self.assertGreaterEqual(stats.misses, 1)
+            self.assertEqual(stats.hits + stats.misses, 2)
+            self.assertLess(stats.hit_rate, 1.0)
+
+            # Both the pool and the waiting request are served
+            self.wait_for(lambda: pool.available(_KEY.Ed25519PrivateKey) == 2)
+
+    def test_failed_generation(self):
+        attempts = 1 + _POOL.GENERATION_RETRIES
+
+        with _POOL.KeyPool(size=1, workers=1, use_processes=False) as pool:
+            with self.assertRaises(ValueError):
+                pool.acquire(_KEY.RsaPrivateKey, 12, timeout=10)
+
+            # One for the waiting request and one for the pool, with retries
+            self.wait_for(
+                lambda: pool.get_stats(_KEY.RsaPrivateKey, 12).failed == 2 * attempts
+            )
+
+            # A failed refill is raised by the next request that finds no key
+            with self.assertRaises(ValueError):
+                pool.acquire(_KEY.RsaPrivateKey, 12, block=False)
+
+            stats = pool.get_stats(_KEY.RsaPrivateKey, 12)
+            self.assertEqual(stats.hits, 0)
+            self.assertEqual(stats.misses, 2)
+            self.assertEqual(stats.generated, 0)
+
+            # The failure is raised once, then the pool is refilled again
+            self.assertIsNone(pool.acquire(_KEY.RsaPrivateKey, 12, block=False))
+            self.wait_for(
+                lambda: pool.get_stats(_KEY.RsaPrivateKey, 12).failed == 3 * attempts
+            )
+            with self.assertRaises(ValueError):
+                pool.fill(_KEY.RsaPrivateKey, 12)
+
+    def test_closed_pool(self):
+        release = threading.Event()
+
+        class BlockingKey:
+            @staticmethod
+            def generate():
+                release.wait(30)
+                raise ValueError("Not generated")
+
+        pool = _POOL.KeyPool(size=1, workers=1, use_processes=False)
+        errors = []
+
+        def acquire():
+            try:
+                pool.acquire(BlockingKey, timeout=30)
+            except RuntimeError as exception:
+                errors.append(exception)
+
+        waiter = threading.Thread(target=acquire)
+        waiter.start()
+        self.wait_for(lambda: pool.get_stats(BlockingKey).misses == 1)
+
+        # Closing the pool wakes the waiting request
+        closer = threading.Thread(target=pool.close)
+        closer.start()
+        waiter.join(30)
+        release.set()
+        closer.join(30)
+
+        self.assertEqual(len(errors), 1)
+        with self.assertRaises(RuntimeError):
+            pool.acquire(_KEY.Ed25519PrivateKey, timeout=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
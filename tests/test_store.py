@@ -0,0 +1,186 @@
+import time
+import unittest
+
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.keys as _KEY
+import src.sshkey_tools.store as _STORE
+
+HOUR = 3600
+
+# Far enough ahead that all certificates expire in the future
+NOW = int(time.time()) + 30 * 24 * HOUR
+
+
+class TestCertificateStore(unittest.TestCase):
+    def setUp(self):
+        self.ca = _KEY.Ed25519PrivateKey.generate()
+        self.other_ca = _KEY.Ed25519PrivateKey.generate()
+        self.subject = _KEY.Ed25519PrivateKey.generate().public_key
+
+        self.store = _STORE.CertificateStore()
+        self.ids = []
+
+        # Certificates issued every hour over the last day, valid for two hours
+        for index in range(24):
+            valid_after = NOW - index * HOUR
+            self.ids.append(
+                self.store.add(
+                    self.issue(
+                        serial=index + 1,
+                        key_id=f"user{index % 4}",
+                        principals=[f"user{index % 4}", "shared"],
+                        valid_after=valid_after,
+                        valid_before=valid_after + 2 * HOUR,
+                        ca=self.other_ca if index % 2 else self.ca,
+                    )
+                )
+            )
+
+    def issue(self, ca, subject=None, **fields):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=subject or _KEY.Ed25519PrivateKey.generate().public_key,
+            ca_privkey=ca,
+        )
+        for name, value in fields.items():
+            certificate.set(name, value)
+        certificate.sign()
+        return certificate
+
+    def serials(self, certificates):
+        return sorted(certificate.get("serial") for certificate in certificates)
+
+    def test_find(self):
+        self.assertEqual(len(self.store), 24)
+        self.assertEqual(self.serials(self.store.find(serial=5)), [5])
+        self.assertEqual(
+            self.serials(self.store.find(key_id="user1")), [2, 6, 10, 14, 18, 22]
+        )
+        self.assertEqual(len(self.store.find(principal="shared")), 24)
+        self.assertEqual(
+            self.serials(self.store.find(principal="user2", ca=self.ca.public_key)),
+            [3, 7, 11, 15, 19, 23],
+        )
+        self.assertEqual(self.store.find(principal="user1", ca=self.ca.public_key), [])
+        self.assertEqual(self.store.find(principal="nobody"), [])
+        self.assertEqual(len(self.store.find()), 24)
+
+        fingerprint = self.other_ca.public_key.get_fingerprint()
+        self.assertEqual(len(self.store.find(ca=fingerprint)), 12)
+
+        certificate = self.store.get(self.ids[3])
+        self.assertEqual(
+            self.store.find(subject=certificate.get("public_key")), [certificate]
+        )
+
+    def test_find_validity(self):
+        # Valid at NOW: issued at NOW, NOW - 1h and NOW - 2h
+        self.assertEqual(self.serials(self.store.find_live(NOW)), [1, 2, 3])
+        self.assertEqual(
+            self.serials(self.store.find_live(NOW, principal="user1")), [2]
+        )
+        self.assertEqual(
+            self.serials(self.store.find(valid_at=NOW, ca=self.ca.public_key)), [1, 3]
+        )
+
+        # Signed by a CA in the last hour
+        self.assertEqual(
+            self.serials(
+                self.store.find(ca=self.other_ca.public_key, issued_after=NOW - HOUR)
+            ),
+            [2],
+        )
+        self.assertEqual(
+            self.serials(
+                self.store.find(issued_after=NOW - 3 * HOUR, issued_before=NOW - HOUR)
+            ),
+            [2, 3, 4],
+        )
+        self.assertEqual(
+            self.serials(self.store.find(valid_at=NOW, issued_before=NOW - HOUR)),
+            [2, 3],
+        )
+
+    def test_valid_at_candidates(self):
+        visited = []
+
+        def counted(sorted_index):
+            walk = sorted_index.range
+
+            def range(low=None, high=None):
+                for cert_id in walk(low, high):
+                    visited.append(cert_id)
+                    yield cert_id
+
+            sorted_index.range = range
+
+        counted(self.store._valid_after)
+        counted(self.store._valid_before)
+
+        # Only the oldest certificate became valid by NOW - 23h, though
+        # none of them expired yet
+        self.assertEqual(self.serials(self.store.find(valid_at=NOW - 23 * HOUR)), [24])
+        self.assertEqual(len(visited), 1)
+
+        # Only the newest three certificates are still valid at NOW
+        visited.clear()
+        self.assertEqual(self.serials(self.store.find(valid_at=NOW)), [1, 2, 3])
+        self.assertEqual(len(visited), 3)
+
+        visited.clear()
+        self.assertEqual(
+            self.serials(
+                self.store.find(valid_at=NOW - 12 * HOUR, issued_after=NOW - 13 * HOUR)
+            ),
+            [13, 14],
+        )
+        self.assertLessEqual(len(visited), 2)
+
+    def test_any_principal(self):
+        certificate = self.issue(
+            self.ca, serial=100, valid_after=NOW, valid_before=NOW + HOUR
+        )
+        self.store.add(certificate)
+
+        self.assertIn(certificate, self.store.find(principal="nobody"))
+        self.assertIn(certificate, self.store.find_live(NOW, principal="user1"))
+
+    def test_remove_evict(self):
+        certificate = self.store.remove(self.ids[0])
+        self.assertEqual(certificate.get("serial"), 1)
+        self.assertNotIn(self.ids[0], self.store)
+        self.assertEqual(self.store.find(serial=1), [])
+        self.assertEqual(self.serials(self.store.find_live(NOW)), [2, 3])
+
+        with self.assertRaises(KeyError):
+            self.store.remove(self.ids[0])
+
+        # Expired before NOW - 10h: issued before NOW - 12h
+        self.assertEqual(self.store.evict_expired(NOW - 10 * HOUR), 11)
+        self.assertEqual(len(self.store), 12)
+        self.assertEqual(self.serials(self.store), list(range(2, 14)))
+        self.assertEqual(self.store.find(key_id="user3", serial=16), [])
+        self.assertEqual(self.store.evict_expired(NOW - 10 * HOUR), 0)
+
+        # Incremental inserts after eviction
+        for serial in range(200, 300):
+            self.store.add(
+                self.issue(
+                    self.ca,
+                    self.subject,
+                    serial=serial,
+                    valid_after=NOW + serial,
+                    valid_before=NOW + HOUR + serial,
+                )
+            )
+
+        self.assertEqual(len(self.store.find(subject=self.subject)), 100)
+        self.assertEqual(
+            self.serials(self.store.find(issued_after=NOW + 250)), list(range(250, 300))
+        )
+        self.assertEqual(self.store.evict_expired(NOW + 10 * HOUR), 112)
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.find(principal="shared"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime, timezone
 from random import randint
 
 import faker
@@ -298,6 +299,14 @@ class TestLongConversion(unittest.TestCase):
             start_length = start_length * 2
 
 
+class TestTimestamps(unittest.TestCase):
+    def test_to_timestamp(self):
+        moment = datetime(2022, 1, 2, 3, 4, 5, 600000, tzinfo=timezone.utc)
+
+        self.assertEqual(utils.to_timestamp(moment), 1641092645)
+        self.assertEqual(utils.to_timestamp(1641092645), 1641092645)
+
+
 class TestNonceGeneration(unittest.TestCase):
     def test_nonce_generation(self):
         """
@@ -329,5 +338,42 @@ class TestHashGeneration(unittest.TestCase):
             self.assertEqual(f"SHA512:{sha512}", sha512_3)
 
 
+class TestWireReader(unittest.TestCase):
+    def test_read_values(self):
+        data = (
+            b"\x01"
+            + b"\x00\x00\x00\x2a"
+            + b"\x00\x00\x00\x00\x00\x00\x01\x00"
+            + b"\x00\x00\x00\x05hello"
+            + b"\x00\x00\x00\x02\x01\x00"
+        )
+        reader = utils.WireReader(data)
+
+        self.assertEqual(reader.read_uint8(), 1)
+        self.assertEqual(reader.read_uint32(), 42)
+        self.assertEqual(reader.read_uint64(), 256)
+        self.assertEqual(reader.peek_string(), b"hello")
+        self.assertEqual(reader.read_string(), b"hello")
+        self.assertEqual(reader.rest(), b"\x00\x00\x00\x02\x01\x00")
+        self.assertEqual(reader.read_mpint(), 256)
+        self.assertTrue(reader.at_end())
+
+    def test_no_copy(self):
+        data = b"\x00\x00\x00\x03abc"
+        value = utils.WireReader(data).read_string()
+
+        self.assertIsInstance(value, memoryview)
+        self.assertIs(value.obj, data)
+
+    def test_truncated_data(self):
+        reader = utils.WireReader(b"\x00\x00\x00\x10abc")
+
+        with self.assertRaises(utils._EX.InvalidDataException):
+            reader.read_string()
+
+        with self.assertRaises(utils._EX.InvalidDataException):
+            utils.WireReader(b"\x00\x00").read_uint32()
+
+
 if __name__ == "__main__":
     unittest.main()
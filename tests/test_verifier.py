@@ -0,0 +1,140 @@
+import pickle
+import unittest
+
+import src.sshkey_tools.cert as _CERT
+import src.sshkey_tools.exceptions as _EX
+import src.sshkey_tools.keys as _KEY
+import src.sshkey_tools.verifier as _VERIFIER
+
+
+class TestCertificateVerifier(unittest.TestCase):
+    def setUp(self):
+        self.rsa_ca = _KEY.RsaPrivateKey.generate(1024)
+        self.ecdsa_ca = _KEY.EcdsaPrivateKey.generate()
+        self.ed25519_ca = _KEY.Ed25519PrivateKey.generate()
+        self.untrusted_ca = _KEY.Ed25519PrivateKey.generate()
+
+        self.verifier = _VERIFIER.CertificateVerifier(
+            [
+                self.rsa_ca.public_key,
+                self.ecdsa_ca.public_key,
+                self.ed25519_ca.public_key,
+            ]
+        )
+
+    def create_certificate(self, ca_privkey, serial=1):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=_KEY.Ed25519PrivateKey.generate().public_key,
+            ca_privkey=ca_privkey,
+        )
+        certificate.fields.serial = serial
+        certificate.fields.principals = [f"user{serial}"]
+        certificate.sign()
+
+        return certificate
+
+    def test_verify(self):
+        for ca_privkey in (self.rsa_ca, self.ecdsa_ca, self.ed25519_ca):
+            certificate = self.create_certificate(ca_privkey)
+
+            self.assertTrue(self.verifier.verify(certificate))
+            self.assertTrue(self.verifier.verify(bytes(certificate)))
+            self.assertTrue(self.verifier.verify(certificate.to_string()))
+
+            verified = self.verifier.check(bytes(certificate))
+            self.assertEqual(verified.get("principals"), ["user1"])
+            self.assertTrue(verified.footer.ca_pubkey.is_pending)
+
+    def test_verify_rsa_hash_algorithm(self):
+        certificate = _CERT.SSHCertificate.create(
+            subject_pubkey=_KEY.Ed25519PrivateKey.generate().public_key,
+            ca_privkey=self.rsa_ca,
+        )
+        certificate.footer.signature.hash_alg = _KEY.RsaAlgs.SHA256
+        certificate.sign()
+
+        self.assertTrue(self.verifier.verify(bytes(certificate)))
+
+    def test_untrusted_ca(self):
+        certificate = self.create_certificate(self.untrusted_ca)
+
+        self.assertFalse(self.verifier.verify(bytes(certificate)))
+        with self.assertRaises(_EX.InvalidSignatureException):
+            self.verifier.check(certificate)
+
+        self.verifier.add_ca(self.untrusted_ca.public_key)
+        self.assertIn(self.untrusted_ca.public_key, self.verifier)
+        self.assertTrue(self.verifier.verify(bytes(certificate)))
+
+        self.verifier.remove_ca(self.untrusted_ca.public_key)
+        self.assertNotIn(self.untrusted_ca.public_key, self.verifier)
+        self.assertFalse(self.verifier.verify(bytes(certificate)))
+
+    def test_modified_certificate(self):
+        data = bytearray(bytes(self.create_certificate(self.ed25519_ca)))
+        position = data.index(b"user1")
+        data[position : position + 5] = b"root1"
+
+        self.assertFalse(self.verifier.verify(bytes(data)))
+
+    def test_invalid_certificate(self):
+        # A trusted CA key of another type than the signature
+        certificate = self.create_certificate(self.rsa_ca)
+        certificate.footer.ca_pubkey = self.ed25519_ca.public_key
+
+        self.assertFalse(self.verifier.verify(bytes(certificate)))
+        with self.assertRaises(_EX.InvalidSignatureException):
+            self.verifier.verify(certificate, raise_on_error=True)
+
+        for data in (b"broken", "ssh-ed25519-cert-v01@openssh.com AAAA", b"\x00" * 8):
+            self.assertFalse(self.verifier.verify(data))
+
+        # Malformed certificate strings
+        for data in ("garbage", "", "ssh-ed25519-cert-v01@openssh.com !!!"):
+            self.assertFalse(self.verifier.verify(data))
+            with self.assertRaises(_EX.InvalidCertificateFormatException):
+                self.verifier.verify(data, raise_on_error=True)
+
+        with self.assertRaises(_EX.InvalidCertificateFormatException):
+            self.verifier.verify(b"broken", raise_on_error=True)
+
+    def test_verify_many(self):
+        certificates = [
+            bytes(self.create_certificate(self.ed25519_ca, serial))
+            for serial in range(1, 9)
+        ]
+        certificates.append(bytes(self.create_certificate(self.untrusted_ca)))
+        certificates.append(b"broken")
+
+        for use_processes in (False, True):
+            results = list(
+                self.verifier.verify_many(
+                    certificates, workers=2, use_processes=use_processes
+                )
+            )
+
+            verified = [res for res in results if res.ok]
+            self.assertEqual(len(results), len(certificates))
+            self.assertEqual(
+                sorted(res.result.get("serial") for res in verified),
+                list(range(1, 9)),
+            )
+
+    def test_check_worker(self):
+        # Process workers get the verifier once, from the pool initializer
+        _VERIFIER._init_check_worker(pickle.loads(pickle.dumps(self.verifier)))
+        certificate = self.create_certificate(self.ed25519_ca)
+
+        self.assertEqual(_VERIFIER._check_worker(bytes(certificate)).get("serial"), 1)
+        with self.assertRaises(_EX.InvalidSignatureException):
+            _VERIFIER._check_worker(bytes(self.create_certificate(self.untrusted_ca)))
+
+    def test_pickle(self):
+        verifier = pickle.loads(pickle.dumps(self.verifier))
+
+        self.assertEqual(len(verifier), 3)
+        self.assertTrue(verifier.verify(bytes(self.create_certificate(self.rsa_ca))))
+
+
+if __name__ == "__main__":
+    unittest.main()